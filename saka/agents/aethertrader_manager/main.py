@@ -1,10 +1,14 @@
 from fastapi import FastAPI, Depends
-from saka.shared.models import KamilaFinalDecision, TradeExecutionReceipt, TradeSignal
+from saka.shared.models import KamilaFinalDecision, TradeExecutionReceipt, TradeSignal, AgentName
 from saka.shared.security import get_api_key
+from saka.shared.metrics import install_metrics
+from saka.shared.tracing import install_tracing
 import datetime
 import uuid
 
 app = FastAPI(title="Aethertrader (Execution Agent)")
+install_metrics(app, AgentName.AETHERTRADER.value)
+install_tracing(app, AgentName.AETHERTRADER.value)
 
 @app.post("/execute_trade",
             response_model=TradeExecutionReceipt,
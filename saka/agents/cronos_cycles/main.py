@@ -1,13 +1,25 @@
-from fastapi import FastAPI, Depends, HTTPException
-from saka.shared.models import AnalysisRequest, CronosTechnicalOutput, ErrorResponse, AgentName
+from fastapi import FastAPI, Depends, HTTPException, Query
+from saka.shared.models import (
+    AnalysisRequest, CronosTechnicalOutput, ErrorResponse, AgentName, PriceTick,
+    BatchAnalysisRequest, CronosBatchOutput, BatchItemError, OHLCAnalysisRequest
+)
 from saka.shared.security import get_api_key
+from saka.shared.metrics import install_metrics
+from saka.shared.tracing import install_tracing, span
+from saka.shared.batching import group_price_windows
+from saka.shared.price_codec import resolve_prices
+from typing import Annotated, Dict, Optional, Tuple
+import math
+import numpy as np
 import pandas as pd
 
 app = FastAPI(
     title="Cronos (Manual RSI Agent)",
-    description="Calcula o RSI (Índice de Força Relativa) manualmente a partir de dados de preços.",
+    description="Calcula o RSI (Índice de Força Relativa) e outros indicadores técnicos a partir de dados de preços.",
     version="1.3.0" # Reverted to simpler EMA formula
 )
+install_metrics(app, AgentName.CRONOS.value)
+install_tracing(app, AgentName.CRONOS.value)
 
 def calculate_manual_rsi(prices: list[float], period: int = 14) -> float:
     """
@@ -43,17 +55,227 @@ def calculate_manual_rsi(prices: list[float], period: int = 14) -> float:
     return rsi[last_valid_rsi]
 
 
+def calculate_rsi_batch(price_matrix, period: int = 14) -> np.ndarray:
+    """
+    Versão vetorizada de `calculate_manual_rsi` para várias janelas de uma vez.
+    Cada linha da matriz é uma janela de preços; retorna o RSI da última posição de cada linha.
+
+    A EMA ajustada do pandas (`adjust=True`) no último ponto é uma média ponderada com pesos
+    (1 - alpha)^k, então o cálculo de todas as janelas se reduz a um produto matricial.
+    Janelas sem RSI definido (preços constantes) retornam NaN.
+    """
+    prices = np.asarray(price_matrix, dtype=float)
+    if prices.ndim != 2:
+        raise ValueError("A matriz de preços deve ser bidimensional (janelas x preços).")
+    if prices.shape[1] < period + 1:
+        raise ValueError("Dados insuficientes para calcular o RSI para o período especificado.")
+
+    # Mesmo truncamento da versão escalar, para resultados idênticos
+    truncation_limit = max(500, period * 35)
+    if prices.shape[1] > truncation_limit:
+        prices = prices[:, -truncation_limit:]
+
+    delta = np.diff(prices, axis=1)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+
+    # O primeiro delta do pandas é NaN e vira ganho/perda 0: só entra no denominador
+    alpha = 1.0 / period
+    weights = (1.0 - alpha) ** np.arange(prices.shape[1] - 1, -1, -1)
+    avg_gain = gains @ weights[1:] / weights.sum()
+    avg_loss = losses @ weights[1:] / weights.sum()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+INDICATORS = ("rsi", "macd", "bollinger", "atr", "stochastic")
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BOLLINGER_PERIOD, BOLLINGER_WIDTH = 20, 2.0
+ATR_PERIOD = 14
+STOCHASTIC_PERIOD, STOCHASTIC_SMOOTHING = 14, 3
+
+
+def parse_indicators(value: str) -> Tuple[str, ...]:
+    """Converte a lista separada por vírgulas (ou "all") nos indicadores a calcular. O RSI é sempre incluído."""
+    names = INDICATORS if value.strip() == "all" else tuple(n.strip() for n in value.split(",") if n.strip())
+    unknown = [n for n in names if n not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Indicadores desconhecidos: {', '.join(unknown)}. Use {', '.join(INDICATORS)} ou all.")
+    return tuple(n for n in INDICATORS if n == "rsi" or n in names)
+
+
+def ema_series(values: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Série completa da EMA ajustada (equivalente a `pd.Series(values).ewm(alpha=alpha).mean()`),
+    vetorizada: o numerador de cada ponto é uma soma acumulada com pesos (1 - alpha)^-k.
+    A série é processada em blocos para que esses pesos não estourem o float64.
+    """
+    decay = 1.0 - alpha
+    block = max(1, int(500 / -math.log(decay)))
+    numerator = np.empty(len(values))
+    carry = 0.0
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        steps = np.arange(len(chunk))
+        numerator[start:start + len(chunk)] = decay ** steps * (decay * carry + np.cumsum(chunk * decay ** -steps))
+        carry = numerator[start + len(chunk) - 1]
+    denominator = (1.0 - decay ** np.arange(1, len(values) + 1)) / alpha
+    return numerator / denominator
+
+
+def calculate_indicators(prices, high=None, low=None, indicators: Tuple[str, ...] = INDICATORS,
+                         rsi_period: int = 14) -> dict:
+    """
+    Calcula os indicadores pedidos em uma única passada vetorizada sobre a janela de preços.
+
+    Os intermediários são compartilhados: as variações de preço alimentam o RSI e o ATR,
+    que também usam os mesmos pesos da EMA de Wilder (alpha = 1 / 14); as EMAs do MACD são
+    calculadas uma vez como séries completas. O RSI é idêntico ao de `calculate_manual_rsi`
+    (mesma EMA ajustada e mesmo truncamento). Sem `high`/`low`, ATR e estocástico usam
+    apenas os fechamentos. As bandas de Bollinger usam o desvio padrão populacional.
+    """
+    prices = np.asarray(prices, dtype=float)
+    required = {"rsi": rsi_period + 1, "macd": MACD_SLOW, "bollinger": BOLLINGER_PERIOD,
+                "atr": ATR_PERIOD + 1, "stochastic": STOCHASTIC_PERIOD + STOCHASTIC_SMOOTHING - 1}
+    for name in indicators:
+        if len(prices) < required[name]:
+            raise ValueError(f"Dados insuficientes para calcular {name}: são necessários pelo menos {required[name]} preços.")
+    if (high is None) != (low is None):
+        raise ValueError("As colunas high e low devem ser enviadas juntas.")
+    if high is not None:
+        high, low = np.asarray(high, dtype=float), np.asarray(low, dtype=float)
+        if len(high) != len(prices) or len(low) != len(prices):
+            raise ValueError("As colunas high e low devem estar alinhadas com os preços.")
+
+    # Mesmo truncamento do RSI: as EMAs já convergiram muito antes desse ponto
+    truncation_limit = max(500, rsi_period * 35)
+    if len(prices) > truncation_limit:
+        prices = prices[-truncation_limit:]
+        if high is not None:
+            high, low = high[-truncation_limit:], low[-truncation_limit:]
+
+    delta = np.diff(prices)
+    results = {}
+
+    if "rsi" in indicators:
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+        # O primeiro delta do pandas é NaN e vira ganho/perda 0: só entra no denominador
+        weights = (1.0 - 1.0 / rsi_period) ** np.arange(len(prices) - 1, -1, -1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - 100 / (1 + (gains @ weights[1:]) / (losses @ weights[1:]))
+        # RSI indefinido no último ponto: recua até o último valor válido, como a versão com pandas
+        results["rsi"] = float(rsi) if np.isfinite(rsi) else calculate_manual_rsi(prices, rsi_period)
+
+    if "atr" in indicators:
+        if high is None:
+            true_range = np.abs(delta)
+        else:
+            previous = prices[:-1]
+            true_range = np.maximum(high[1:] - low[1:], np.maximum(np.abs(high[1:] - previous), np.abs(low[1:] - previous)))
+        if "rsi" in indicators and rsi_period == ATR_PERIOD:
+            atr_weights = weights[1:]
+        else:
+            atr_weights = (1.0 - 1.0 / ATR_PERIOD) ** np.arange(len(true_range) - 1, -1, -1)
+        results["atr"] = float(true_range @ atr_weights / atr_weights.sum())
+
+    if "macd" in indicators:
+        line = ema_series(prices, 2 / (MACD_FAST + 1)) - ema_series(prices, 2 / (MACD_SLOW + 1))
+        signal = ema_series(line, 2 / (MACD_SIGNAL + 1))
+        results["macd"] = {"macd": float(line[-1]), "signal": float(signal[-1]), "histogram": float(line[-1] - signal[-1])}
+
+    if "bollinger" in indicators:
+        recent = prices[-BOLLINGER_PERIOD:]
+        middle, width = recent.mean(), BOLLINGER_WIDTH * recent.std()
+        results["bollinger"] = {"upper": float(middle + width), "middle": float(middle), "lower": float(middle - width)}
+
+    if "stochastic" in indicators:
+        lookback = STOCHASTIC_PERIOD + STOCHASTIC_SMOOTHING - 1
+        highs = np.lib.stride_tricks.sliding_window_view((prices if high is None else high)[-lookback:], STOCHASTIC_PERIOD).max(axis=1)
+        lows = np.lib.stride_tricks.sliding_window_view((prices if low is None else low)[-lookback:], STOCHASTIC_PERIOD).min(axis=1)
+        ranges = highs - lows
+        # Faixa nula (preços constantes): %K neutro
+        k = np.where(ranges > 0, 100 * (prices[-STOCHASTIC_SMOOTHING:] - lows) / np.where(ranges > 0, ranges, 1.0), 50.0)
+        results["stochastic"] = {"k": float(k[-1]), "d": float(k.mean())}
+
+    return results
+
+
+class IncrementalRSI:
+    """
+    Estado incremental do RSI para um par (ativo, período), atualizado em O(1) por preço.
+
+    Mantém as médias de ganho e perda da mesma EMA ajustada usada por `calculate_manual_rsi`
+    (alpha = 1 / período), mas sobre todo o histórico recebido, sem truncamento.
+    """
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.decay = 1.0 - 1.0 / period
+        self.reset()
+
+    def reset(self):
+        """Descarta todo o histórico acumulado."""
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.weight_sum = 0.0
+        self.count = 0
+        self.last_price: Optional[float] = None
+        self.rsi: Optional[float] = None
+
+    def update(self, price: float) -> Optional[float]:
+        """Incorpora um novo preço e retorna o RSI atual (None durante o aquecimento)."""
+        # O primeiro preço entra com ganho/perda 0, como o delta NaN do pandas
+        delta = 0.0 if self.last_price is None else price - self.last_price
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        previous_weight = self.decay * self.weight_sum
+        self.weight_sum = previous_weight + 1.0
+        self.avg_gain = (previous_weight * self.avg_gain + gain) / self.weight_sum
+        self.avg_loss = (previous_weight * self.avg_loss + loss) / self.weight_sum
+        self.count += 1
+        self.last_price = price
+
+        # Sem ganhos nem perdas o RSI é indefinido: mantém o último valor válido
+        if self.count > self.period and (self.avg_gain > 0 or self.avg_loss > 0):
+            if self.avg_loss == 0:
+                self.rsi = 100.0
+            else:
+                self.rsi = 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+        return self.rsi
+
+    def seed(self, prices) -> Optional[float]:
+        """Reinicia o estado a partir de uma janela histórica completa."""
+        self.reset()
+        for price in prices:
+            self.update(float(price))
+        return self.rsi
+
+
+# Estado incremental por (ativo, período), mantido em memória pelo processo do Cronos
+rsi_states: Dict[Tuple[str, int], IncrementalRSI] = {}
+
+
 @app.post("/analyze",
             response_model=CronosTechnicalOutput,
             responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
             dependencies=[Depends(get_api_key)])
-async def analyze_rsi(request: AnalysisRequest):
+async def analyze_rsi(request: OHLCAnalysisRequest, indicators: str = "rsi"):
     """
-    Recebe uma lista de preços e retorna o RSI de 14 períodos.
+    Recebe uma lista de preços e retorna o RSI de 14 períodos e, opcionalmente, outros
+    indicadores (`indicators=rsi,macd,bollinger,atr,stochastic` ou `all`), todos calculados
+    na mesma passada. Máximas e mínimas (`high`/`low`) são usadas pelo ATR e pelo estocástico.
     """
     try:
-        rsi_value = calculate_manual_rsi(request.historical_prices)
-        return CronosTechnicalOutput(asset=request.asset, rsi=rsi_value)
+        prices = resolve_prices(request)
+        if prices is None:
+            raise ValueError("Nenhuma série de preços informada.")
+        selected = parse_indicators(indicators)
+        with span("computation", indicators=len(selected)):
+            results = calculate_indicators(prices, getattr(request, "high", None), getattr(request, "low", None), selected)
+        return CronosTechnicalOutput(asset=request.asset, **results)
     except ValueError as e:
         raise HTTPException(
             status_code=400,
@@ -65,6 +287,108 @@ async def analyze_rsi(request: AnalysisRequest):
             detail={"error": "Internal Server Error", "details": str(e), "source_agent": AgentName.CRONOS}
         )
 
+@app.post("/analyze_batch",
+            response_model=CronosBatchOutput,
+            dependencies=[Depends(get_api_key)])
+async def analyze_rsi_batch(batch: BatchAnalysisRequest, period: Annotated[int, Query(ge=2)] = 14):
+    """
+    Calcula o RSI de vários ativos de uma vez. Janelas de mesmo tamanho são
+    empilhadas e processadas por `calculate_rsi_batch` em uma única operação 2-D.
+    Erros de um ativo são reportados individualmente, sem falhar o lote.
+    """
+    output = CronosBatchOutput()
+    results = {}
+    windows = {}
+    for i, request in enumerate(batch.requests):
+        try:
+            prices = resolve_prices(request)
+        except ValueError as e:
+            output.errors.append(BatchItemError(index=i, asset=request.asset, error="Bad Request", details=str(e), source_agent=AgentName.CRONOS))
+            continue
+        if prices is None or len(prices) < period + 1:
+            output.errors.append(BatchItemError(
+                index=i, asset=request.asset, error="Bad Request", source_agent=AgentName.CRONOS,
+                details="Dados insuficientes para calcular o RSI para o período especificado."
+            ))
+        else:
+            windows[i] = prices
+
+    for group, price_matrix in group_price_windows(windows):
+        with span("computation", windows=len(group)):
+            rsi_values = calculate_rsi_batch(price_matrix, period)
+        for i, rsi_value in zip(group, rsi_values):
+            request = batch.requests[i]
+            try:
+                # RSI indefinido no último ponto: a versão escalar recua até o último valor válido
+                if not np.isfinite(rsi_value):
+                    rsi_value = calculate_manual_rsi(windows[i], period)
+                results[i] = CronosTechnicalOutput(asset=request.asset, rsi=float(rsi_value))
+            except ValueError as e:
+                output.errors.append(BatchItemError(index=i, asset=request.asset, error="Bad Request", details=str(e), source_agent=AgentName.CRONOS))
+
+    output.results = [results[i] for i in sorted(results)]
+    output.errors.sort(key=lambda e: e.index)
+    return output
+
+
+@app.post("/seed_rsi",
+            response_model=CronosTechnicalOutput,
+            responses={400: {"model": ErrorResponse}},
+            dependencies=[Depends(get_api_key)])
+async def seed_rsi(request: AnalysisRequest, period: int = 14):
+    """
+    Inicializa (ou reinicia) o estado incremental do RSI do ativo a partir do histórico completo.
+    Depois disso, basta enviar cada novo fechamento para `/analyze_tick`.
+    """
+    try:
+        prices = resolve_prices(request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Bad Request", "details": str(e), "source_agent": AgentName.CRONOS}
+        )
+    if prices is None:
+        prices = []
+    if period < 2 or len(prices) < period + 1:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Bad Request", "details": "Dados insuficientes para calcular o RSI para o período especificado.", "source_agent": AgentName.CRONOS}
+        )
+
+    state = IncrementalRSI(period)
+    with span("computation"):
+        rsi_value = state.seed(prices)
+    if rsi_value is None:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Bad Request", "details": "Não foi possível calcular um valor de RSI válido.", "source_agent": AgentName.CRONOS}
+        )
+
+    rsi_states[(request.asset, period)] = state
+    return CronosTechnicalOutput(asset=request.asset, rsi=rsi_value)
+
+
+@app.post("/analyze_tick",
+            response_model=CronosTechnicalOutput,
+            responses={409: {"model": ErrorResponse}},
+            dependencies=[Depends(get_api_key)])
+async def analyze_tick(tick: PriceTick):
+    """
+    Atualiza o RSI do ativo em O(1) com apenas o último preço de fechamento.
+    Requer que o estado tenha sido inicializado por `/seed_rsi`.
+    """
+    state = rsi_states.get((tick.asset, tick.period))
+    if state is None:
+        raise HTTPException(
+            status_code=409,
+            detail={"error": "Conflict", "details": f"Estado do RSI não inicializado para {tick.asset} (período {tick.period}). Use /seed_rsi.", "source_agent": AgentName.CRONOS}
+        )
+
+    with span("computation"):
+        rsi_value = state.update(tick.price)
+    return CronosTechnicalOutput(asset=tick.asset, rsi=rsi_value)
+
+
 @app.get("/health", summary="Endpoint de Health Check")
 def health():
     """Endpoint público para health checks."""
@@ -1,56 +1,78 @@
 from fastapi import FastAPI, Depends
-from saka.shared.models import ConsolidatedDataInput, KamilaFinalDecision, AgentName, TradeSignal, MacroImpact
+from saka.shared.models import (
+    ConsolidatedDataInput, KamilaFinalDecision, AgentName, TradeSignal,
+    KamilaBatchInput, KamilaBatchOutput, KamilaBatchDecision, BatchItemError
+)
 from saka.shared.security import get_api_key
+from saka.shared.decision_rules import evaluate_vetoes
+from saka.shared.metrics import install_metrics
+from saka.shared.tracing import install_tracing, traced
+import numpy as np
 
 app = FastAPI(
     title="Kamila (CEO Agent)",
     description="Toma decisões de negociação com base em dados consolidados de outros agentes.",
     version="1.2.0" # Added Orion's veto logic
 )
+install_metrics(app, AgentName.KAMILA.value)
+install_tracing(app, AgentName.KAMILA.value)
+
+RSI_OVERSOLD = 30
+RSI_OVERBOUGHT = 70
+TRADE_AMOUNT_USD = 100.0
+
+def decide_signals(can_trade, macro_high_impact, rsi,
+                   rsi_oversold: float = RSI_OVERSOLD, rsi_overbought: float = RSI_OVERBOUGHT) -> np.ndarray:
+    """
+    Versão vetorizada das regras de `make_decision` para muitas barras de uma vez.
+    Retorna um array com o lado de cada decisão ('buy', 'sell' ou 'hold').
+    RSI NaN (indefinido) nunca gera sinal.
+    """
+    can_trade = np.asarray(can_trade, dtype=bool)
+    macro_high_impact = np.asarray(macro_high_impact, dtype=bool)
+    rsi = np.asarray(rsi, dtype=float)
+
+    signals = np.full(rsi.shape, TradeSignal.HOLD.value, dtype=object)
+    no_veto = can_trade & ~macro_high_impact
+    signals[no_veto & (rsi < rsi_oversold)] = TradeSignal.BUY.value
+    signals[no_veto & (rsi > rsi_overbought)] = TradeSignal.SELL.value
+    return signals
 
 @app.post("/decide",
             response_model=KamilaFinalDecision,
             dependencies=[Depends(get_api_key)])
+@traced("computation")
 async def make_decision(data: ConsolidatedDataInput):
     """
     Lógica de decisão da Kamila, agora incorporando o veto macroeconômico do Orion.
     """
-    # 1. Veto de Risco do Sentinel (Prioridade Máxima)
-    if not data.sentinel_analysis.can_trade:
-        return KamilaFinalDecision(
-            action="hold",
-            reason=f"VETO (Sentinel): {data.sentinel_analysis.reason}"
-        )
-
-    # 2. Veto de Evento Macroeconômico do Orion (Segunda Prioridade)
-    if data.orion_analysis.impact == MacroImpact.HIGH:
-        return KamilaFinalDecision(
-            action="hold",
-            reason=f"VETO (Orion): {data.orion_analysis.summary}"
-        )
+    # 1 e 2. Vetos de risco (Sentinel) e macroeconômico (Orion), nessa ordem de prioridade
+    veto = evaluate_vetoes(data.sentinel_analysis, data.orion_analysis)
+    if veto is not None:
+        return veto
 
     # 3. Lógica de Sinais Técnicos (Apenas se não houver vetos)
     rsi = data.cronos_analysis.rsi
 
-    if rsi < 30:
+    if rsi < RSI_OVERSOLD:
         return KamilaFinalDecision(
             action="execute_trade",
             agent_target=AgentName.AETHERTRADER,
             asset=data.asset,
             trade_type="market",
             side=TradeSignal.BUY,
-            amount_usd=100.0,
+            amount_usd=TRADE_AMOUNT_USD,
             reason=f"SINAL DE COMPRA: RSI ({rsi:.2f}) indica ativo sobrevendido."
         )
 
-    if rsi > 70:
+    if rsi > RSI_OVERBOUGHT:
         return KamilaFinalDecision(
             action="execute_trade",
             agent_target=AgentName.AETHERTRADER,
             asset=data.asset,
             trade_type="market",
             side=TradeSignal.SELL,
-            amount_usd=100.0,
+            amount_usd=TRADE_AMOUNT_USD,
             reason=f"SINAL DE VENDA: RSI ({rsi:.2f}) indica ativo sobrecomprado."
         )
 
@@ -60,6 +82,22 @@ async def make_decision(data: ConsolidatedDataInput):
         reason=f"HOLD: Nenhum sinal claro. RSI ({rsi:.2f}) está neutro. Impacto macro: {data.orion_analysis.impact}."
     )
 
+@app.post("/decide_batch",
+            response_model=KamilaBatchOutput,
+            dependencies=[Depends(get_api_key)])
+async def make_decision_batch(batch: KamilaBatchInput):
+    """
+    Aplica a lógica de decisão a vários ativos em uma única chamada.
+    Erros de um ativo são reportados individualmente, sem falhar o lote.
+    """
+    output = KamilaBatchOutput()
+    for i, data in enumerate(batch.items):
+        try:
+            output.decisions.append(KamilaBatchDecision(asset=data.asset, decision=await make_decision(data)))
+        except Exception as e:
+            output.errors.append(BatchItemError(index=i, asset=data.asset, error="Internal Server Error", details=str(e), source_agent=AgentName.KAMILA))
+    return output
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
\ No newline at end of file
@@ -1,6 +1,8 @@
 from fastapi import FastAPI, Depends
-from saka.shared.models import AnalysisRequest, ErrorResponse, AgentName
+from saka.shared.models import AnalysisRequest, ErrorResponse, AgentName, BatchAnalysisRequest, OrionBatchOutput
 from saka.shared.security import get_api_key
+from saka.shared.metrics import install_metrics
+from saka.shared.tracing import install_tracing, traced
 import random
 
 app = FastAPI(
@@ -8,17 +10,23 @@ app = FastAPI(
     description="Analisa o calendário macroeconômico em busca de eventos de alto impacto.",
     version="1.0.0"
 )
+install_metrics(app, AgentName.ORION.value)
+install_tracing(app, AgentName.ORION.value)
+
+# Probabilidade diária simulada de um evento de alto impacto (ex: CPI, FOMC)
+HIGH_IMPACT_PROBABILITY = 0.1
 
 # Em um sistema real, isso seria uma chamada a uma API de calendário econômico.
 # Aqui, simulamos o resultado para fins de arquitetura.
 @app.post("/analyze_events", dependencies=[Depends(get_api_key)])
+@traced("computation")
 async def analyze_events(request: AnalysisRequest):
     """
     Simula a análise de eventos macroeconômicos.
     Retorna um nível de impacto que pode ser usado como veto.
     """
     # Simula que em 10% dos dias há um evento de alto impacto (ex: CPI, FOMC)
-    if random.random() < 0.1:
+    if random.random() < HIGH_IMPACT_PROBABILITY:
         return {
             "asset": request.asset,
             "impact": "high",
@@ -33,6 +41,11 @@ async def analyze_events(request: AnalysisRequest):
         "summary": "Nenhum evento de alto impacto detectado."
     }
 
+@app.post("/analyze_events_batch", response_model=OrionBatchOutput, dependencies=[Depends(get_api_key)])
+async def analyze_events_batch(batch: BatchAnalysisRequest):
+    """Simula a análise de eventos macroeconômicos para vários ativos em uma única chamada."""
+    return OrionBatchOutput(results=[await analyze_events(request) for request in batch.requests])
+
 @app.get("/health", summary="Endpoint de Health Check")
 def health():
     """Endpoint público para health checks."""
@@ -1,6 +1,18 @@
 from fastapi import FastAPI, HTTPException, Depends
-from saka.shared.models import AnalysisRequest, SentinelRiskOutput, ErrorResponse, AgentName
+from saka.shared.models import (
+    AnalysisRequest, SentinelRiskOutput, ErrorResponse, AgentName,
+    BatchAnalysisRequest, SentinelBatchOutput, BatchItemError,
+    OHLCAnalysisRequest, PriceBar
+)
 from saka.shared.security import get_api_key
+from saka.shared.metrics import install_metrics
+from saka.shared.tracing import install_tracing, span
+from saka.shared.batching import group_price_windows
+from saka.shared.price_codec import resolve_prices
+from saka.shared.rolling_window import RollingWindow
+from typing import Dict, Optional
+import math
+import os
 import numpy as np
 
 app = FastAPI(
@@ -8,8 +20,157 @@ app = FastAPI(
     description="Calcula a volatilidade e avalia o risco de negociação.",
     version="1.1.0" # Version bump
 )
+install_metrics(app, AgentName.SENTINEL.value)
+install_tracing(app, AgentName.SENTINEL.value)
 
 VOLATILITY_THRESHOLD = 0.05 # Variação diária de 5%
+MIN_PRICE_POINTS = 10
+# Janela (em preços) do estado incremental e fator de decaimento padrão da EWMA (RiskMetrics)
+VOLATILITY_WINDOW = int(os.getenv("SENTINEL_VOLATILITY_WINDOW", "30"))
+EWMA_LAMBDA = 0.94
+GARMAN_KLASS_CLOSE_WEIGHT = 2 * math.log(2) - 1
+
+def build_risk_output(asset: str, volatility: float, **estimators) -> SentinelRiskOutput:
+    """Converte a volatilidade calculada na avaliação de risco do Sentinel."""
+    can_trade = volatility <= VOLATILITY_THRESHOLD
+    risk_level = min(volatility / (VOLATILITY_THRESHOLD * 2), 1.0)
+
+    return SentinelRiskOutput(
+        asset=asset,
+        risk_level=risk_level,
+        volatility=volatility,
+        can_trade=can_trade,
+        reason=f"Volatilidade calculada: {volatility:.4f}. Limite: {VOLATILITY_THRESHOLD:.4f}.",
+        **estimators
+    )
+
+def calculate_volatility_batch(price_matrix) -> np.ndarray:
+    """
+    Calcula a volatilidade (desvio padrão dos retornos) de várias janelas de uma vez.
+    Cada linha da matriz é uma janela de preços, exatamente como a recebida por `/analyze`.
+    """
+    prices = np.asarray(price_matrix, dtype=float)
+    if prices.ndim != 2:
+        raise ValueError("A matriz de preços deve ser bidimensional (janelas x preços).")
+
+    returns = np.diff(prices, axis=1) / prices[:, :-1]
+    return np.std(returns, axis=1)
+
+class SlidingWelford:
+    """
+    Média e variância dos últimos `capacity` valores pelo algoritmo de Welford com janela
+    deslizante: cada valor novo entra e o mais antigo sai em O(1), sem as somas de quadrados
+    que perdem precisão quando a média é grande em relação à dispersão.
+    """
+    def __init__(self, capacity: int):
+        self.window = RollingWindow(capacity)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def __len__(self) -> int:
+        return len(self.window)
+
+    def update(self, value: float):
+        if self.window.full:
+            removed = float(self.window.values()[0])
+            previous_mean = self.mean
+            self.mean += (value - removed) / len(self.window)
+            self.m2 += (value - removed) * (value - self.mean + removed - previous_mean)
+        else:
+            delta = value - self.mean
+            self.mean += delta / (len(self.window) + 1)
+            self.m2 += delta * (value - self.mean)
+        self.m2 = max(self.m2, 0.0)
+        self.window.append(value)
+
+    def std(self) -> Optional[float]:
+        """Desvio padrão populacional (como `np.std`) da janela."""
+        return math.sqrt(self.m2 / len(self.window)) if len(self.window) else None
+
+
+class VolatilityState:
+    """
+    Estado incremental da volatilidade de um ativo, atualizado em O(1) por barra.
+
+    - `volatility`: desvio padrão dos retornos dos últimos `window` preços (Welford deslizante),
+      o mesmo valor que `/analyze` calcula sobre essa janela;
+    - `ewma_volatility`: volatilidade EWMA dos retornos, se `ewma_lambda` for informado;
+    - `parkinson_volatility` e `garman_klass_volatility`: estimadores por faixa sobre as
+      últimas `window` barras, quando a barra traz abertura, máxima e mínima.
+
+    Barras com abertura ou mínima nulas (ex: a primeira linha do CSV da Gemini) ou faixa
+    inconsistente ficam de fora dos estimadores por faixa, mas o fechamento é usado normalmente.
+    """
+    def __init__(self, window: int = VOLATILITY_WINDOW, ewma_lambda: Optional[float] = None):
+        self.window = window
+        self.ewma_lambda = ewma_lambda
+        self.returns = SlidingWelford(window - 1)
+        self.parkinson_terms = RollingWindow(window)
+        self.garman_klass_terms = RollingWindow(window)
+        self.ewma_variance: Optional[float] = None
+        self.last_close: Optional[float] = None
+        self.bars = 0
+        self.skipped_range_bars = 0
+
+    def update(self, close: float, open: Optional[float] = None, high: Optional[float] = None,
+               low: Optional[float] = None):
+        if self.last_close is not None and self.last_close > 0:
+            ret = (close - self.last_close) / self.last_close
+            self.returns.update(ret)
+            if self.ewma_lambda is not None:
+                squared = ret * ret
+                self.ewma_variance = squared if self.ewma_variance is None else (
+                    self.ewma_lambda * self.ewma_variance + (1 - self.ewma_lambda) * squared
+                )
+        self.last_close = close
+        self.bars += 1
+
+        if open is None and high is None and low is None:
+            return
+        if not open or not low or high is None or high < low or close <= 0:
+            self.skipped_range_bars += 1
+            return
+        log_range = math.log(high / low) ** 2
+        self.parkinson_terms.append(log_range)
+        self.garman_klass_terms.append(0.5 * log_range - GARMAN_KLASS_CLOSE_WEIGHT * math.log(close / open) ** 2)
+
+    def seed(self, closes, opens=None, highs=None, lows=None):
+        """Reinicia o estado a partir de uma janela histórica (abertura, máxima e mínima opcionais)."""
+        self.__init__(self.window, self.ewma_lambda)
+        for i, close in enumerate(closes):
+            if opens is None:
+                self.update(float(close))
+            else:
+                self.update(float(close), float(opens[i]), float(highs[i]), float(lows[i]))
+
+    @property
+    def volatility(self) -> Optional[float]:
+        return self.returns.std()
+
+    @property
+    def ewma_volatility(self) -> Optional[float]:
+        return None if self.ewma_variance is None else math.sqrt(self.ewma_variance)
+
+    @property
+    def parkinson_volatility(self) -> Optional[float]:
+        mean = self.parkinson_terms.mean()
+        return None if mean is None else math.sqrt(max(mean, 0.0) / (4 * math.log(2)))
+
+    @property
+    def garman_klass_volatility(self) -> Optional[float]:
+        mean = self.garman_klass_terms.mean()
+        return None if mean is None else math.sqrt(max(mean, 0.0))
+
+    def output(self, asset: str) -> SentinelRiskOutput:
+        return build_risk_output(
+            asset, self.volatility, ewma_volatility=self.ewma_volatility,
+            parkinson_volatility=self.parkinson_volatility, garman_klass_volatility=self.garman_klass_volatility
+        )
+
+
+# Estado incremental por ativo, mantido em memória pelo processo do Sentinel
+volatility_states: Dict[str, VolatilityState] = {}
+
 
 @app.post("/analyze",
             response_model=SentinelRiskOutput,
@@ -20,7 +181,15 @@ async def analyze_risk(request: AnalysisRequest):
     Analisa o risco de um ativo calculando a volatilidade de seus preços.
     Este endpoint é protegido e requer uma chave de API interna.
     """
-    if not request.historical_prices or len(request.historical_prices) < 10:
+    try:
+        prices = resolve_prices(request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Bad Request", "details": str(e), "source_agent": AgentName.SENTINEL}
+        )
+
+    if prices is None or len(prices) < MIN_PRICE_POINTS:
         raise HTTPException(
             status_code=400,
             detail={
@@ -31,20 +200,11 @@ async def analyze_risk(request: AnalysisRequest):
         )
 
     try:
-        prices = np.array(request.historical_prices)
-        returns = np.diff(prices) / prices[:-1]
-        volatility = np.std(returns)
-
-        can_trade = volatility <= VOLATILITY_THRESHOLD
-        risk_level = min(volatility / (VOLATILITY_THRESHOLD * 2), 1.0)
-
-        return SentinelRiskOutput(
-            asset=request.asset,
-            risk_level=risk_level,
-            volatility=volatility,
-            can_trade=can_trade,
-            reason=f"Volatilidade calculada: {volatility:.4f}. Limite: {VOLATILITY_THRESHOLD:.4f}."
-        )
+        with span("computation"):
+            returns = np.diff(prices) / prices[:-1]
+            volatility = np.std(returns)
+
+        return build_risk_output(request.asset, volatility)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -55,6 +215,103 @@ async def analyze_risk(request: AnalysisRequest):
             }
         )
 
+@app.post("/analyze_batch",
+            response_model=SentinelBatchOutput,
+            dependencies=[Depends(get_api_key)])
+async def analyze_risk_batch(batch: BatchAnalysisRequest):
+    """
+    Analisa o risco de vários ativos de uma vez. Janelas de mesmo tamanho são
+    empilhadas e a volatilidade é calculada em uma única operação 2-D.
+    Erros de um ativo são reportados individualmente, sem falhar o lote.
+    """
+    output = SentinelBatchOutput()
+    results = {}
+    windows = {}
+    for i, request in enumerate(batch.requests):
+        try:
+            prices = resolve_prices(request)
+        except ValueError as e:
+            output.errors.append(BatchItemError(index=i, asset=request.asset, error="Bad Request", details=str(e), source_agent=AgentName.SENTINEL))
+            continue
+        if prices is None or len(prices) < MIN_PRICE_POINTS:
+            output.errors.append(BatchItemError(
+                index=i, asset=request.asset, error="Bad Request", source_agent=AgentName.SENTINEL,
+                details=f"Dados de preços históricos insuficientes. São necessários pelo menos {MIN_PRICE_POINTS} pontos."
+            ))
+        else:
+            windows[i] = prices
+
+    for group, price_matrix in group_price_windows(windows):
+        with span("computation", windows=len(group)), np.errstate(divide="ignore", invalid="ignore"):
+            volatility = calculate_volatility_batch(price_matrix)
+        for i, value in zip(group, volatility):
+            if np.isfinite(value):
+                results[i] = build_risk_output(batch.requests[i].asset, float(value))
+            else:
+                output.errors.append(BatchItemError(
+                    index=i, asset=batch.requests[i].asset, error="Bad Request", source_agent=AgentName.SENTINEL,
+                    details="Não foi possível calcular a volatilidade (preços nulos ou inválidos)."
+                ))
+
+    output.results = [results[i] for i in sorted(results)]
+    output.errors.sort(key=lambda e: e.index)
+    return output
+
+@app.post("/seed_volatility",
+            response_model=SentinelRiskOutput,
+            responses={400: {"model": ErrorResponse}},
+            dependencies=[Depends(get_api_key)])
+async def seed_volatility(request: OHLCAnalysisRequest, window: int = VOLATILITY_WINDOW, ewma_lambda: Optional[float] = None):
+    """
+    Inicializa (ou reinicia) o estado incremental da volatilidade do ativo a partir do histórico.
+    Com as colunas `open`, `high` e `low`, também calcula os estimadores de Parkinson e Garman-Klass.
+    Depois disso, basta enviar cada nova barra para `/analyze_bar`.
+    """
+    try:
+        prices = resolve_prices(request)
+        if prices is None or len(prices) < MIN_PRICE_POINTS or window < MIN_PRICE_POINTS:
+            raise ValueError(f"Dados de preços históricos insuficientes. São necessários pelo menos {MIN_PRICE_POINTS} pontos.")
+        if ewma_lambda is not None and not 0 < ewma_lambda < 1:
+            raise ValueError("O fator de decaimento da EWMA deve estar entre 0 e 1.")
+        columns = [request.open, request.high, request.low]
+        if any(c is not None for c in columns):
+            if any(c is None or len(c) != len(prices) for c in columns):
+                raise ValueError("As colunas open, high e low devem ser enviadas juntas e alinhadas com os preços.")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Bad Request", "details": str(e), "source_agent": AgentName.SENTINEL}
+        )
+
+    state = VolatilityState(window, ewma_lambda)
+    with span("computation"):
+        # Só a última janela influencia a volatilidade deslizante; a EWMA usa o histórico inteiro
+        start = 0 if ewma_lambda is not None else max(0, len(prices) - window)
+        state.seed(prices[start:], *(None if c is None else c[start:] for c in columns))
+    volatility_states[request.asset] = state
+    return state.output(request.asset)
+
+
+@app.post("/analyze_bar",
+            response_model=SentinelRiskOutput,
+            responses={409: {"model": ErrorResponse}},
+            dependencies=[Depends(get_api_key)])
+async def analyze_bar(bar: PriceBar):
+    """
+    Atualiza a volatilidade do ativo em O(1) com apenas a última barra.
+    Requer que o estado tenha sido inicializado por `/seed_volatility`.
+    """
+    state = volatility_states.get(bar.asset)
+    if state is None:
+        raise HTTPException(
+            status_code=409,
+            detail={"error": "Conflict", "details": f"Estado de volatilidade não inicializado para {bar.asset}. Use /seed_volatility.", "source_agent": AgentName.SENTINEL}
+        )
+
+    with span("computation"):
+        state.update(bar.close, bar.open, bar.high, bar.low)
+    return state.output(bar.asset)
+
 @app.get("/health", summary="Endpoint de Health Check")
 def health():
     """Endpoint público para health checks. Não requer autenticação."""
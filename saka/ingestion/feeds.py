@@ -0,0 +1,117 @@
+import asyncio
+import time
+from typing import AsyncIterator, Iterable, List, NamedTuple, Optional
+import numpy as np
+from saka.shared.market_data import load_ohlcv_columns
+
+
+class Tick(NamedTuple):
+    """Negócio ou cotação individual de um ativo."""
+    asset: str
+    timestamp: float
+    price: float
+    volume: float = 0.0
+
+
+class Bar(NamedTuple):
+    """Barra OHLCV fechada; `timestamp` é o início da barra em segundos (epoch)."""
+    asset: str
+    timestamp: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+async def replay_bars(filepath: str, asset: str = "BTC/USD", speed: float = 0.0,
+                      start: Optional[int] = None, limit: Optional[int] = None) -> AsyncIterator[Bar]:
+    """
+    Reproduz as barras de um CSV histórico (qualquer formato aceito por `load_ohlcv_columns`).
+    Com `speed` > 0 respeita o intervalo entre as barras dividido por `speed`
+    (ex: barras diárias com speed=86400 saem uma por segundo); com 0, o mais rápido possível.
+    """
+    columns = load_ohlcv_columns(filepath)
+    timestamps = np.asarray(columns["timestamp"])
+    first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+    last = len(timestamps) if limit is None else min(len(timestamps), first + limit)
+
+    previous = None
+    for i in range(first, last):
+        timestamp = int(timestamps[i])
+        if speed > 0 and previous is not None:
+            await asyncio.sleep((timestamp - previous) / speed)
+        else:
+            # Cede o laço de eventos mesmo no modo mais rápido
+            await asyncio.sleep(0)
+        previous = timestamp
+        yield Bar(asset, timestamp, float(columns["open"][i]), float(columns["high"][i]), float(columns["low"][i]),
+                  float(columns["close"][i]), float(columns["volume"][i]))
+
+
+async def simulate_ticks(assets: Iterable[str], ticks_per_second: float = 10.0, volatility: float = 0.001,
+                         start_price: float = 100.0, seed: Optional[int] = None, start_time: Optional[float] = None,
+                         limit: Optional[int] = None, realtime: bool = False) -> AsyncIterator[Tick]:
+    """
+    Simulador local de mercado: um passeio aleatório geométrico por ativo, com um tick de cada
+    ativo a cada 1/`ticks_per_second` segundos de tempo simulado. Com `realtime`, espera esse
+    intervalo de verdade; sem ele, os ticks saem o mais rápido possível (útil em testes).
+    """
+    assets = list(assets)
+    rng = np.random.default_rng(seed)
+    prices = np.full(len(assets), start_price, dtype=float)
+    clock = time.time() if start_time is None else start_time
+    step = 1.0 / ticks_per_second
+
+    emitted = 0
+    while limit is None or emitted < limit:
+        prices *= np.exp(rng.normal(0.0, volatility, len(assets)))
+        volumes = rng.exponential(1.0, len(assets))
+        for asset, price, volume in zip(assets, prices, volumes):
+            if limit is not None and emitted >= limit:
+                return
+            yield Tick(asset, clock, float(price), float(volume))
+            emitted += 1
+        await asyncio.sleep(step if realtime else 0)
+        clock += step
+
+
+class BarAggregator:
+    """Agrega ticks em barras de `interval` segundos; uma barra fecha quando chega um tick da barra seguinte."""
+    def __init__(self, interval: int):
+        self.interval = interval
+        self.open_bars = {}
+
+    def add(self, tick: Tick) -> Optional[Bar]:
+        """Incorpora o tick e retorna a barra do ativo que acabou de fechar, se houver."""
+        start = int(tick.timestamp // self.interval * self.interval)
+        current = self.open_bars.get(tick.asset)
+        closed = None
+        if current is not None and current.timestamp != start:
+            closed = current
+            current = None
+        if current is None:
+            current = Bar(tick.asset, start, tick.price, tick.price, tick.price, tick.price, tick.volume)
+        else:
+            current = current._replace(high=max(current.high, tick.price), low=min(current.low, tick.price),
+                                       close=tick.price, volume=current.volume + tick.volume)
+        self.open_bars[tick.asset] = current
+        return closed
+
+    def flush(self) -> List[Bar]:
+        """Fecha e retorna as barras em aberto (ex: no fim do fluxo)."""
+        bars = list(self.open_bars.values())
+        self.open_bars.clear()
+        return bars
+
+
+async def ticks_to_bars(ticks: AsyncIterator[Tick], interval: int, flush: bool = True) -> AsyncIterator[Bar]:
+    """Converte um fluxo de ticks em um fluxo de barras fechadas de `interval` segundos."""
+    aggregator = BarAggregator(interval)
+    async for tick in ticks:
+        bar = aggregator.add(tick)
+        if bar is not None:
+            yield bar
+    if flush:
+        for bar in aggregator.flush():
+            yield bar
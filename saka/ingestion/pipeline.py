@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+import httpx
+
+# Permite importar o pacote saka ao executar o módulo diretamente
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from saka.shared.models import AnalysisRequest, PriceSeriesRef
+from saka.shared.price_store import PriceStore
+from saka.ingestion.feeds import Bar, replay_bars, simulate_ticks, ticks_to_bars
+from saka.ingestion.windows import AssetWindows
+
+TRIGGERS = ("bar_close", "schedule")
+
+DecisionFn = Callable[[AnalysisRequest], Awaitable[dict]]
+
+
+class IngestionPipeline:
+    """
+    Consome um fluxo de barras, mantém a janela de fechamentos de cada ativo e dispara ciclos
+    de decisão no fechamento de cada barra (`bar_close`) ou a cada `interval` segundos (`schedule`).
+
+    Com um `store`, cada barra é acrescentada ao armazenamento de preços compartilhado e os
+    ciclos enviam apenas uma referência à janela (`price_ref`): os agentes leem os preços do
+    armazenamento em vez de receberem a janela inteira a cada ciclo. Sem ele, a janela vai na
+    requisição (`historical_prices`).
+
+    Por padrão a ingestão não espera os ciclos: se o ciclo anterior de um ativo ainda estiver
+    em andamento quando a próxima barra fechar, o novo ciclo é descartado (`skipped`). Com
+    `wait_for_cycles`, cada barra só é consumida depois do ciclo que ela disparou.
+    """
+    def __init__(self, decide: DecisionFn, window: int = 100, min_points: int = 30, trigger: str = "bar_close",
+                 interval: float = 60.0, store: Optional[PriceStore] = None, wait_for_cycles: bool = False,
+                 on_decision: Optional[Callable[[str, int, dict], None]] = None):
+        if trigger not in TRIGGERS:
+            raise ValueError(f"Gatilho inválido: {trigger}. Use um de {TRIGGERS}.")
+        self.decide = decide
+        self.min_points = min(min_points, window)
+        self.trigger = trigger
+        self.interval = interval
+        self.store = store
+        self.wait_for_cycles = wait_for_cycles
+        self.on_decision = on_decision
+        self.windows = AssetWindows(window)
+        self.decisions: Dict[str, dict] = {}
+        self.stats = {"bars": 0, "cycles": 0, "skipped": 0, "errors": 0}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def ready(self, asset: str) -> bool:
+        return len(self.windows[asset]) >= self.min_points
+
+    def build_request(self, asset: str) -> AnalysisRequest:
+        if self.store is not None:
+            # Janela exata até a última barra recebida, mesmo que novas barras cheguem durante o ciclo
+            end = self.windows.last_timestamp[asset] + 1
+            return AnalysisRequest(asset=asset, price_ref=PriceSeriesRef(end=end, limit=self.windows.capacity))
+        return AnalysisRequest(asset=asset, historical_prices=self.windows[asset].values().tolist())
+
+    async def ingest(self, bar: Bar):
+        if self.store is not None:
+            try:
+                self.store.append(bar.asset, [bar.timestamp], open=[bar.open], high=[bar.high], low=[bar.low],
+                                  close=[bar.close], volume=[bar.volume])
+            except ValueError as e:
+                # Barra já gravada (ex: replay sobre um armazenamento existente): a janela continua válida
+                if "append-only" not in str(e):
+                    raise
+        self.windows.append(bar.asset, bar.timestamp, bar.close)
+        self.stats["bars"] += 1
+
+        if self.trigger == "bar_close" and self.ready(bar.asset):
+            task = self.start_cycle(bar.asset)
+            if task is not None and self.wait_for_cycles:
+                await task
+
+    def start_cycle(self, asset: str) -> Optional[asyncio.Task]:
+        """Dispara um ciclo para o ativo, a menos que o anterior ainda esteja em andamento."""
+        if asset in self._in_flight:
+            self.stats["skipped"] += 1
+            return None
+        task = asyncio.ensure_future(self.run_cycle(asset, self.build_request(asset), self.windows.last_timestamp[asset]))
+        self._in_flight[asset] = task
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: (self._tasks.discard(t), self._in_flight.pop(asset, None)))
+        return task
+
+    async def run_cycle(self, asset: str, request: AnalysisRequest, timestamp: int):
+        try:
+            decision = await self.decide(request)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"[INGESTÃO] Falha no ciclo de decisão de {asset}: {e}")
+            return
+        self.stats["cycles"] += 1
+        self.decisions[asset] = decision
+        if self.on_decision is not None:
+            self.on_decision(asset, timestamp, decision)
+
+    async def _schedule_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            for asset in self.windows.assets():
+                if self.ready(asset):
+                    self.start_cycle(asset)
+
+    async def run(self, bars: AsyncIterator[Bar]):
+        """Consome o fluxo até o fim e espera os ciclos em andamento."""
+        scheduler = asyncio.ensure_future(self._schedule_loop()) if self.trigger == "schedule" else None
+        try:
+            async for bar in bars:
+                await self.ingest(bar)
+        finally:
+            if scheduler is not None:
+                scheduler.cancel()
+            if self._tasks:
+                await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+def orchestrator_decider(client: httpx.AsyncClient, orchestrator_url: str, api_key: Optional[str]) -> DecisionFn:
+    """Executa os ciclos pelo endpoint síncrono do Orquestrador."""
+    async def decide(request: AnalysisRequest) -> dict:
+        response = await client.post(
+            f"{orchestrator_url.rstrip('/')}/trigger_decision_cycle_sync",
+            json=request.dict(exclude_none=True), headers={"X-Internal-API-Key": api_key or ""}
+        )
+        response.raise_for_status()
+        return response.json()
+    return decide
+
+
+async def main(args):
+    if args.source == "replay":
+        bars = replay_bars(args.file, args.asset, speed=args.speed, limit=args.limit)
+    else:
+        assets = [a.strip() for a in args.assets.split(",") if a.strip()]
+        ticks = simulate_ticks(assets, ticks_per_second=args.ticks_per_second, seed=args.seed, realtime=True)
+        bars = ticks_to_bars(ticks, args.bar_seconds)
+
+    store_dir = os.getenv("PRICE_STORE_DIR")
+    store = PriceStore(store_dir) if store_dir and not args.inline_prices else None
+
+    def report(asset: str, timestamp: int, decision: dict):
+        print(f"[INGESTÃO] {asset} @ {time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(timestamp))}: "
+              f"{decision.get('action')} ({decision.get('reason')})")
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        pipeline = IngestionPipeline(
+            orchestrator_decider(client, args.orchestrator_url, os.getenv("INTERNAL_API_KEY")),
+            window=args.window, min_points=args.min_points, trigger=args.trigger, interval=args.interval,
+            store=store, on_decision=report
+        )
+        await pipeline.run(bars)
+    print(f"[INGESTÃO] Fim do fluxo: {pipeline.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestão contínua de preços que dispara ciclos de decisão.")
+    parser.add_argument("--source", choices=["replay", "simulator"], default="replay")
+    parser.add_argument("--file", default=os.path.join("data", "Gemini_BTCUSD_d.csv"), help="CSV reproduzido no modo replay.")
+    parser.add_argument("--asset", default="BTC/USD", help="Ativo das barras reproduzidas.")
+    parser.add_argument("--speed", type=float, default=0.0, help="Aceleração do replay (0 = o mais rápido possível).")
+    parser.add_argument("--limit", type=int, help="Número máximo de barras reproduzidas.")
+    parser.add_argument("--assets", default="BTC/USD,ETH/USD", help="Ativos do simulador, separados por vírgula.")
+    parser.add_argument("--ticks-per-second", type=float, default=10.0)
+    parser.add_argument("--bar-seconds", type=int, default=60, help="Duração das barras agregadas a partir dos ticks.")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--window", type=int, default=100, help="Tamanho da janela de fechamentos por ativo.")
+    parser.add_argument("--min-points", type=int, default=30, help="Barras mínimas antes do primeiro ciclo.")
+    parser.add_argument("--trigger", choices=TRIGGERS, default="bar_close")
+    parser.add_argument("--interval", type=float, default=60.0, help="Intervalo entre ciclos no gatilho 'schedule'.")
+    parser.add_argument("--inline-prices", action="store_true", help="Envia a janela na requisição mesmo com PRICE_STORE_DIR.")
+    parser.add_argument("--orchestrator-url", default=os.getenv("ORCHESTRATOR_URL", "http://localhost:8080"))
+    asyncio.run(main(parser.parse_args()))
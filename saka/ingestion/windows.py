@@ -0,0 +1,14 @@
+from typing import Dict
+from saka.shared.rolling_window import RollingWindow, RollingWindows
+
+
+class AssetWindows(RollingWindows):
+    """Janelas de fechamento por ativo e o timestamp da última barra recebida de cada um."""
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self.last_timestamp: Dict[str, int] = {}
+
+    def append(self, asset: str, timestamp: int, close: float) -> RollingWindow:
+        window = super().append(asset, close)
+        self.last_timestamp[asset] = timestamp
+        return window
@@ -0,0 +1,104 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+import numpy as np
+from saka.shared.models import AnalysisRequest
+from saka.shared.price_codec import decode_prices
+
+
+class AnalysisCache:
+    """
+    Cache LRU com expiração (TTL) para os resultados das análises dos agentes.
+    Um TTL <= 0 desativa o cache. Mantém contadores de acertos, falhas e remoções.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: dict):
+        if not self.enabled:
+            return
+        self._entries[key] = (self.clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def price_window_key(request: AnalysisRequest) -> Optional[str]:
+    """
+    Hash da janela de preços da requisição: a mesma janela em float64 tem a mesma chave
+    em JSON ou em binário (em float32, com menos precisão, é outra janela).
+    Retorna None quando a janela não é estável (referência sem timestamp final),
+    caso em que o resultado não deve ser reaproveitado.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if request.encoded_prices is not None:
+        try:
+            prices = decode_prices(request.encoded_prices)
+        except ValueError:
+            # Série inválida: os agentes a rejeitam, não há resultado a reaproveitar
+            return None
+        # Em float64 os bytes são os mesmos de `historical_prices`; float32 é outra janela
+        digest.update(request.encoded_prices.dtype.encode())
+        digest.update(prices.tobytes())
+    elif request.historical_prices is not None:
+        digest.update(b"float64")
+        digest.update(np.asarray(request.historical_prices, dtype="<f8").tobytes())
+    elif request.price_ref is not None and request.price_ref.end is not None:
+        digest.update(request.price_ref.json().encode())
+    else:
+        return None
+    return digest.hexdigest()
+
+
+def time_bucket(bucket_seconds: float, clock: Callable[[], float] = time.time) -> int:
+    """Índice da janela de tempo atual, usado para cachear análises que não dependem dos preços."""
+    return int(clock() // bucket_seconds)
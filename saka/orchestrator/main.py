@@ -1,14 +1,25 @@
 import os
+import time
 import httpx
 import asyncio
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
 from contextlib import asynccontextmanager
 from typing import Optional
 from saka.shared.models import (
-    AnalysisRequest, ConsolidatedDataInput, KamilaFinalDecision,
-    ErrorResponse, AgentName, SentinelRiskOutput, CronosTechnicalOutput, OrionMacroOutput
+    AnalysisRequest, ConsolidatedDataInput, KamilaFinalDecision, MacroImpact,
+    ErrorResponse, AgentName, SentinelRiskOutput, CronosTechnicalOutput, OrionMacroOutput,
+    BatchAnalysisRequest, BatchItemError, SentinelBatchOutput, CronosBatchOutput, OrionBatchOutput,
+    KamilaBatchInput, KamilaBatchOutput
 )
 from saka.shared.security import get_api_key
+from saka.shared.decision_rules import evaluate_vetoes
+from saka.shared.price_codec import to_wire_payload, PRICE_WIRE_FORMATS
+from saka.shared.metrics import REGISTRY, Gauge, SIZE_BUCKETS, install_metrics
+from saka.shared.tracing import install_tracing, inject_trace_headers, span, traced
+from saka.orchestrator.cache import AnalysisCache, price_window_key, time_bucket
+from saka.orchestrator.singleflight import SingleFlight
+from saka.orchestrator.resilience import AgentPolicy, ResilientAgent
+from saka.orchestrator.replicas import ReplicaPool, urls_from_env, maintain_pools
 
 # Global HTTP client
 http_client: Optional[httpx.AsyncClient] = None
@@ -16,10 +27,19 @@ http_client: Optional[httpx.AsyncClient] = None
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global http_client
-    # Initialize the client with the same timeout
-    http_client = httpx.AsyncClient(timeout=20.0)
+    # Initialize the client with the same timeout; every request carries the trace context
+    http_client = httpx.AsyncClient(timeout=20.0, event_hooks={"request": [inject_trace_headers]})
+    # Keep replica pools fresh: registry membership and /health-based ejection
+    pool_maintenance = asyncio.create_task(
+        maintain_pools(lambda: agent_pools, http_client, HEALTH_CHECK_INTERVAL, AGENT_REGISTRY_URL)
+    )
     yield
-    # Clean up the client on shutdown
+    # Clean up the client on shutdown, once the maintenance task has stopped using it
+    pool_maintenance.cancel()
+    try:
+        await pool_maintenance
+    except asyncio.CancelledError:
+        pass
     await http_client.aclose()
     http_client = None
 
@@ -29,71 +49,398 @@ app = FastAPI(
     version="1.3.1", # Bump version for optimization
     lifespan=lifespan
 )
+install_metrics(app, AgentName.ORCHESTRATOR.value)
+install_tracing(app, AgentName.ORCHESTRATOR.value)
 
-# Carrega URLs
-SENTINEL_URL = os.getenv("SENTINEL_URL")
-CRONOS_URL = os.getenv("CRONOS_URL")
-ORION_URL = os.getenv("ORION_URL")
-KAMILA_URL = os.getenv("KAMILA_URL")
+# Carrega URLs: cada agente pode ter várias réplicas (<AGENTE>_URLS separadas por vírgula) ou uma só (<AGENTE>_URL)
+agent_pools = {name: ReplicaPool(name, urls_from_env(name)) for name in ("Sentinel", "Cronos", "Orion", "Kamila")}
+# Registro de agentes do src/orchestrator (opcional): as réplicas registradas com o nome do agente entram no pool
+AGENT_REGISTRY_URL = os.getenv("AGENT_REGISTRY_URL")
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "10"))
 INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY")
 INTERNAL_API_HEADERS = {"X-Internal-API-Key": INTERNAL_API_KEY}
 
+# Formato da série de preços enviada aos agentes de análise: "json" (lista de floats),
+# "float64" ou "float32" (bytes brutos em base64, muito menores e mais baratos de decodificar)
+PRICE_WIRE_FORMAT = os.getenv("PRICE_WIRE_FORMAT", "json")
+if PRICE_WIRE_FORMAT not in PRICE_WIRE_FORMATS:
+    raise ValueError(f"PRICE_WIRE_FORMAT inválido: {PRICE_WIRE_FORMAT}. Use um de {PRICE_WIRE_FORMATS}.")
 
-async def get_kamila_decision(request: AnalysisRequest) -> dict:
+# Cache das análises por (agente, ativo, hash da janela de preços). TTL 0 desativa.
+# O Orion não depende dos preços: seu resultado é cacheado por ativo e janela de tempo.
+analysis_cache = AnalysisCache(
+    max_entries=int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("ANALYSIS_CACHE_TTL", "60"))
+)
+ORION_CACHE_BUCKET_SECONDS = float(os.getenv("ORION_CACHE_BUCKET_SECONDS", "3600"))
+
+# Encerra o ciclo com 'hold' assim que o Sentinel ou o Orion vetam, cancelando as chamadas pendentes
+# em vez de esperar o agente mais lento e a Kamila. Com vários vetos, vale o primeiro que chegar.
+DECISION_SHORT_CIRCUIT = os.getenv("DECISION_SHORT_CIRCUIT", "true").lower() in ("1", "true", "yes")
+
+# Políticas de resiliência por agente (ajustáveis por <AGENTE>_READ_TIMEOUT, <AGENTE>_HEDGE, etc.).
+# Agentes opcionais degradam para o último resultado conhecido ou um valor neutro em vez de falhar o ciclo.
+AGENT_POLICIES = {
+    "Sentinel": AgentPolicy.from_env("SENTINEL", read_timeout=5.0),
+    "Cronos": AgentPolicy.from_env("CRONOS", read_timeout=10.0),
+    "Orion": AgentPolicy.from_env("ORION", read_timeout=5.0, optional=True),
+    "Kamila": AgentPolicy.from_env("KAMILA", read_timeout=30.0),
+}
+resilient_agents = {name: ResilientAgent(name, policy) for name, policy in AGENT_POLICIES.items()}
+
+# Último resultado bem-sucedido de cada agente opcional por ativo, usado na degradação.
+# Limitado (LRU) para não crescer com cada ativo já analisado; resultados muito antigos expiram.
+last_known_results = AnalysisCache(
+    max_entries=int(os.getenv("LAST_KNOWN_RESULTS_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("LAST_KNOWN_RESULTS_TTL", "86400"))
+)
+
+# Resultados neutros dos agentes opcionais quando não há nenhum resultado anterior
+NEUTRAL_RESULTS = {
+    "Orion": lambda asset: OrionMacroOutput(
+        asset=asset, impact=MacroImpact.MEDIUM, event_name="Orion Unavailable",
+        summary="Análise macroeconômica indisponível; usando impacto neutro."
+    ).dict(),
+}
+
+# Ciclos de decisão em andamento, compartilhados entre requisições idênticas simultâneas
+decision_flights = SingleFlight()
+
+# Métricas do ciclo de decisão: latência por etapa, resultado e tamanho das chamadas a cada agente
+STAGE_LATENCY = REGISTRY.histogram(
+    "saka_orchestrator_stage_seconds", "Latência de cada etapa do ciclo de decisão.", ("stage",))
+AGENT_CALLS = REGISTRY.counter(
+    "saka_orchestrator_agent_calls_total", "Chamadas aos agentes por código de status ou tipo de erro.", ("agent", "code"))
+VETO_SHORT_CIRCUITS = REGISTRY.counter(
+    "saka_orchestrator_veto_short_circuits_total", "Ciclos encerrados por veto antes da chamada à Kamila.", ("agent",))
+AGENT_FALLBACKS = REGISTRY.counter(
+    "saka_orchestrator_agent_fallbacks_total", "Análises de agentes opcionais substituídas por resultados degradados.", ("agent", "source"))
+AGENT_PAYLOAD_BYTES = REGISTRY.histogram(
+    "saka_orchestrator_agent_payload_bytes", "Tamanho dos corpos trocados com os agentes.", ("agent", "direction"), SIZE_BUCKETS)
+
+
+def collect_orchestrator_state():
+    """Exporta, no momento da leitura, as estatísticas do cache de análises e do single-flight."""
+    cache = Gauge("saka_orchestrator_analysis_cache", "Estatísticas do cache de análises.", ("stat",))
+    for stat, value in analysis_cache.stats().items():
+        cache.set(float(value), stat=stat)
+    flights = Gauge("saka_orchestrator_decision_flights", "Ciclos de decisão executados, compartilhados e em andamento.", ("state",))
+    flights.set(decision_flights.executions, state="executions")
+    flights.set(decision_flights.coalesced, state="coalesced")
+    flights.set(len(decision_flights), state="in_flight")
+    breakers = Gauge("saka_orchestrator_circuit_open", "Disjuntor do agente aberto (1) ou meio-aberto (0.5).", ("agent",))
+    hedges = Gauge("saka_orchestrator_hedged_requests", "Requisições duplicadas (hedge) disparadas por agente.", ("agent",))
+    for name, agent in resilient_agents.items():
+        state = agent.breaker.state
+        breakers.set(1.0 if state == "open" else 0.5 if state == "half_open" else 0.0, agent=name.lower())
+        hedges.set(agent.hedges, agent=name.lower())
+    replica_health = Gauge("saka_orchestrator_replica_healthy", "Réplica saudável (1) ou ejetada (0).", ("agent", "replica"))
+    replica_load = Gauge("saka_orchestrator_replica_outstanding", "Requisições em andamento por réplica.", ("agent", "replica"))
+    for name, pool in agent_pools.items():
+        for replica in pool.replicas.values():
+            replica_health.set(1.0 if replica.healthy else 0.0, agent=name.lower(), replica=replica.url)
+            replica_load.set(replica.outstanding, agent=name.lower(), replica=replica.url)
+    return [cache, flights, breakers, hedges, replica_health, replica_load]
+
+
+REGISTRY.register_collector(collect_orchestrator_state)
+
+
+@asynccontextmanager
+async def agent_client():
     """
-    Executa o fluxo de análise completo e retorna a decisão da Kamila.
+    Fornece o cliente HTTP global se disponível; caso contrário
+    (principalmente em testes sem lifespan) cria um cliente temporário.
     """
-    # Use the global client if available, otherwise fallback (mostly for tests without lifespan)
     if http_client:
-        client = http_client
-        should_close = False
+        yield http_client
     else:
-        client = httpx.AsyncClient(timeout=20.0)
-        should_close = True
+        async with httpx.AsyncClient(timeout=20.0, event_hooks={"request": [inject_trace_headers]}) as client:
+            yield client
+
+
+async def call_agent(client: httpx.AsyncClient, agent_name: str, path: str, payload: dict) -> httpx.Response:
+    """
+    Envia uma requisição a uma réplica do agente sob a sua política de resiliência (orçamentos
+    de tempo, hedge e disjuntor), registrando a latência da etapa, o código de status (ou o tipo
+    da exceção) e os tamanhos do corpo enviado e recebido.
+    """
+    agent = agent_name.lower()
+    guard = resilient_agents[agent_name]
+    pool = agent_pools[agent_name]
 
+    async def send() -> httpx.Response:
+        # Cada tentativa (inclusive o hedge) escolhe a réplica menos ocupada no momento
+        replica = pool.choose()
+        with pool.track(replica):
+            try:
+                return await client.post(f"{replica.url}{path}", json=payload, headers=INTERNAL_API_HEADERS, timeout=guard.policy.timeout)
+            except httpx.TransportError:
+                pool.mark(replica, False)
+                raise
+
+    start = time.perf_counter()
     try:
-        # Chama os agentes de análise em paralelo
-        tasks = [
-            client.post(f"{SENTINEL_URL}/analyze", json=request.dict(), headers=INTERNAL_API_HEADERS),
-            client.post(f"{CRONOS_URL}/analyze", json=request.dict(), headers=INTERNAL_API_HEADERS),
-            client.post(f"{ORION_URL}/analyze_events", json=request.dict(), headers=INTERNAL_API_HEADERS)
-        ]
+        with span(f"call {agent}", path=path):
+            response = await guard.call(send)
+    except Exception as e:
+        AGENT_CALLS.inc(agent=agent, code=type(e).__name__)
+        raise
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage=agent)
+
+    AGENT_CALLS.inc(agent=agent, code=str(response.status_code))
+    AGENT_PAYLOAD_BYTES.observe(len(response.request.content), agent=agent, direction="request")
+    AGENT_PAYLOAD_BYTES.observe(len(response.content), agent=agent, direction="response")
+    return response
+
+
+def optional_fallback(agent_name: str, asset: str) -> Optional[dict]:
+    """Resultado degradado de um agente opcional: o último conhecido do ativo ou o neutro. None se obrigatório."""
+    if not resilient_agents[agent_name].policy.optional:
+        return None
+    last = last_known_results.get((agent_name, asset))
+    AGENT_FALLBACKS.inc(agent=agent_name.lower(), source="last_known" if last is not None else "neutral")
+    return last if last is not None else NEUTRAL_RESULTS[agent_name](asset)
+
+
+async def fetch_analysis(client: httpx.AsyncClient, agent_name: str, path: str, payload: dict, asset: str, cache_key) -> dict:
+    """
+    Obtém a análise de um agente e a guarda no cache. Falhas de agentes opcionais
+    viram resultados degradados (que não são cacheados); as dos obrigatórios levantam 503/502.
+    """
+    try:
+        response = await call_agent(client, agent_name, path, payload)
+    except Exception as e:
+        response = e
+
+    try:
+        body = collect_agent_results([agent_name], [response])[agent_name]
+    except HTTPException as e:
+        fallback = optional_fallback(agent_name, asset)
+        if fallback is None:
+            raise
+        print(f"[DEGRADADO] {e.detail} Usando resultado degradado para {asset}.")
+        return fallback
+
+    if cache_key:
+        analysis_cache.set(cache_key, body)
+    if resilient_agents[agent_name].policy.optional:
+        last_known_results.set((agent_name, asset), body)
+    return body
+
+
+def short_circuit(veto: KamilaFinalDecision, results: dict) -> dict:
+    """Encerra o ciclo com a decisão de veto avaliada localmente, sem chamar a Kamila."""
+    sentinel = results.get("Sentinel")
+    VETO_SHORT_CIRCUITS.inc(agent="sentinel" if sentinel is not None and not sentinel["can_trade"] else "orion")
+    return veto.dict()
+
+
+def find_veto(results: dict) -> Optional[KamilaFinalDecision]:
+    """Avalia as regras de veto com as análises já disponíveis (parciais ou completas)."""
+    sentinel = results.get("Sentinel")
+    orion = results.get("Orion")
+    return evaluate_vetoes(
+        SentinelRiskOutput(**sentinel) if sentinel is not None else None,
+        OrionMacroOutput(**orion) if orion is not None else None
+    )
+
+
+async def fan_out_until_veto(client: httpx.AsyncClient, pending: dict, payload: dict, asset: str, results: dict) -> Optional[KamilaFinalDecision]:
+    """
+    Chama os agentes pendentes em paralelo e processa as respostas na ordem de chegada.
+    Retorna a decisão de veto assim que ela for conhecida, cancelando as chamadas restantes;
+    caso contrário preenche `results` com todas as análises e retorna None.
+    """
+    tasks = {
+        asyncio.ensure_future(fetch_analysis(client, agent_name, path, payload, asset, cache_key)): agent_name
+        for agent_name, (path, cache_key) in pending.items()
+    }
+    try:
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                results[tasks.pop(task)] = task.result()
+
+            veto = find_veto(results)
+            if veto is not None:
+                return veto
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def collect_agent_results(agent_names: list, responses: list) -> dict:
+    """
+    Valida as respostas dos agentes de análise e extrai seus corpos JSON.
+    Levanta HTTPException 503 (falha de comunicação) ou 502 (erro do agente).
+    """
+    results = {}
+    for agent_name, r in zip(agent_names, responses):
+        if isinstance(r, Exception):
+            raise HTTPException(status_code=503, detail=f"Falha na comunicação com o agente {agent_name}: {r}")
+        try:
+            r.raise_for_status()
+            results[agent_name] = r.json()
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=502, detail=f"O agente {agent_name} ({e.request.url}) retornou um erro: {e.response.status_code} {e.response.text}")
+    return results
+
+
+async def get_kamila_decision(request: AnalysisRequest) -> dict:
+    """
+    Executa o fluxo de análise completo e retorna a decisão da Kamila.
+    Requisições idênticas simultâneas (mesmo ativo e mesma janela de preços)
+    compartilham uma única execução do ciclo.
+    """
+    window_key = price_window_key(request)
+    if window_key is None:
+        window_key = request.price_ref.json() if request.price_ref else None
+    with STAGE_LATENCY.time(stage="end_to_end"):
+        return await decision_flights.do((request.asset, window_key), lambda: run_decision_cycle(request))
 
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
 
-        # Validação e extração de dados
-        agent_names = ["Sentinel", "Cronos", "Orion"]
+@traced("decision_cycle", AgentName.ORCHESTRATOR.value)
+async def run_decision_cycle(request: AnalysisRequest) -> dict:
+    """
+    Executa uma vez o fluxo de análise completo e retorna a decisão da Kamila.
+    """
+    async with agent_client() as client:
+        window_key = price_window_key(request)
+        calls = {
+            "Sentinel": ("/analyze", ("Sentinel", request.asset, window_key) if window_key else None),
+            "Cronos": ("/analyze", ("Cronos", request.asset, window_key) if window_key else None),
+            "Orion": ("/analyze_events", ("Orion", request.asset, time_bucket(ORION_CACHE_BUCKET_SECONDS)))
+        }
+
+        # Reaproveita análises em cache; só os agentes restantes são chamados
         results = {}
-        for i, r in enumerate(responses):
-            agent_name = agent_names[i]
-            if isinstance(r, Exception):
-                raise HTTPException(status_code=503, detail=f"Falha na comunicação com o agente {agent_name}: {r}")
-            try:
-                r.raise_for_status()
-                results[agent_name] = r.json()
-            except httpx.HTTPStatusError as e:
-                raise HTTPException(status_code=502, detail=f"O agente {agent_name} ({e.request.url}) retornou um erro: {e.response.status_code} {e.response.text}")
+        pending = {}
+        for agent_name, (path, cache_key) in calls.items():
+            cached = analysis_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                results[agent_name] = cached
+            else:
+                pending[agent_name] = (path, cache_key)
+
+        # Um veto em cache já decide o ciclo, sem chamar nenhum agente
+        veto = find_veto(results) if DECISION_SHORT_CIRCUIT else None
+        if veto is not None:
+            return short_circuit(veto, results)
+
+        if pending:
+            # Serializa a série de preços uma única vez para todos os agentes
+            payload = to_wire_payload(request, PRICE_WIRE_FORMAT)
+
+            with STAGE_LATENCY.time(stage="fan_out"), span("fan_out"):
+                if DECISION_SHORT_CIRCUIT:
+                    # Processa as respostas conforme chegam e encerra no primeiro veto
+                    veto = await fan_out_until_veto(client, pending, payload, request.asset, results)
+                    if veto is not None:
+                        return short_circuit(veto, results)
+                else:
+                    # Chama os agentes de análise em paralelo e espera todos
+                    tasks = [
+                        fetch_analysis(client, agent_name, path, payload, request.asset, cache_key)
+                        for agent_name, (path, cache_key) in pending.items()
+                    ]
+                    bodies = await asyncio.gather(*tasks, return_exceptions=True)
+                    for agent_name, body in zip(pending, bodies):
+                        if isinstance(body, Exception):
+                            raise body
+                        results[agent_name] = body
 
         # Consolidação dos dados
-        consolidated_input = ConsolidatedDataInput(
-            asset=request.asset,
-            sentinel_analysis=SentinelRiskOutput(**results["Sentinel"]),
-            cronos_analysis=CronosTechnicalOutput(**results["Cronos"]),
-            orion_analysis=OrionMacroOutput(**results["Orion"])
-        )
+        with STAGE_LATENCY.time(stage="consolidation"), span("consolidation"):
+            consolidated_input = ConsolidatedDataInput(
+                asset=request.asset,
+                sentinel_analysis=SentinelRiskOutput(**results["Sentinel"]),
+                cronos_analysis=CronosTechnicalOutput(**results["Cronos"]),
+                orion_analysis=OrionMacroOutput(**results["Orion"])
+            )
+            consolidated_payload = consolidated_input.dict()
 
         # Obter decisão da Kamila
-        kamila_response = await client.post(
-            f"{KAMILA_URL}/decide",
-            json=consolidated_input.dict(),
-            headers=INTERNAL_API_HEADERS,
-            timeout=30.0
-        )
+        kamila_response = await call_agent(client, "Kamila", "/decide", consolidated_payload)
         kamila_response.raise_for_status()
         return kamila_response.json()
-    finally:
-        if should_close:
-            await client.aclose()
+
+
+@traced("batch_decision_cycle", AgentName.ORCHESTRATOR.value)
+async def get_kamila_batch_decisions(batch: BatchAnalysisRequest) -> KamilaBatchOutput:
+    """
+    Executa o fluxo de análise para vários ativos com uma única chamada em lote por agente.
+    Ativos com erro em qualquer etapa são reportados individualmente; os demais seguem até a Kamila.
+    """
+    assets = [r.asset for r in batch.requests]
+    if len(set(assets)) != len(assets):
+        raise HTTPException(status_code=400, detail="O lote contém ativos duplicados.")
+
+    async with agent_client() as client:
+        payload = {"requests": [to_wire_payload(r, PRICE_WIRE_FORMAT) for r in batch.requests]}
+        tasks = [
+            call_agent(client, "Sentinel", "/analyze_batch", payload),
+            call_agent(client, "Cronos", "/analyze_batch", payload),
+            call_agent(client, "Orion", "/analyze_events_batch", payload)
+        ]
+        with STAGE_LATENCY.time(stage="fan_out"), span("fan_out"):
+            responses = await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = {}
+        for agent_name, response in zip(["Sentinel", "Cronos", "Orion"], responses):
+            try:
+                results.update(collect_agent_results([agent_name], [response]))
+            except HTTPException:
+                if not resilient_agents[agent_name].policy.optional:
+                    raise
+                results[agent_name] = {"results": [optional_fallback(agent_name, asset) for asset in assets], "errors": []}
+
+        sentinel = SentinelBatchOutput(**results["Sentinel"])
+        cronos = CronosBatchOutput(**results["Cronos"])
+        orion = OrionBatchOutput(**results["Orion"])
+
+        # Um ativo só segue para a Kamila se todas as análises tiverem sucesso
+        errors = {}
+        for agent_output in (sentinel, cronos, orion):
+            for error in agent_output.errors:
+                errors.setdefault(error.index, error)
+
+        sentinel_by_asset = {r.asset: r for r in sentinel.results}
+        cronos_by_asset = {r.asset: r for r in cronos.results}
+        orion_by_asset = {r.asset: r for r in orion.results}
+
+        items, item_indices = [], []
+        for i, asset in enumerate(assets):
+            if i in errors:
+                continue
+            if asset not in sentinel_by_asset or asset not in cronos_by_asset or asset not in orion_by_asset:
+                errors[i] = BatchItemError(index=i, asset=asset, error="Bad Gateway", details="Análise ausente na resposta dos agentes.", source_agent=AgentName.ORCHESTRATOR)
+                continue
+            items.append(ConsolidatedDataInput(
+                asset=asset,
+                sentinel_analysis=sentinel_by_asset[asset],
+                cronos_analysis=cronos_by_asset[asset],
+                orion_analysis=orion_by_asset[asset]
+            ))
+            item_indices.append(i)
+
+        output = KamilaBatchOutput()
+        if items:
+            kamila_response = await call_agent(client, "Kamila", "/decide_batch", KamilaBatchInput(items=items).dict())
+            kamila_response.raise_for_status()
+            kamila_output = KamilaBatchOutput(**kamila_response.json())
+            output.decisions = kamila_output.decisions
+            # Os índices da Kamila se referem aos itens consolidados; converte para o lote original
+            for error in kamila_output.errors:
+                error.index = item_indices[error.index]
+                errors[error.index] = error
+
+        output.errors = [errors[i] for i in sorted(errors)]
+        return output
 
 
 @app.post("/trigger_decision_cycle_sync", response_model=KamilaFinalDecision, dependencies=[Depends(get_api_key)])
@@ -103,6 +450,13 @@ async def trigger_decision_cycle_sync(request: AnalysisRequest):
     return await get_kamila_decision(request)
 
 
+@app.post("/trigger_batch_decision_cycle_sync", response_model=KamilaBatchOutput, dependencies=[Depends(get_api_key)])
+async def trigger_batch_decision_cycle_sync(batch: BatchAnalysisRequest):
+    """Endpoint SÍNCRONO que executa o ciclo de decisão para vários ativos de uma vez."""
+    print(f"Recebida requisição em lote para {len(batch.requests)} ativos.")
+    return await get_kamila_batch_decisions(batch)
+
+
 @app.post("/trigger_decision_cycle", status_code=202)
 async def trigger_decision_cycle(request: AnalysisRequest, background_tasks: BackgroundTasks):
     """Endpoint ASSÍNCRONO para operação normal."""
@@ -119,6 +473,12 @@ async def trigger_decision_cycle(request: AnalysisRequest, background_tasks: Bac
     return {"message": "Ciclo de decisão iniciado em background.", "asset": request.asset}
 
 
+@app.get("/cache/stats", dependencies=[Depends(get_api_key)])
+def cache_stats():
+    """Métricas do cache de análises (acertos, falhas, remoções)."""
+    return analysis_cache.stats()
+
+
 @app.get("/health", summary="Endpoint de Health Check")
 def health():
     return {"status": "ok"}
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+import httpx
+
+
+class Replica:
+    """Uma instância de um agente: requisições em andamento e estado de saúde."""
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.last_checked: Optional[float] = None
+
+
+class ReplicaPool:
+    """
+    Conjunto de réplicas de um agente. Cada requisição vai para a menos ocupada entre duas
+    réplicas saudáveis sorteadas (power of two choices + least outstanding requests).
+    Réplicas que falham no `/health` (ou na conexão) são ejetadas até voltarem a responder.
+    Se todas estiverem ejetadas, o pool usa todas em vez de recusar as chamadas.
+    """
+    def __init__(self, name: str, urls: List[str], unhealthy_threshold: int = 1, rng: Optional[random.Random] = None):
+        self.name = name
+        self.unhealthy_threshold = unhealthy_threshold
+        self.rng = rng or random.Random()
+        self.replicas: Dict[str, Replica] = {}
+        self.set_urls(urls)
+
+    def set_urls(self, urls: List[str]):
+        """Atualiza as réplicas preservando o estado das que continuam no pool."""
+        urls = [u.rstrip("/") for u in urls if u]
+        self.replicas = {url: self.replicas.get(url) or Replica(url) for url in dict.fromkeys(urls)}
+
+    def healthy_replicas(self) -> List[Replica]:
+        return [r for r in self.replicas.values() if r.healthy]
+
+    def choose(self) -> Replica:
+        candidates = self.healthy_replicas() or list(self.replicas.values())
+        if not candidates:
+            raise LookupError(f"Nenhuma réplica configurada para o agente {self.name}.")
+        if len(candidates) == 1:
+            return candidates[0]
+        first, second = self.rng.sample(candidates, 2)
+        return first if first.outstanding <= second.outstanding else second
+
+    @contextmanager
+    def track(self, replica: Replica):
+        """Conta a requisição como em andamento na réplica enquanto o bloco executa."""
+        replica.outstanding += 1
+        try:
+            yield replica
+        finally:
+            replica.outstanding -= 1
+
+    def mark(self, replica: Replica, ok: bool):
+        replica.last_checked = time.monotonic()
+        if ok:
+            replica.consecutive_failures = 0
+            replica.healthy = True
+        else:
+            replica.consecutive_failures += 1
+            if replica.consecutive_failures >= self.unhealthy_threshold:
+                replica.healthy = False
+
+    async def check_health(self, client: httpx.AsyncClient, timeout: float = 2.0):
+        """Consulta o `/health` de todas as réplicas em paralelo e ejeta ou readmite cada uma."""
+        async def probe(replica: Replica):
+            try:
+                response = await client.get(f"{replica.url}/health", timeout=timeout)
+                self.mark(replica, response.status_code == 200)
+            except httpx.HTTPError:
+                self.mark(replica, False)
+
+        await asyncio.gather(*(probe(r) for r in list(self.replicas.values())))
+
+
+def urls_from_env(agent: str) -> List[str]:
+    """Lê `<AGENTE>_URLS` (lista separada por vírgulas) ou, na falta dela, `<AGENTE>_URL`."""
+    raw = os.getenv(f"{agent.upper()}_URLS") or os.getenv(f"{agent.upper()}_URL") or ""
+    return [url.strip() for url in raw.split(",") if url.strip()]
+
+
+async def fetch_registry_urls(client: httpx.AsyncClient, registry_url: str) -> Dict[str, List[str]]:
+    """
+    Lê os agentes registrados no registro de `src/orchestrator` (GET /agents) e agrupa
+    os endpoints pelo nome do agente em minúsculas (ex: "cronos" -> [url1, url2]).
+    """
+    response = await client.get(f"{registry_url.rstrip('/')}/agents")
+    response.raise_for_status()
+    grouped: Dict[str, List[str]] = {}
+    for agent in response.json():
+        grouped.setdefault(agent["name"].lower(), []).append(agent["endpoint"])
+    return grouped
+
+
+async def maintain_pools(pools: Callable[[], Dict[str, ReplicaPool]], client: httpx.AsyncClient,
+                         interval: float, registry_url: Optional[str] = None):
+    """
+    Laço de manutenção dos pools: atualiza as réplicas a partir do registro (se configurado)
+    e verifica a saúde de todas a cada `interval` segundos.
+    """
+    while True:
+        if registry_url:
+            try:
+                registered = await fetch_registry_urls(client, registry_url)
+                for name, pool in pools().items():
+                    if registered.get(name.lower()):
+                        pool.set_urls(registered[name.lower()])
+            except (httpx.HTTPError, ValueError, KeyError) as e:
+                print(f"[REPLICAS] Falha ao consultar o registro de agentes em {registry_url}: {e}")
+        await asyncio.gather(*(pool.check_health(client) for pool in pools().values()))
+        await asyncio.sleep(interval)
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+import httpx
+
+
+class CircuitOpenError(Exception):
+    """O circuito do agente está aberto: a chamada nem chega a ser feita."""
+
+
+class CircuitBreaker:
+    """
+    Disjuntor por agente. Depois de `failure_threshold` falhas consecutivas o circuito abre
+    e as chamadas falham imediatamente por `recovery_seconds`; em seguida uma única chamada
+    de teste (meio-aberto) decide se o circuito fecha ou volta a abrir.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.recovery_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def release(self):
+        """Libera a chamada de teste sem registrar resultado (ex: chamada cancelada pelo chamador)."""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probe_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self._probe_in_flight = False
+
+
+class LatencyWindow:
+    """Latências recentes bem-sucedidas de um agente, usadas para decidir quando disparar o hedge."""
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class AgentPolicy:
+    """
+    Política de resiliência das chamadas a um agente: orçamentos de conexão e leitura,
+    hedge (requisição duplicada após o percentil `hedge_quantile` da latência), disjuntor
+    e, para agentes opcionais, degradação para o último resultado conhecido ou um valor neutro.
+    """
+    def __init__(self, connect_timeout: float = 2.0, read_timeout: float = 10.0, hedge: bool = True,
+                 hedge_quantile: float = 0.95, failure_threshold: int = 5, recovery_seconds: float = 30.0,
+                 optional: bool = False):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.optional = optional
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+    @classmethod
+    def from_env(cls, agent: str, **defaults) -> "AgentPolicy":
+        """Lê os ajustes `<AGENTE>_CONNECT_TIMEOUT`, `<AGENTE>_READ_TIMEOUT`, `<AGENTE>_HEDGE`, etc."""
+        prefix = agent.upper()
+        overrides = {
+            "connect_timeout": float, "read_timeout": float, "hedge": lambda v: v.lower() in ("1", "true", "yes"),
+            "hedge_quantile": float, "failure_threshold": int, "recovery_seconds": float,
+            "optional": lambda v: v.lower() in ("1", "true", "yes"),
+        }
+        values = dict(defaults)
+        for name, parse in overrides.items():
+            raw = os.getenv(f"{prefix}_{name.upper()}")
+            if raw:
+                values[name] = parse(raw)
+        return cls(**values)
+
+
+def is_failure(response: httpx.Response) -> bool:
+    """Erros 5xx indicam um agente com problemas; 4xx são erros da própria requisição."""
+    return response.status_code >= 500
+
+
+class ResilientAgent:
+    """Aplica a política de um agente: disjuntor, orçamento de tempo e hedge das requisições."""
+    def __init__(self, name: str, policy: AgentPolicy, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.policy = policy
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.recovery_seconds, clock)
+        self.latencies = LatencyWindow()
+        self.hedges = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.policy.hedge:
+            return None
+        return self.latencies.quantile(self.policy.hedge_quantile)
+
+    async def call(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Executa `send` respeitando o disjuntor. Se a resposta demorar mais que o percentil
+        configurado, dispara uma segunda requisição idêntica e usa a primeira que responder.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuito aberto para o agente {self.name}.")
+
+        start = time.perf_counter()
+        try:
+            response = await self._send_hedged(send)
+        except asyncio.CancelledError:
+            # Cancelado pelo chamador (ex: veto): não diz nada sobre a saúde do agente
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        if is_failure(response):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            self.latencies.observe(time.perf_counter() - start)
+        return response
+
+    async def _send_hedged(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        delay = self.hedge_delay()
+        tasks = {asyncio.ensure_future(send())}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self.hedges += 1
+                    tasks.add(asyncio.ensure_future(send()))
+
+            # A primeira resposta sem falha vence; se todas falharem, propaga a última falha
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None and not is_failure(task.result()):
+                        return task.result()
+                    if not tasks:
+                        return task.result()
+        finally:
+            # Tentativas perdedoras são canceladas e aguardadas: nenhuma continua usando o cliente
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
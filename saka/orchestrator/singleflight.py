@@ -0,0 +1,37 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce chamadas concorrentes com a mesma chave em uma única tarefa asyncio.
+
+    A primeira chamada inicia a tarefa; as demais, enquanto ela estiver em andamento,
+    aguardam o mesmo resultado (ou a mesma exceção). O cancelamento de um chamador
+    não cancela a tarefa compartilhada pelos outros.
+    """
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Evita o aviso de exceção não recuperada quando todos os chamadores foram cancelados
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,18 @@
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+
+
+def group_price_windows(windows: Dict[int, np.ndarray]) -> Iterator[Tuple[List[int], np.ndarray]]:
+    """
+    Agrupa as janelas de preços de mesmo tamanho em matrizes 2-D (ativos x preços).
+
+    Recebe as janelas válidas indexadas pela posição do item no lote e gera, para cada
+    tamanho de janela, a lista dessas posições e a matriz correspondente,
+    prontas para os cálculos vetorizados.
+    """
+    groups: Dict[int, List[int]] = {}
+    for i, prices in windows.items():
+        groups.setdefault(len(prices), []).append(i)
+
+    for group in groups.values():
+        yield group, np.stack([windows[i] for i in group]).astype(float, copy=False)
@@ -0,0 +1,25 @@
+from typing import Optional
+from saka.shared.models import KamilaFinalDecision, SentinelRiskOutput, OrionMacroOutput, MacroImpact
+
+
+def evaluate_vetoes(sentinel_analysis: Optional[SentinelRiskOutput] = None,
+                    orion_analysis: Optional[OrionMacroOutput] = None) -> Optional[KamilaFinalDecision]:
+    """
+    Regras de veto da Kamila, que decidem 'hold' sem olhar os sinais técnicos.
+    Usadas pela Kamila e pelo Orquestrador, que as avalia com análises parciais
+    para encerrar o ciclo assim que um veto chega. Retorna None se não houver veto.
+    """
+    # 1. Veto de Risco do Sentinel (Prioridade Máxima)
+    if sentinel_analysis is not None and not sentinel_analysis.can_trade:
+        return KamilaFinalDecision(
+            action="hold",
+            reason=f"VETO (Sentinel): {sentinel_analysis.reason}"
+        )
+
+    # 2. Veto de Evento Macroeconômico do Orion (Segunda Prioridade)
+    if orion_analysis is not None and orion_analysis.impact == MacroImpact.HIGH:
+        return KamilaFinalDecision(
+            action="hold",
+            reason=f"VETO (Orion): {orion_analysis.summary}"
+        )
+    return None
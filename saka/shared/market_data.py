@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from saka.shared.price_store import OHLCV_COLUMNS, STORE_COLUMNS
+
+# Versão do formato do cache; incrementar invalida todos os caches existentes
+CACHE_VERSION = 1
+
+# Esquemas de CSV conhecidos: coluna de tempo, como interpretá-la e mapeamento das colunas OHLCV
+KNOWN_SCHEMAS = {
+    # Formato nativo do backtester (data/btc_usd_daily.csv)
+    "saka": {
+        "time_column": "timestamp", "time_format": "datetime",
+        "columns": {"open": "open", "high": "high", "low": "low", "close": "close", "volume": "volume"},
+    },
+    # CryptoDataDownload (Gemini_BTCUSD_d.csv): banner na primeira linha, epoch em s ou ms, ordem decrescente
+    "cryptodatadownload": {
+        "time_column": "unix", "time_format": "epoch",
+        "columns": {"open": "open", "high": "high", "low": "low", "close": "close", "volume": "Volume BTC"},
+    },
+    # Séries diárias simples (btcusd_d.csv): Date/Open/High/Low/Close, sem volume
+    "date_ohlc": {
+        "time_column": "Date", "time_format": "datetime",
+        "columns": {"open": "Open", "high": "High", "low": "Low", "close": "Close"},
+    },
+}
+
+
+def _read_header(filepath: str) -> Tuple[int, List[str]]:
+    """Retorna o número de linhas de banner a pular e os nomes das colunas do CSV."""
+    with open(filepath, "r", encoding="utf-8") as f:
+        for skiprows, line in enumerate(f):
+            if "," in line:
+                return skiprows, [c.strip() for c in line.strip().split(",")]
+            if skiprows > 5:
+                break
+    raise ValueError(f"Cabeçalho CSV não encontrado em: {filepath}")
+
+
+def detect_schema(columns: List[str]) -> str:
+    """Identifica o esquema de um CSV a partir dos nomes das colunas."""
+    for name, schema in KNOWN_SCHEMAS.items():
+        if {schema["time_column"], *schema["columns"].values()}.issubset(columns):
+            return name
+    raise ValueError(f"Formato de CSV desconhecido. Colunas encontradas: {columns}")
+
+
+def parse_ohlcv_csv(filepath: str) -> Tuple[str, Dict[str, np.ndarray]]:
+    """
+    Lê um CSV de um dos esquemas conhecidos e o normaliza em colunas NumPy:
+    timestamp (epoch em segundos, crescente e sem duplicatas) e OHLCV em float64.
+    Colunas ausentes no arquivo (ex: volume) são preenchidas com NaN.
+    """
+    skiprows, header = _read_header(filepath)
+    schema_name = detect_schema(header)
+    schema = KNOWN_SCHEMAS[schema_name]
+
+    df = pd.read_csv(filepath, skiprows=skiprows)
+    raw_time = df[schema["time_column"]]
+    if schema["time_format"] == "epoch":
+        epoch = raw_time.to_numpy(dtype=np.int64)
+        # O CryptoDataDownload mistura segundos e milissegundos no mesmo arquivo
+        timestamps = np.where(epoch > 10**11, epoch // 1000, epoch)
+    else:
+        timestamps = pd.to_datetime(raw_time, utc=True).to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+    columns = {"timestamp": timestamps}
+    for column in OHLCV_COLUMNS:
+        source = schema["columns"].get(column)
+        columns[column] = df[source].to_numpy(dtype=float) if source else np.full(len(df), np.nan)
+
+    # Ordena por tempo e mantém a última ocorrência de cada timestamp
+    order = np.argsort(timestamps, kind="stable")
+    keep = np.append(np.diff(timestamps[order]) != 0, True)
+    return schema_name, {c: np.ascontiguousarray(values[order][keep]) for c, values in columns.items()}
+
+
+def _file_sha256(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_dir(filepath: str) -> str:
+    """Diretório de cache padrão: `.saka_cache/<arquivo>` ao lado do CSV."""
+    directory, filename = os.path.split(os.path.abspath(filepath))
+    return os.path.join(directory, ".saka_cache", filename)
+
+
+def _cache_is_valid(filepath: str, cache_dir: str, meta_path: str) -> bool:
+    """
+    Verifica o cache pelo tamanho e mtime do CSV; se apenas o mtime mudou,
+    confirma pelo hash do conteúdo e atualiza os metadados sem reconstruir.
+    """
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    stat = os.stat(filepath)
+    if meta.get("version") != CACHE_VERSION or meta.get("source_size") != stat.st_size:
+        return False
+    if not all(os.path.exists(os.path.join(cache_dir, f"{c}.npy")) for c in STORE_COLUMNS):
+        return False
+    if meta.get("source_mtime_ns") == stat.st_mtime_ns:
+        return True
+    if meta.get("source_sha256") != _file_sha256(filepath):
+        return False
+
+    meta["source_mtime_ns"] = stat.st_mtime_ns
+    _write_json_atomic(meta_path, meta)
+    return True
+
+
+def _write_json_atomic(path: str, data: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def build_cache(filepath: str, cache_dir: Optional[str] = None) -> str:
+    """Converte o CSV para um arquivo `.npy` por coluna e grava os metadados de invalidação."""
+    cache_dir = cache_dir or default_cache_dir(filepath)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Os metadados marcam o cache como válido: removidos antes e gravados por último
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    stat = os.stat(filepath)
+    schema_name, columns = parse_ohlcv_csv(filepath)
+    for column, values in columns.items():
+        tmp_path = os.path.join(cache_dir, f"{column}.tmp.npy")
+        np.save(tmp_path, values)
+        os.replace(tmp_path, os.path.join(cache_dir, f"{column}.npy"))
+
+    _write_json_atomic(meta_path, {
+        "version": CACHE_VERSION,
+        "schema": schema_name,
+        "rows": int(len(columns["timestamp"])),
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_sha256": _file_sha256(filepath),
+    })
+    return cache_dir
+
+
+def load_ohlcv_columns(filepath: str, cache_dir: Optional[str] = None, use_cache: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Carrega as colunas normalizadas (timestamp + OHLCV) de um CSV conhecido.
+    Com cache, a primeira carga converte o CSV e as seguintes apenas mapeiam os `.npy` em memória.
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"Arquivo de dados não encontrado em: {filepath}")
+    if not use_cache:
+        return parse_ohlcv_csv(filepath)[1]
+
+    cache_dir = cache_dir or default_cache_dir(filepath)
+    if not _cache_is_valid(filepath, cache_dir, os.path.join(cache_dir, "meta.json")):
+        build_cache(filepath, cache_dir)
+    return {c: np.load(os.path.join(cache_dir, f"{c}.npy"), mmap_mode="r") for c in STORE_COLUMNS}
+
+
+def load_ohlcv(filepath: str, cache_dir: Optional[str] = None, use_cache: bool = True) -> pd.DataFrame:
+    """Carrega um CSV conhecido como DataFrame OHLCV indexado por `timestamp` (UTC)."""
+    columns = load_ohlcv_columns(filepath, cache_dir, use_cache)
+    index = pd.DatetimeIndex(pd.to_datetime(np.asarray(columns["timestamp"]), unit="s", utc=True), name="timestamp")
+    return pd.DataFrame({c: columns[c] for c in OHLCV_COLUMNS}, index=index)
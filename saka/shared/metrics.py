@@ -0,0 +1,211 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+# Limites padrão dos histogramas: latência em segundos e tamanho de payload em bytes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"A métrica {self.name} espera os rótulos {self.label_names}, recebeu {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [(self.name, dict(zip(self.label_names, key)), value) for key, value in self._values.items()]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state["counts"][i] += 1
+                break
+        state["sum"] += value
+        state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mede a duração do bloco em segundos."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state["count"] if state else 0
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        samples = []
+        for key, state in self._values.items():
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, state["sum"]))
+            samples.append((f"{self.name}_count", labels, state["count"]))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas de um processo, exportado no formato texto do Prometheus.
+    Coletores adicionais geram métricas calculadas no momento da leitura (ex: estatísticas de cache).
+    """
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"A métrica {name} já está registrada com outro tipo.")
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, label_names)
+
+    def histogram(self, name: str, documentation: str, label_names: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[_Metric]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "saka_http_requests_total", "Requisições HTTP atendidas.", ("service", "path", "method", "status"))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "saka_http_requests_in_flight", "Requisições HTTP em andamento.", ("service",))
+HTTP_LATENCY = REGISTRY.histogram(
+    "saka_http_request_duration_seconds", "Latência das requisições HTTP.", ("service", "path"))
+HTTP_REQUEST_BYTES = REGISTRY.histogram(
+    "saka_http_request_size_bytes", "Tamanho do corpo das requisições recebidas.", ("service", "path"), SIZE_BUCKETS)
+HTTP_RESPONSE_BYTES = REGISTRY.histogram(
+    "saka_http_response_size_bytes", "Tamanho do corpo das respostas enviadas.", ("service", "path"), SIZE_BUCKETS)
+
+
+def install_metrics(app: FastAPI, service: str):
+    """
+    Instala no app o middleware de métricas HTTP (contagens, em andamento, latência e
+    tamanhos de payload por rota) e o endpoint público `/metrics`.
+    """
+    @app.middleware("http")
+    async def metrics_middleware(request: Request, call_next):
+        if request.url.path == "/metrics":
+            return await call_next(request)
+
+        HTTP_IN_FLIGHT.inc(service=service)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await call_next(request)
+            return response
+        finally:
+            HTTP_IN_FLIGHT.dec(service=service)
+            # Usa o template da rota (ex: /agents/{agent_id}) para não multiplicar séries por URL
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            status = str(response.status_code) if response is not None else "500"
+
+            HTTP_LATENCY.observe(time.perf_counter() - start, service=service, path=path)
+            HTTP_REQUESTS.inc(service=service, path=path, method=request.method, status=status)
+            request_size = request.headers.get("content-length")
+            if request_size:
+                HTTP_REQUEST_BYTES.observe(int(request_size), service=service, path=path)
+            if response is not None and response.headers.get("content-length"):
+                HTTP_RESPONSE_BYTES.observe(int(response.headers["content-length"]), service=service, path=path)
+
+    async def metrics():
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False, summary="Métricas no formato Prometheus")
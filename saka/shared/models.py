@@ -42,10 +42,44 @@ class MacroImpact(str, Enum):
 
 # --- Modelos de Requisição (Inputs para os agentes) ---
 
+class EncodedPrices(BaseModel):
+    """Série de preços em formato binário compacto: bytes little-endian codificados em base64."""
+    dtype: Literal["float64", "float32"] = Field("float64", description="Tipo dos valores; float32 reduz o payload pela metade com menor precisão.")
+    data: str = Field(..., description="Bytes brutos do array de preços, codificados em base64.")
+
+class PriceSeriesRef(BaseModel):
+    """Referência a uma janela do armazenamento de preços compartilhado (PRICE_STORE_DIR)."""
+    column: Literal["open", "high", "low", "close", "volume"] = Field("close", description="Coluna OHLCV a ser lida.")
+    start: Optional[int] = Field(None, description="Timestamp inicial (epoch em segundos), inclusivo.")
+    end: Optional[int] = Field(None, description="Timestamp final (epoch em segundos), exclusivo.")
+    limit: Optional[int] = Field(None, gt=0, description="Mantém apenas as N barras mais recentes do intervalo.")
+
 class AnalysisRequest(BaseModel):
     """Requisição genérica para análise de um ativo."""
     asset: str = Field(..., description="O ativo a ser analisado, ex: 'BTC/USD'")
     historical_prices: Optional[List[float]] = Field(None, description="Lista de preços de fechamento recentes para análises de volatilidade ou técnicas.")
+    encoded_prices: Optional[EncodedPrices] = Field(None, description="Alternativa binária a historical_prices; tem prioridade quando presente.")
+    price_ref: Optional[PriceSeriesRef] = Field(None, description="Janela no armazenamento de preços compartilhado, usada quando a série não é enviada na requisição.")
+
+class PriceTick(BaseModel):
+    """Último preço de fechamento de um ativo, para análises incrementais (streaming)."""
+    asset: str = Field(..., description="O ativo a ser analisado, ex: 'BTC/USD'")
+    price: float = Field(..., gt=0, description="Novo preço de fechamento.")
+    period: int = Field(14, ge=2, description="Período do indicador cujo estado deve ser atualizado.")
+
+class OHLCAnalysisRequest(AnalysisRequest):
+    """Janela de fechamentos acompanhada das colunas OHLC, alinhadas com os preços, para os estimadores por faixa."""
+    open: Optional[List[float]] = Field(None, description="Preços de abertura, alinhados com os fechamentos.")
+    high: Optional[List[float]] = Field(None, description="Máximas, alinhadas com os fechamentos.")
+    low: Optional[List[float]] = Field(None, description="Mínimas, alinhadas com os fechamentos.")
+
+class PriceBar(BaseModel):
+    """Última barra de um ativo, para análises incrementais (streaming). Abertura, máxima e mínima são opcionais."""
+    asset: str = Field(..., description="O ativo a ser analisado, ex: 'BTC/USD'")
+    close: float = Field(..., gt=0, description="Preço de fechamento da barra.")
+    open: Optional[float] = Field(None, ge=0)
+    high: Optional[float] = Field(None, ge=0)
+    low: Optional[float] = Field(None, ge=0)
 
 # --- Modelos de Resposta (Outputs dos agentes de análise) ---
 
@@ -55,6 +89,9 @@ class SentinelRiskOutput(BaseModel):
     volatility: float = Field(..., description="Volatilidade calculada (desvio padrão dos retornos).")
     can_trade: bool = Field(..., description="Veto de segurança. Se False, a negociação deve ser bloqueada.")
     reason: str
+    ewma_volatility: Optional[float] = Field(None, description="Volatilidade EWMA dos retornos (estado incremental com EWMA habilitada).")
+    parkinson_volatility: Optional[float] = Field(None, description="Volatilidade de Parkinson (máxima/mínima) da janela, por barra.")
+    garman_klass_volatility: Optional[float] = Field(None, description="Volatilidade de Garman-Klass (OHLC) da janela, por barra.")
 
 class AthenaSentimentOutput(BaseModel):
     asset: str
@@ -62,9 +99,27 @@ class AthenaSentimentOutput(BaseModel):
     signal: TradeSignal
     confidence: float = Field(..., ge=0.0, le=1.0)
 
+class MACDOutput(BaseModel):
+    macd: float = Field(..., description="EMA(12) - EMA(26) dos fechamentos.")
+    signal: float = Field(..., description="EMA(9) da linha MACD.")
+    histogram: float = Field(..., description="MACD - sinal.")
+
+class BollingerBandsOutput(BaseModel):
+    upper: float
+    middle: float = Field(..., description="Média simples dos últimos 20 fechamentos.")
+    lower: float
+
+class StochasticOutput(BaseModel):
+    k: float = Field(..., description="%K de 14 períodos.")
+    d: float = Field(..., description="%D: média simples dos últimos 3 valores de %K.")
+
 class CronosTechnicalOutput(BaseModel):
     asset: str
     rsi: float = Field(..., description="Índice de Força Relativa (14 períodos) calculado manualmente.")
+    macd: Optional[MACDOutput] = Field(None, description="Presente quando solicitado em `indicators`.")
+    bollinger: Optional[BollingerBandsOutput] = Field(None, description="Presente quando solicitado em `indicators`.")
+    atr: Optional[float] = Field(None, description="Average True Range (14 períodos); presente quando solicitado em `indicators`.")
+    stochastic: Optional[StochasticOutput] = Field(None, description="Presente quando solicitado em `indicators`.")
 
 class OrionMacroOutput(BaseModel):
     asset: str
@@ -102,6 +157,44 @@ class TradeExecutionReceipt(BaseModel):
     amount_usd: float
     timestamp: str
 
+# --- Modelos para Processamento em Lote (vários ativos por chamada) ---
+
+class BatchAnalysisRequest(BaseModel):
+    """Requisição de análise para vários ativos em uma única chamada."""
+    requests: List[AnalysisRequest] = Field(..., description="Uma requisição de análise por ativo.")
+
+class BatchItemError(BaseModel):
+    """Erro de um único item de um lote; os demais itens seguem sendo processados."""
+    index: int = Field(..., description="Posição do item na requisição em lote.")
+    asset: str
+    error: str
+    details: Optional[str] = None
+    source_agent: Optional[AgentName] = None
+
+class SentinelBatchOutput(BaseModel):
+    results: List[SentinelRiskOutput] = []
+    errors: List[BatchItemError] = []
+
+class CronosBatchOutput(BaseModel):
+    results: List[CronosTechnicalOutput] = []
+    errors: List[BatchItemError] = []
+
+class OrionBatchOutput(BaseModel):
+    results: List[OrionMacroOutput] = []
+    errors: List[BatchItemError] = []
+
+class KamilaBatchInput(BaseModel):
+    """Input em lote para a Kamila: um conjunto consolidado por ativo."""
+    items: List[ConsolidatedDataInput]
+
+class KamilaBatchDecision(BaseModel):
+    asset: str
+    decision: KamilaFinalDecision
+
+class KamilaBatchOutput(BaseModel):
+    decisions: List[KamilaBatchDecision] = []
+    errors: List[BatchItemError] = []
+
 # --- Modelo de Erro Padrão ---
 
 class ErrorResponse(BaseModel):
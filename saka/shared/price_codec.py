@@ -0,0 +1,59 @@
+import base64
+from typing import Optional
+import numpy as np
+from saka.shared.models import AnalysisRequest, EncodedPrices
+from saka.shared.price_store import get_price_store
+
+# Formatos aceitos para a série de preços trafegada entre Orquestrador e agentes
+PRICE_WIRE_FORMATS = ("json", "float64", "float32")
+
+_NUMPY_DTYPES = {"float64": np.dtype("<f8"), "float32": np.dtype("<f4")}
+
+
+def encode_prices(prices, dtype: str = "float64") -> EncodedPrices:
+    """Codifica uma série de preços como bytes brutos little-endian em base64."""
+    array = np.ascontiguousarray(prices, dtype=_NUMPY_DTYPES[dtype])
+    return EncodedPrices(dtype=dtype, data=base64.b64encode(array.tobytes()).decode("ascii"))
+
+
+def decode_prices(encoded: EncodedPrices) -> np.ndarray:
+    """
+    Decodifica uma série binária diretamente em um array NumPy (somente leitura),
+    usando o buffer decodificado sem cópias adicionais.
+    """
+    dtype = _NUMPY_DTYPES[encoded.dtype]
+    try:
+        raw = base64.b64decode(encoded.data, validate=True)
+    except ValueError as e:
+        raise ValueError(f"Série de preços binária inválida: {e}")
+    if len(raw) % dtype.itemsize:
+        raise ValueError(f"Série de preços binária inválida: {len(raw)} bytes não formam valores {encoded.dtype}.")
+    return np.frombuffer(raw, dtype=dtype)
+
+
+def resolve_prices(request: AnalysisRequest) -> Optional[np.ndarray]:
+    """
+    Retorna os preços da requisição como array NumPy, qualquer que seja o formato recebido.
+    Referências ao armazenamento compartilhado são lidas como views mapeadas em memória.
+    """
+    if request.encoded_prices is not None:
+        return decode_prices(request.encoded_prices)
+    if request.historical_prices is not None:
+        return np.asarray(request.historical_prices, dtype=float)
+    if request.price_ref is not None:
+        ref = request.price_ref
+        return get_price_store().read(request.asset, ref.start, ref.end, (ref.column,), ref.limit)[ref.column]
+    return None
+
+
+def to_wire_payload(request: AnalysisRequest, wire_format: str = "json") -> dict:
+    """
+    Serializa a requisição para envio aos agentes no formato configurado.
+    Requisições que já chegam em formato binário são repassadas como estão.
+    """
+    if wire_format == "json" or request.encoded_prices is not None or request.historical_prices is None:
+        return request.dict(exclude_none=True)
+    return {
+        "asset": request.asset,
+        "encoded_prices": encode_prices(request.historical_prices, wire_format).dict()
+    }
@@ -0,0 +1,131 @@
+import os
+import re
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import quote, unquote
+import numpy as np
+
+# Colunas armazenadas por ativo; o timestamp (epoch em segundos) ordena as barras
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+STORE_COLUMNS = ("timestamp",) + OHLCV_COLUMNS
+
+_COLUMN_DTYPES = {"timestamp": np.dtype("<i8"), **{c: np.dtype("<f8") for c in OHLCV_COLUMNS}}
+_ASSET_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9._\-/]*")
+
+
+class PriceStore:
+    """
+    Armazenamento colunar de barras OHLCV, um diretório por ativo e um arquivo binário por coluna.
+
+    Os arquivos só crescem (append-only), então qualquer processo com acesso ao diretório
+    (o Orquestrador e os agentes no mesmo host ou volume) pode mapeá-los em memória e
+    ler janelas como views NumPy sem cópia. Assume um único escritor por ativo.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        # Mapas já abertos por (ativo, coluna), refeitos quando o arquivo cresce
+        self._maps: Dict[Tuple[str, str], np.memmap] = {}
+
+    def _asset_dir(self, asset: str) -> str:
+        if not _ASSET_PATTERN.fullmatch(asset) or ".." in asset:
+            raise ValueError(f"Nome de ativo inválido para o armazenamento de preços: {asset!r}")
+        # Codificação injetiva: "BTC/USD" vira "BTC%2FUSD" e nunca colide com "BTC_USD"
+        return os.path.join(self.root, quote(asset, safe=""))
+
+    def _column_path(self, asset: str, column: str) -> str:
+        return os.path.join(self._asset_dir(asset), f"{column}.bin")
+
+    def assets(self) -> list:
+        """Lista os ativos presentes no armazenamento."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(unquote(name) for name in os.listdir(self.root))
+
+    def length(self, asset: str) -> int:
+        """Número de barras completas do ativo (todas as colunas gravadas)."""
+        sizes = []
+        for column in STORE_COLUMNS:
+            path = self._column_path(asset, column)
+            if not os.path.exists(path):
+                return 0
+            sizes.append(os.path.getsize(path) // _COLUMN_DTYPES[column].itemsize)
+        return min(sizes)
+
+    def append(self, asset: str, timestamp: Iterable[int], **columns) -> int:
+        """
+        Acrescenta barras ao final da série do ativo e retorna o novo total de barras.
+        Os timestamps devem ser estritamente crescentes e posteriores à última barra gravada.
+        """
+        timestamps = np.ascontiguousarray(timestamp, dtype=_COLUMN_DTYPES["timestamp"])
+        missing = set(OHLCV_COLUMNS) - set(columns)
+        if missing:
+            raise ValueError(f"Colunas ausentes: {sorted(missing)}")
+
+        data = {"timestamp": timestamps}
+        for column in OHLCV_COLUMNS:
+            data[column] = np.ascontiguousarray(columns[column], dtype=_COLUMN_DTYPES[column])
+            if len(data[column]) != len(timestamps):
+                raise ValueError(f"A coluna {column} tem tamanho diferente de timestamp.")
+
+        if len(timestamps) == 0:
+            return self.length(asset)
+        if np.any(np.diff(timestamps) <= 0):
+            raise ValueError("Os timestamps devem ser estritamente crescentes.")
+
+        current = self.length(asset)
+        if current and timestamps[0] <= self._map(asset, "timestamp", current)[-1]:
+            raise ValueError("O armazenamento é append-only: os novos timestamps devem ser posteriores à última barra.")
+
+        os.makedirs(self._asset_dir(asset), exist_ok=True)
+        # O timestamp é gravado por último: leitores só enxergam barras com todas as colunas
+        for column in OHLCV_COLUMNS + ("timestamp",):
+            path = self._column_path(asset, column)
+            with open(path, "ab") as f:
+                # Descarta restos de uma gravação interrompida antes de acrescentar
+                f.truncate(current * _COLUMN_DTYPES[column].itemsize)
+                f.write(data[column].tobytes())
+        return current + len(timestamps)
+
+    def _map(self, asset: str, column: str, length: int) -> np.ndarray:
+        key = (asset, column)
+        mapped = self._maps.get(key)
+        if mapped is None or len(mapped) < length:
+            mapped = np.memmap(self._column_path(asset, column), dtype=_COLUMN_DTYPES[column], mode="r", shape=(length,))
+            self._maps[key] = mapped
+        return mapped[:length]
+
+    def read(self, asset: str, start: Optional[int] = None, end: Optional[int] = None,
+             columns: Iterable[str] = ("close",), limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Retorna views somente leitura das colunas pedidas para as barras com start <= timestamp < end.
+        Com `limit`, mantém apenas as `limit` barras mais recentes do intervalo.
+        """
+        columns = tuple(columns)
+        invalid = set(columns) - set(STORE_COLUMNS)
+        if invalid:
+            raise ValueError(f"Colunas desconhecidas: {sorted(invalid)}")
+
+        length = self.length(asset)
+        if length == 0:
+            raise ValueError(f"Nenhuma barra armazenada para o ativo {asset}.")
+
+        timestamps = self._map(asset, "timestamp", length)
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        last = length if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        if limit is not None:
+            first = max(first, last - limit)
+
+        return {column: self._map(asset, column, length)[first:last] for column in columns}
+
+
+_default_store: Optional[PriceStore] = None
+
+
+def get_price_store() -> PriceStore:
+    """Retorna o armazenamento compartilhado configurado por PRICE_STORE_DIR."""
+    global _default_store
+    root = os.getenv("PRICE_STORE_DIR")
+    if not root:
+        raise ValueError("Armazenamento de preços não configurado (PRICE_STORE_DIR).")
+    if _default_store is None or _default_store.root != root:
+        _default_store = PriceStore(root)
+    return _default_store
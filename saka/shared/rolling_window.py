@@ -0,0 +1,169 @@
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+
+class RollingWindow:
+    """
+    Janela com os últimos `capacity` valores de uma série, em um buffer circular pré-alocado.
+
+    Cada valor é gravado duas vezes (na posição `i` e na posição `i + capacity` de um buffer
+    com o dobro da capacidade), de modo que a janela é sempre um trecho contíguo do buffer:
+    `values()` devolve uma visão sem cópia, pronta para o código vetorizado dos indicadores.
+    `append` é O(1) e mantém a soma e a soma dos quadrados da janela, então média, variância
+    e desvio padrão também são consultados em O(1).
+
+    A visão reflete o buffer: continua válida até o próximo `append`/`extend`. Quem precisar
+    guardá-la por mais tempo deve copiá-la.
+    """
+    def __init__(self, capacity: int, values: Optional[Iterable[float]] = None):
+        if capacity < 1:
+            raise ValueError("A capacidade da janela deve ser positiva.")
+        self.capacity = capacity
+        self._buffer = np.empty(2 * capacity, dtype=float)
+        self.clear()
+        if values is not None:
+            self.extend(values)
+
+    def clear(self):
+        """Descarta todos os valores."""
+        self._next = 0
+        self._size = 0
+        self._since_resync = 0
+        # Somas deslocadas por uma referência próxima dos valores, para evitar cancelamento catastrófico
+        self._shift = 0.0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        return self._size == self.capacity
+
+    def append(self, value: float):
+        value = float(value)
+        if self._size == 0:
+            self._shift = value
+        if self._size == self.capacity:
+            removed = self._buffer[self._next] - self._shift
+            self._sum -= removed
+            self._sum_sq -= removed * removed
+        else:
+            self._size += 1
+        self._buffer[self._next] = value
+        self._buffer[self._next + self.capacity] = value
+        self._next = (self._next + 1) % self.capacity
+
+        shifted = value - self._shift
+        self._sum += shifted
+        self._sum_sq += shifted * shifted
+        self._count_updates(1)
+
+    def extend(self, values: Iterable[float]):
+        """Acrescenta vários valores de uma vez (equivalente a `append` de cada um, em ordem)."""
+        values = np.asarray(values, dtype=float).ravel()
+        count = len(values)
+        if count == 0:
+            return
+        if count >= self.capacity:
+            self.clear()
+            values = values[-self.capacity:]
+            self._buffer[:self.capacity] = values
+            self._buffer[self.capacity:] = values
+            self._size = self.capacity
+            self._resync()
+            return
+
+        if self._size == 0:
+            self._shift = float(values[0])
+        positions = (self._next + np.arange(count)) % self.capacity
+        # As posições a partir de `capacity - size` já estão ocupadas: seus valores saem da janela
+        removed = self._buffer[positions[self.capacity - self._size:]] - self._shift
+        shifted = values - self._shift
+        self._sum += float(shifted.sum() - removed.sum())
+        self._sum_sq += float(shifted @ shifted - removed @ removed)
+        self._buffer[positions] = values
+        self._buffer[positions + self.capacity] = values
+        self._next = (self._next + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+        self._count_updates(count)
+
+    def _count_updates(self, count: int):
+        # Recalcula as somas a cada `capacity` atualizações: custo amortizado O(1) e erro de arredondamento limitado
+        self._since_resync += count
+        if self._since_resync >= self.capacity:
+            self._resync()
+
+    def _resync(self):
+        values = self.values()
+        self._shift = float(values[-1]) if len(values) else 0.0
+        shifted = values - self._shift
+        self._sum = float(shifted.sum())
+        self._sum_sq = float(shifted @ shifted)
+        self._since_resync = 0
+
+    def values(self) -> np.ndarray:
+        """Valores em ordem cronológica, como uma visão somente leitura do buffer (sem cópia)."""
+        start = (self._next - self._size) % self.capacity
+        view = self._buffer[start:start + self._size]
+        view.flags.writeable = False
+        return view
+
+    def tail(self, count: int) -> np.ndarray:
+        """Os `count` valores mais recentes (visão sem cópia)."""
+        return self.values()[-count:] if count > 0 else self.values()[:0]
+
+    @property
+    def last(self) -> Optional[float]:
+        return float(self._buffer[self._next - 1 + self.capacity]) if self._size else None
+
+    @property
+    def sum(self) -> float:
+        return self._sum + self._size * self._shift
+
+    @property
+    def sum_of_squares(self) -> float:
+        return self._sum_sq + 2 * self._shift * self._sum + self._size * self._shift ** 2
+
+    def mean(self) -> Optional[float]:
+        if self._size == 0:
+            return None
+        return self._shift + self._sum / self._size
+
+    def var(self, ddof: int = 0) -> Optional[float]:
+        """Variância da janela em O(1) (`ddof` como em `np.var`)."""
+        if self._size <= ddof:
+            return None
+        return max(self._sum_sq - self._sum * self._sum / self._size, 0.0) / (self._size - ddof)
+
+    def std(self, ddof: int = 0) -> Optional[float]:
+        variance = self.var(ddof)
+        return None if variance is None else variance ** 0.5
+
+
+class RollingWindows:
+    """Uma `RollingWindow` por ativo, todas com a mesma capacidade, criadas no primeiro valor recebido."""
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.windows: Dict[str, RollingWindow] = {}
+
+    def window(self, asset: str) -> RollingWindow:
+        window = self.windows.get(asset)
+        if window is None:
+            window = self.windows[asset] = RollingWindow(self.capacity)
+        return window
+
+    def append(self, asset: str, value: float) -> RollingWindow:
+        window = self.window(asset)
+        window.append(value)
+        return window
+
+    def __getitem__(self, asset: str) -> RollingWindow:
+        return self.windows[asset]
+
+    def __contains__(self, asset: str) -> bool:
+        return asset in self.windows
+
+    def assets(self) -> List[str]:
+        return list(self.windows)
@@ -0,0 +1,201 @@
+import functools
+import inspect
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+import httpx
+from fastapi import FastAPI, Request
+
+# Cabeçalho de contexto de rastreamento no formato W3C Trace Context:
+# 00-<trace_id: 32 hex>-<span_id do pai: 16 hex>-<flags>
+TRACE_HEADER = "traceparent"
+_TRACEPARENT_PATTERN = re.compile(r"00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}")
+
+
+class Span:
+    """Intervalo de trabalho de um serviço dentro de um rastreamento (trace)."""
+    def __init__(self, name: str, service: str, trace_id: str, parent_id: Optional[str] = None,
+                 local_root: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.service = service
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        # Primeiro span do serviço nesta requisição; registra o início e o fim dos spans internos
+        self.local_root = local_root or self
+        self.first_child_start: Optional[float] = None
+        self.last_child_end: Optional[float] = None
+        self.start = time.time()
+        self._perf_start = time.perf_counter()
+        self.end: Optional[float] = None
+        if self.local_root is not self and self.local_root.first_child_start is None:
+            self.local_root.first_child_start = self.start
+
+    def finish(self, end: Optional[float] = None):
+        self.end = end if end is not None else self.start + (time.perf_counter() - self._perf_start)
+        if self.local_root is not self:
+            self.local_root.last_child_end = self.end
+
+    @property
+    def duration(self) -> float:
+        return (self.end or self.start) - self.start
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "service": self.service,
+            "start": self.start, "end": self.end, "attributes": self.attributes,
+        }
+
+
+class InMemoryCollector:
+    """Mantém os spans mais recentes em memória (útil em testes e para inspeção local)."""
+    def __init__(self, max_spans: int = 10000):
+        self.spans = deque(maxlen=max_spans)
+
+    def record(self, span: Span):
+        self.spans.append(span.to_dict())
+
+    def traces(self) -> Dict[str, List[dict]]:
+        grouped: Dict[str, List[dict]] = {}
+        for span in list(self.spans):
+            grouped.setdefault(span["trace_id"], []).append(span)
+        return grouped
+
+
+class FileCollector:
+    """Acrescenta cada span como uma linha JSON em um arquivo, que pode ser compartilhado entre serviços."""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, span: Span):
+        line = json.dumps(span.to_dict()) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def _default_collector():
+    path = os.getenv("TRACE_FILE")
+    return FileCollector(path) if path else InMemoryCollector(int(os.getenv("TRACE_BUFFER_SIZE", "10000")))
+
+
+collector = _default_collector()
+_current_span: ContextVar[Optional[Span]] = ContextVar("saka_current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def parse_traceparent(header: Optional[str]):
+    """Extrai (trace_id, span_id do pai) de um cabeçalho traceparent; None se ausente ou inválido."""
+    match = _TRACEPARENT_PATTERN.fullmatch((header or "").strip().lower())
+    if not match or match.group(1) == "0" * 32:
+        return None
+    return match.group(1), match.group(2)
+
+
+@contextmanager
+def span(name: str, service: Optional[str] = None, **attributes):
+    """
+    Abre um span filho do span atual (ou inicia um novo rastreamento) e o registra no coletor ao sair.
+    Funciona em código síncrono e assíncrono, pois o span atual é propagado por contextvars.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        new_span = Span(name, service or parent.service, parent.trace_id, parent.span_id, parent.local_root, **attributes)
+    else:
+        new_span = Span(name, service or "unknown", secrets.token_hex(16), **attributes)
+
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except Exception as e:
+        new_span.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        new_span.finish()
+        collector.record(new_span)
+
+
+def traced(name: str, service: Optional[str] = None):
+    """Decorador que executa a função (síncrona ou assíncrona) dentro de um span."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, service):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, service):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def inject_trace_headers(request: httpx.Request):
+    """Event hook do httpx: propaga o span atual para o serviço chamado."""
+    current = _current_span.get()
+    if current is not None:
+        request.headers[TRACE_HEADER] = current.traceparent()
+
+
+def install_tracing(app: FastAPI, service: str):
+    """
+    Instala no app o middleware de rastreamento: continua o trace recebido no cabeçalho
+    `traceparent` (ou inicia um novo) e registra o span da requisição com os spans de
+    validação (leitura do corpo, modelos e autenticação, até o primeiro span do endpoint)
+    e de serialização (do fim do último span do endpoint até a resposta).
+    """
+    @app.middleware("http")
+    async def tracing_middleware(request: Request, call_next):
+        if request.url.path in ("/metrics", "/health"):
+            return await call_next(request)
+
+        incoming = parse_traceparent(request.headers.get(TRACE_HEADER))
+        if incoming:
+            server_span = Span(f"{request.method} {request.url.path}", service, incoming[0], incoming[1])
+        else:
+            server_span = Span(f"{request.method} {request.url.path}", service, secrets.token_hex(16))
+
+        token = _current_span.set(server_span)
+        response = None
+        try:
+            response = await call_next(request)
+            return response
+        finally:
+            _current_span.reset(token)
+            server_span.finish()
+            route = request.scope.get("route")
+            if route is not None:
+                server_span.name = f"{request.method} {route.path}"
+            server_span.attributes["status"] = response.status_code if response is not None else 500
+
+            # O endpoint abriu spans próprios: o que vem antes é validação e o que vem depois, serialização
+            if server_span.first_child_start is not None:
+                _record_interval("validation", server_span, server_span.start, server_span.first_child_start)
+                _record_interval("serialization", server_span, server_span.last_child_end, server_span.end)
+            collector.record(server_span)
+
+
+def _record_interval(name: str, parent: Span, start: float, end: float):
+    interval = Span(name, parent.service, parent.trace_id, parent.span_id)
+    interval.start = start
+    interval.end = max(start, end)
+    collector.record(interval)
@@ -1,33 +1,41 @@
 import pandas as pd
+import numpy as np
 import requests
 import argparse
 import os
+import sys
+import time
+from numpy.lib.stride_tricks import sliding_window_view
 from dotenv import load_dotenv
 
+# Permite importar o pacote saka ao executar o script diretamente
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from saka.agents.sentinel_risk.main import calculate_volatility_batch, VOLATILITY_THRESHOLD
+from saka.agents.cronos_cycles.main import calculate_rsi_batch
+from saka.agents.orion_cfo.main import HIGH_IMPACT_PROBABILITY
+from saka.agents.kamila_ceo.main import decide_signals, TRADE_AMOUNT_USD, RSI_OVERSOLD, RSI_OVERBOUGHT
+from saka.shared.market_data import load_ohlcv
+from saka.shared.rolling_window import RollingWindow
+
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
 
 # --- Configurações ---
 ORCHESTRATOR_URL = os.getenv("ORCHESTRATOR_URL", "http://localhost:8080")
 API_KEY = os.getenv("INTERNAL_API_KEY")
+ASSET = "BTC/USD"
+# Período de "aquecimento" para os indicadores técnicos (ex: RSI de 14 dias, MACD de 26 dias)
+WARMUP_PERIOD = 30
 
-def load_data(filepath: str) -> pd.DataFrame:
+def load_data(filepath: str, use_cache: bool = True) -> pd.DataFrame:
     """
-    Carrega os dados históricos de um arquivo CSV e os valida.
+    Carrega os dados históricos de um CSV em qualquer um dos formatos conhecidos
+    (nativo, CryptoDataDownload ou Date/Open/High/Low/Close), normalizados e ordenados.
+    A primeira carga gera um cache colunar; as seguintes apenas o mapeiam em memória.
     """
     print(f"Carregando dados de: {filepath}")
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"Arquivo de dados não encontrado em: {filepath}")
-
-    df = pd.read_csv(filepath, parse_dates=['timestamp'])
-
-    # Validação de colunas
-    required_columns = {'timestamp', 'open', 'high', 'low', 'close', 'volume'}
-    if not required_columns.issubset(df.columns):
-        raise ValueError(f"O arquivo CSV deve conter as seguintes colunas: {required_columns}")
-
-    df.set_index('timestamp', inplace=True)
-    df.sort_index(inplace=True)
+    df = load_ohlcv(filepath, use_cache=use_cache)
 
     print(f"Dados carregados com sucesso. Período: {df.index.min()} a {df.index.max()}. Total de {len(df)} registros.")
     return df
@@ -36,8 +44,9 @@ class Portfolio:
     """
     Gerencia o estado do portfólio, incluindo caixa, posições e trades.
     """
-    def __init__(self, initial_cash=10000.0):
+    def __init__(self, initial_cash=10000.0, verbose=True):
         self.initial_cash = initial_cash
+        self.verbose = verbose
         self.cash = initial_cash
         self.positions = {}  # 'asset': {'units': float, 'entry_price': float}
         self.history = []
@@ -59,7 +68,8 @@ class Portfolio:
 
         if side == 'buy':
             if self.cash < amount_usd:
-                print(f"AVISO: Caixa insuficiente para comprar {amount_usd:.2f} de {asset}. Ignorando ordem.")
+                if self.verbose:
+                    print(f"AVISO: Caixa insuficiente para comprar {amount_usd:.2f} de {asset}. Ignorando ordem.")
                 return
 
             self.cash -= amount_usd
@@ -67,11 +77,13 @@ class Portfolio:
             current_units = self.positions.get(asset, {}).get('units', 0)
             self.positions[asset] = {'units': current_units + units, 'entry_price': price}
             self.history.append({'date': price, 'asset': asset, 'side': 'buy', 'amount_usd': amount_usd, 'price': price})
-            print(f"ORDEM EXECUTADA: Comprar {units:.6f} {asset} a ${price:.2f}")
+            if self.verbose:
+                print(f"ORDEM EXECUTADA: Comprar {units:.6f} {asset} a ${price:.2f}")
 
         elif side == 'sell':
             if asset not in self.positions or self.positions[asset]['units'] < units:
-                print(f"AVISO: Posição insuficiente para vender {units:.6f} de {asset}. Ignorando ordem.")
+                if self.verbose:
+                    print(f"AVISO: Posição insuficiente para vender {units:.6f} de {asset}. Ignorando ordem.")
                 return
 
             self.cash += amount_usd
@@ -79,10 +91,11 @@ class Portfolio:
             if self.positions[asset]['units'] < 1e-6: # Limpeza de posições pequenas
                 del self.positions[asset]
             self.history.append({'date': price, 'asset': asset, 'side': 'sell', 'amount_usd': amount_usd, 'price': price})
-            print(f"ORDEM EXECUTADA: Vender {units:.6f} {asset} a ${price:.2f}")
+            if self.verbose:
+                print(f"ORDEM EXECUTADA: Vender {units:.6f} {asset} a ${price:.2f}")
 
 
-def run_backtest(data_filepath: str):
+def run_backtest(data_filepath: str, use_cache: bool = True):
     """
     Função principal para executar o backtest.
     """
@@ -91,10 +104,9 @@ def run_backtest(data_filepath: str):
         return
 
     headers = {"X-Internal-API-Key": API_KEY}
-    historical_data = load_data(data_filepath)
+    historical_data = load_data(data_filepath, use_cache=use_cache)
 
-    # Período de "aquecimento" para os indicadores técnicos (ex: RSI de 14 dias, MACD de 26 dias)
-    warmup_period = 30
+    warmup_period = WARMUP_PERIOD
 
     if len(historical_data) < warmup_period:
         print("Erro: Dados históricos insuficientes para o período de aquecimento.")
@@ -103,23 +115,23 @@ def run_backtest(data_filepath: str):
     print("\n--- Iniciando a Simulação de Backtesting ---")
 
     portfolio = Portfolio()
+    closes = historical_data['close'].to_numpy(dtype=float)
+    # Janela de dados para análise (passado), avançada uma barra por iteração
+    analysis_window = RollingWindow(warmup_period, closes[:warmup_period])
 
     # Itera sobre os dados, começando após o período de aquecimento
     for i in range(warmup_period, len(historical_data)):
-        # Janela de dados para análise (passado)
-        analysis_window = historical_data.iloc[i-warmup_period:i]
         # Dados do dia atual para execução e avaliação
-        current_day_data = historical_data.iloc[i]
-        current_date = current_day_data.name.date()
-        current_price = current_day_data['close']
+        current_date = historical_data.index[i].date()
+        current_price = float(closes[i])
 
         # Prepara a requisição para o Orquestrador
         payload = {
-            "asset": "BTC/USD",
-            "historical_prices": analysis_window['close'].tolist()
+            "asset": ASSET,
+            "historical_prices": analysis_window.values().tolist()
         }
 
-        print(f"\n[ {current_date} ] Preço Atual: ${current_price:.2f} | Valor do Portfólio: ${portfolio.update_value({'BTC/USD': current_price}):.2f}")
+        print(f"\n[ {current_date} ] Preço Atual: ${current_price:.2f} | Valor do Portfólio: ${portfolio.update_value({ASSET: current_price}):.2f}")
 
         try:
             response = requests.post(f"{ORCHESTRATOR_URL}/trigger_decision_cycle_sync", json=payload, headers=headers, timeout=45)
@@ -142,58 +154,127 @@ def run_backtest(data_filepath: str):
             print("Verifique se os contêineres do S.A.K.A. estão rodando com 'docker compose up'.")
             break # Interrompe a simulação se a comunicação falhar
 
+        analysis_window.append(current_price)
+
     print("\n--- Simulação de Backtesting Concluída ---")
     generate_performance_report(portfolio)
 
 
-def generate_performance_report(portfolio: Portfolio):
-    """Calcula e exibe as métricas de performance do backtest."""
-    final_value = portfolio.total_value_history[-1]
-    total_return_pct = ((final_value / portfolio.initial_cash) - 1) * 100
+def compute_signals(closes, warmup_period: int = WARMUP_PERIOD, seed=None,
+                    rsi_period: int = 14,
+                    volatility_threshold: float = VOLATILITY_THRESHOLD,
+                    rsi_oversold: float = RSI_OVERSOLD,
+                    rsi_overbought: float = RSI_OVERBOUGHT) -> np.ndarray:
+    """
+    Calcula as decisões de todas as barras em passes vetorizados, sem HTTP.
 
-    print("\n--- Relatório de Performance ---")
-    print(f"Período Analisado: {len(portfolio.total_value_history)} dias")
-    print(f"Valor Inicial do Portfólio: ${portfolio.initial_cash:,.2f}")
-    print(f"Valor Final do Portfólio:   ${final_value:,.2f}")
-    print(f"Retorno Total: {total_return_pct:.2f}%")
-    print("-" * 30)
+    A barra i usa a janela closes[i - warmup_period:i], a mesma enviada ao Orquestrador
+    pelo modo HTTP. O evento macro do Orion é simulado com um gerador semeável.
+    Os parâmetros da estratégia têm como padrão os valores usados pelos agentes.
+    Retorna o lado de cada decisão ('buy', 'sell' ou 'hold') para as barras warmup_period..N-1.
+    """
+    closes = np.asarray(closes, dtype=float)
+    windows = sliding_window_view(closes, warmup_period)[:-1]
 
-    total_trades = len(portfolio.history)
-    if total_trades == 0:
-        print("Nenhum trade foi executado.")
+    volatility = calculate_volatility_batch(windows)
+    rsi = calculate_rsi_batch(windows, rsi_period)
+    macro_high_impact = np.random.default_rng(seed).random(len(windows)) < HIGH_IMPACT_PROBABILITY
+
+    return decide_signals(volatility <= volatility_threshold, macro_high_impact, rsi, rsi_oversold, rsi_overbought)
+
+
+def simulate_portfolio(closes, signals, warmup_period: int = WARMUP_PERIOD, verbose: bool = False,
+                       amount_usd: float = TRADE_AMOUNT_USD) -> Portfolio:
+    """Aplica as decisões pré-calculadas ao portfólio, executando ao fechamento de cada barra."""
+    portfolio = Portfolio(verbose=verbose)
+    for i, side in enumerate(signals, start=warmup_period):
+        current_price = float(closes[i])
+        portfolio.update_value({ASSET: current_price})
+        if side != 'hold':
+            portfolio.execute_trade(asset=ASSET, side=side, amount_usd=amount_usd, price=current_price)
+    return portfolio
+
+
+def run_backtest_local(data_filepath: str, seed=None, use_cache: bool = True):
+    """
+    Executa o backtest em processo, importando a lógica pura dos agentes.
+    Não requer os contêineres nem a chave de API.
+    """
+    historical_data = load_data(data_filepath, use_cache=use_cache)
+
+    if len(historical_data) <= WARMUP_PERIOD:
+        print("Erro: Dados históricos insuficientes para o período de aquecimento.")
         return
 
-    # Calcular Taxa de Acerto (Win Rate)
+    print("\n--- Iniciando a Simulação de Backtesting (modo local vetorizado) ---")
+    start_time = time.perf_counter()
+
+    closes = historical_data['close'].to_numpy(dtype=float)
+    signals = compute_signals(closes, WARMUP_PERIOD, seed=seed)
+    portfolio = simulate_portfolio(closes, signals, WARMUP_PERIOD)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"\n--- Simulação de Backtesting Concluída em {elapsed * 1000:.1f} ms ---")
+    generate_performance_report(portfolio)
+    return portfolio
+
+
+def compute_performance_metrics(portfolio: Portfolio) -> dict:
+    """Calcula as métricas de performance do backtest (retorno, taxa de acerto e drawdown)."""
+    final_value = portfolio.total_value_history[-1]
+
+    # Taxa de Acerto (Win Rate): cada venda fecha a compra aberta mais antiga (FIFO).
+    # Com valores iguais em USD, o PnL do par é amount_usd * (1 - preço_compra / preço_venda).
     wins = 0
     trade_pnl = []
-    # Simplificação: assumes que cada venda fecha uma compra anterior
-    buy_trades = [t for t in portfolio.history if t['side'] == 'buy']
-    sell_trades = [t for t in portfolio.history if t['side'] == 'sell']
-
-    for sell in sell_trades:
-        # Encontra a compra correspondente (simplificação: a primeira compra antes da venda)
-        corresponding_buy = next((buy for buy in buy_trades if buy['date'] < sell['date']), None)
-        if corresponding_buy:
-            pnl = sell['amount_usd'] - corresponding_buy['amount_usd']
+    open_buys = []
+    for trade in portfolio.history:
+        if trade['side'] == 'buy':
+            open_buys.append(trade)
+        elif open_buys:
+            buy = open_buys.pop(0)
+            pnl = trade['amount_usd'] * (1 - buy['price'] / trade['price'])
             trade_pnl.append(pnl)
             if pnl > 0:
                 wins += 1
-            buy_trades.remove(corresponding_buy) # Evita reutilizar a mesma compra
-
-    win_rate = (wins / len(trade_pnl)) * 100 if trade_pnl else 0
-
-    print(f"Total de Trades Executados: {total_trades}")
-    print(f"Trades com Lucro/Prejuízo Calculado: {len(trade_pnl)}")
-    print(f"Taxa de Acerto (Win Rate): {win_rate:.2f}%")
-    print("-" * 30)
 
-    # Calcular Drawdown Máximo
+    # Drawdown Máximo
     value_history = pd.Series(portfolio.total_value_history)
     running_max = value_history.cummax()
     drawdown = (value_history - running_max) / running_max
-    max_drawdown_pct = drawdown.min() * 100
 
-    print(f"Drawdown Máximo: {max_drawdown_pct:.2f}%")
+    return {
+        "days": len(portfolio.total_value_history),
+        "final_value": final_value,
+        "total_return_pct": ((final_value / portfolio.initial_cash) - 1) * 100,
+        "total_trades": len(portfolio.history),
+        "closed_trades": len(trade_pnl),
+        "win_rate_pct": (wins / len(trade_pnl)) * 100 if trade_pnl else 0.0,
+        "max_drawdown_pct": drawdown.min() * 100,
+    }
+
+
+def generate_performance_report(portfolio: Portfolio):
+    """Calcula e exibe as métricas de performance do backtest."""
+    metrics = compute_performance_metrics(portfolio)
+
+    print("\n--- Relatório de Performance ---")
+    print(f"Período Analisado: {metrics['days']} dias")
+    print(f"Valor Inicial do Portfólio: ${portfolio.initial_cash:,.2f}")
+    print(f"Valor Final do Portfólio:   ${metrics['final_value']:,.2f}")
+    print(f"Retorno Total: {metrics['total_return_pct']:.2f}%")
+    print("-" * 30)
+
+    if metrics['total_trades'] == 0:
+        print("Nenhum trade foi executado.")
+        return
+
+    print(f"Total de Trades Executados: {metrics['total_trades']}")
+    print(f"Trades com Lucro/Prejuízo Calculado: {metrics['closed_trades']}")
+    print(f"Taxa de Acerto (Win Rate): {metrics['win_rate_pct']:.2f}%")
+    print("-" * 30)
+
+    print(f"Drawdown Máximo: {metrics['max_drawdown_pct']:.2f}%")
     print("--- Fim do Relatório ---")
 
 
@@ -202,8 +283,28 @@ if __name__ == "__main__":
     parser.add_argument(
         "data_file",
         type=str,
-        help="Caminho para o arquivo CSV com os dados históricos (ex: data/btc_usd_daily.csv)"
+        help="Caminho para o arquivo CSV com os dados históricos (ex: data/btc_usd_daily.csv, Gemini_BTCUSD_d.csv)"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["http", "local"],
+        default="http",
+        help="'http' chama o Orquestrador a cada barra; 'local' calcula tudo em processo de forma vetorizada."
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Semente para a simulação de eventos do Orion no modo local."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Lê o CSV diretamente, sem usar nem gerar o cache colunar."
     )
     args = parser.parse_args()
 
-    run_backtest(args.data_file)
\ No newline at end of file
+    if args.mode == "local":
+        run_backtest_local(args.data_file, seed=args.seed, use_cache=not args.no_cache)
+    else:
+        run_backtest(args.data_file, use_cache=not args.no_cache)
\ No newline at end of file
@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import heapq
+import json
+import os
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+# Permite importar o pacote saka e o backtester ao executar o script diretamente
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from saka.shared.market_data import load_ohlcv_columns
+from saka.shared.models import AnalysisRequest
+from scripts.backtest import Portfolio, compute_performance_metrics, WARMUP_PERIOD, ASSET
+
+DecisionFn = Callable[[AnalysisRequest], Awaitable[dict]]
+
+# Ordem de processamento de eventos no mesmo instante: execuções antes do fechamento da barra
+FILL, CYCLE_DONE, BAR_CLOSE = 0, 1, 2
+
+
+class PricePath:
+    """
+    Trajetória de preços em tempo de evento: interpolação linear entre os fechamentos das barras.
+    O fechamento da barra i acontece em `timestamps[i] + bar_seconds`.
+    """
+    def __init__(self, timestamps, closes):
+        timestamps = np.asarray(timestamps, dtype=float)
+        self.bar_seconds = float(np.median(np.diff(timestamps))) if len(timestamps) > 1 else 86400.0
+        self.close_times = timestamps + self.bar_seconds
+        self.closes = np.asarray(closes, dtype=float)
+
+    def price_at(self, t: float) -> float:
+        return float(np.interp(t, self.close_times, self.closes))
+
+
+class LatencyAwareReplay:
+    """
+    Simulador de eventos discretos de um backtest com latência. As barras fecham em tempo de
+    evento e cada fechamento dispara um ciclo de decisão no pipeline real; a latência medida
+    (tempo de parede) é convertida em tempo de evento multiplicando-a por `speed`, e a ordem
+    é executada nesse instante, ao preço da trajetória interpolada mais a derrapagem.
+
+    O pipeline processa um ciclo por vez: barras que fecham durante um ciclo ficam na fila e
+    apenas a mais recente é analisada quando ele termina (as outras contam como `skipped`).
+    Cada decisão também é executada no fechamento da própria barra, sem atraso, em um segundo
+    portfólio; a diferença entre os dois mede quanto a latência corrói o resultado.
+    """
+    def __init__(self, decide: DecisionFn, timestamps, closes, speed: float, window: int = WARMUP_PERIOD,
+                 slippage_bps: float = 0.0, asset: str = ASSET, timer: Callable[[], float] = time.perf_counter):
+        self.decide = decide
+        self.path = PricePath(timestamps, closes)
+        self.closes = self.path.closes
+        self.speed = speed
+        self.window = window
+        self.slippage_bps = slippage_bps
+        self.asset = asset
+        self.timer = timer
+        self.portfolio = Portfolio(verbose=False)
+        self.ideal_portfolio = Portfolio(verbose=False)
+        self.latencies: List[float] = []
+        self.delays: List[float] = []
+        self.fills: List[dict] = []
+        self.skipped = 0
+        self.rejected = 0
+        self._events: list = []
+        self._sequence = 0
+        self._busy = False
+        self._queued_bar: Optional[int] = None
+
+    def schedule(self, t: float, kind: int, data=None):
+        heapq.heappush(self._events, (t, kind, self._sequence, data))
+        self._sequence += 1
+
+    def fill_price(self, side: str, price: float) -> float:
+        slip = self.slippage_bps / 10000
+        return price * (1 + slip) if side == "buy" else price * (1 - slip)
+
+    async def start_cycle(self, t: float, bar: int):
+        """Executa o ciclo da barra no pipeline real e agenda o seu término em tempo de evento."""
+        self._busy = True
+        request = AnalysisRequest(asset=self.asset, historical_prices=self.closes[bar - self.window + 1:bar + 1].tolist())
+        start = self.timer()
+        decision = await self.decide(request)
+        latency = self.timer() - start
+        self.latencies.append(latency)
+        self.schedule(t + latency * self.speed, CYCLE_DONE, (bar, decision))
+
+    async def run(self) -> dict:
+        for i in range(self.window - 1, len(self.closes)):
+            self.schedule(self.path.close_times[i], BAR_CLOSE, i)
+
+        while self._events:
+            t, kind, _, data = heapq.heappop(self._events)
+            if kind == BAR_CLOSE:
+                price = float(self.closes[data])
+                self.portfolio.update_value({self.asset: price})
+                self.ideal_portfolio.update_value({self.asset: price})
+                if self._busy:
+                    if self._queued_bar is not None:
+                        self.skipped += 1
+                    self._queued_bar = data
+                else:
+                    await self.start_cycle(t, data)
+            elif kind == CYCLE_DONE:
+                bar, decision = data
+                if decision.get("action") == "execute_trade":
+                    self.schedule(t, FILL, (bar, decision))
+                self._busy = False
+                if self._queued_bar is not None:
+                    queued, self._queued_bar = self._queued_bar, None
+                    await self.start_cycle(t, queued)
+            elif kind == FILL:
+                self.execute(t, *data)
+        return self.report()
+
+    def execute(self, t: float, bar: int, decision: dict):
+        side, amount = decision["side"], decision["amount_usd"]
+        if t > self.path.close_times[-1]:
+            # A ordem só seria executada depois do fim dos dados
+            return
+        decided_at = float(self.closes[bar])
+        price = self.fill_price(side, self.path.price_at(t))
+        self.ideal_portfolio.execute_trade(self.asset, side, amount, self.fill_price(side, decided_at))
+        executed = len(self.portfolio.history)
+        self.portfolio.execute_trade(self.asset, side, amount, price)
+        if len(self.portfolio.history) == executed:
+            # Ordem ignorada pelo portfólio (ex: venda sem posição): fica fora das métricas de execução
+            self.rejected += 1
+            return
+        self.delays.append(t - self.path.close_times[bar])
+        self.fills.append({"bar": bar, "side": side, "decided_at": decided_at, "filled_at": price, "delay_s": t - self.path.close_times[bar]})
+
+    def report(self) -> dict:
+        latency_ms = np.asarray(self.latencies) * 1000
+        actual = compute_performance_metrics(self.portfolio)
+        ideal = compute_performance_metrics(self.ideal_portfolio)
+        # Custo da execução atrasada em relação ao preço da decisão (positivo = pior)
+        costs = [(f["filled_at"] / f["decided_at"] - 1) * (1 if f["side"] == "buy" else -1) * 10000 for f in self.fills]
+        return {
+            "speed": self.speed,
+            "bars": len(self.closes) - self.window + 1,
+            "cycles": len(self.latencies),
+            "skipped_bars": self.skipped,
+            "fills": len(self.fills),
+            "rejected_orders": self.rejected,
+            "latency_p50_ms": float(np.percentile(latency_ms, 50)) if len(latency_ms) else None,
+            "latency_p99_ms": float(np.percentile(latency_ms, 99)) if len(latency_ms) else None,
+            "mean_delay_bars": float(np.mean(self.delays) / self.path.bar_seconds) if self.delays else 0.0,
+            "mean_execution_cost_bps": float(np.mean(costs)) if costs else 0.0,
+            "return_pct": actual["total_return_pct"],
+            "zero_latency_return_pct": ideal["total_return_pct"],
+            "latency_erosion_pct": ideal["total_return_pct"] - actual["total_return_pct"],
+        }
+
+
+@asynccontextmanager
+async def in_process_decider(api_key: str = "replay-sim-key"):
+    """Orquestrador e agentes reais em processo (ASGI), sem contêineres nem portas."""
+    import saka.shared.security as security
+    import saka.shared.tracing as tracing
+    import saka.orchestrator.main as orchestrator
+    from saka.orchestrator.replicas import ReplicaPool
+    from saka.agents.sentinel_risk.main import app as sentinel_app
+    from saka.agents.cronos_cycles.main import app as cronos_app
+    from saka.agents.orion_cfo.main import app as orion_app
+    from saka.agents.kamila_ceo.main import app as kamila_app
+
+    security.INTERNAL_API_KEY = api_key
+    orchestrator.INTERNAL_API_HEADERS = {"X-Internal-API-Key": api_key}
+    apps = {"Sentinel": sentinel_app, "Cronos": cronos_app, "Orion": orion_app, "Kamila": kamila_app}
+    orchestrator.agent_pools = {name: ReplicaPool(name, [f"http://{name.lower()}"]) for name in apps}
+    mounts = {f"http://{name.lower()}": httpx.ASGITransport(app=app) for name, app in apps.items()}
+    orchestrator.http_client = httpx.AsyncClient(mounts=mounts, event_hooks={"request": [tracing.inject_trace_headers]})
+    async def decide(request: AnalysisRequest) -> dict:
+        return await orchestrator.get_kamila_decision(request)
+
+    # Cada velocidade começa com o cache de análises vazio, para não medir acertos da execução anterior
+    decide.reset = orchestrator.analysis_cache.clear
+    try:
+        yield decide
+    finally:
+        await orchestrator.http_client.aclose()
+        orchestrator.http_client = None
+
+
+@asynccontextmanager
+async def http_decider(orchestrator_url: str, api_key: Optional[str]):
+    """Ciclos pelo Orquestrador em execução (ex: `docker compose up`)."""
+    async with httpx.AsyncClient(timeout=45.0) as client:
+        async def decide(request: AnalysisRequest) -> dict:
+            response = await client.post(f"{orchestrator_url}/trigger_decision_cycle_sync",
+                                         json=request.dict(exclude_none=True), headers={"X-Internal-API-Key": api_key or ""})
+            response.raise_for_status()
+            return response.json()
+        yield decide
+
+
+async def soak(data_filepath: str, speeds: List[float], mode: str = "inprocess", limit: Optional[int] = None,
+               slippage_bps: float = 5.0, seed: Optional[int] = 0, orchestrator_url: Optional[str] = None) -> List[Dict]:
+    """Executa a mesma reprodução em cada velocidade e retorna um relatório por velocidade."""
+    columns = load_ohlcv_columns(data_filepath)
+    timestamps, closes = np.asarray(columns["timestamp"]), np.asarray(columns["close"])
+    if limit:
+        timestamps, closes = timestamps[-limit:], closes[-limit:]
+
+    decider = in_process_decider() if mode == "inprocess" else http_decider(orchestrator_url, os.getenv("INTERNAL_API_KEY"))
+    reports = []
+    async with decider as decide:
+        for speed in speeds:
+            # Mesma sequência de eventos macro do Orion em todas as velocidades (modo em processo)
+            random.seed(seed)
+            if hasattr(decide, "reset"):
+                decide.reset()
+            report = await LatencyAwareReplay(decide, timestamps, closes, speed, slippage_bps=slippage_bps).run()
+            print_report(report)
+            reports.append(report)
+    return reports
+
+
+def print_report(report: dict):
+    print(f"speed={report['speed']:>12g}  ciclos={report['cycles']:<5} puladas={report['skipped_bars']:<5} "
+          f"ordens={report['fills']:<4} rejeitadas={report['rejected_orders']:<4} latência p50={report['latency_p50_ms'] or 0:.2f} ms  "
+          f"atraso médio={report['mean_delay_bars']:.3f} barras  custo={report['mean_execution_cost_bps']:+.1f} bps  "
+          f"retorno={report['return_pct']:+.2f}% (sem latência {report['zero_latency_return_pct']:+.2f}%, "
+          f"erosão {report['latency_erosion_pct']:+.2f} p.p.)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest com latência real do pipeline, em tempo de evento acelerado.")
+    parser.add_argument("data_file", nargs="?", default=os.path.join("data", "Gemini_BTCUSD_d.csv"))
+    parser.add_argument("--speeds", default="0,86400,864000,8640000",
+                        help="Acelerações do replay (segundos de evento por segundo de parede), separadas por vírgula.")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--orchestrator-url", default=os.getenv("ORCHESTRATOR_URL", "http://localhost:8080"))
+    parser.add_argument("--limit", type=int, help="Usa apenas as N barras mais recentes.")
+    parser.add_argument("--slippage-bps", type=float, default=5.0, help="Derrapagem fixa por execução, em pontos-base.")
+    parser.add_argument("--seed", type=int, default=0, help="Semente dos eventos macro do Orion.")
+    parser.add_argument("--save", metavar="PATH", help="Salva os relatórios em JSON.")
+    args = parser.parse_args()
+
+    speeds = [float(s) for s in args.speeds.split(",") if s.strip()]
+    reports = asyncio.run(soak(args.data_file, speeds, args.mode, args.limit, args.slippage_bps, args.seed, args.orchestrator_url))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
@@ -0,0 +1,139 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Permite importar o pacote saka e o backtester ao executar o script diretamente
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from saka.shared.market_data import load_ohlcv_columns
+from saka.agents.kamila_ceo.main import TRADE_AMOUNT_USD
+from scripts.backtest import compute_signals, simulate_portfolio, compute_performance_metrics, WARMUP_PERIOD
+
+# Parâmetros da estratégia que podem ser varridos e seus tipos
+SWEEP_PARAMETERS = {
+    "rsi_period": int,
+    "rsi_oversold": float,
+    "rsi_overbought": float,
+    "volatility_threshold": float,
+    "amount_usd": float,
+    "warmup_period": int,
+}
+
+# Preços de fechamento do processo atual, carregados uma única vez por worker
+_closes: Optional[np.ndarray] = None
+
+
+def _init_worker(data_filepath: str, cache_dir: Optional[str] = None):
+    """
+    Carrega os preços no worker a partir do cache colunar mapeado em memória:
+    todas as cópias apontam para as mesmas páginas do sistema operacional, somente leitura.
+    """
+    global _closes
+    _closes = load_ohlcv_columns(data_filepath, cache_dir)["close"]
+
+
+def evaluate(params: Dict, seed: Optional[int] = 0) -> Dict:
+    """Executa um backtest vetorizado com um conjunto de parâmetros e retorna suas métricas."""
+    warmup_period = params.get("warmup_period", WARMUP_PERIOD)
+    result = dict(params)
+    try:
+        signals = compute_signals(
+            _closes, warmup_period, seed=seed,
+            **{k: v for k, v in params.items() if k not in ("amount_usd", "warmup_period")}
+        )
+        portfolio = simulate_portfolio(_closes, signals, warmup_period, amount_usd=params.get("amount_usd", TRADE_AMOUNT_USD))
+        result.update(compute_performance_metrics(portfolio))
+    except ValueError as e:
+        result["error"] = str(e)
+    return result
+
+
+def parse_grid(specs: List[str]) -> Dict[str, list]:
+    """Converte especificações 'nome=v1,v2,...' em uma grade de parâmetros."""
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in SWEEP_PARAMETERS or not values:
+            raise ValueError(f"Parâmetro inválido: {spec!r}. Use nome=v1,v2 com nome em {list(SWEEP_PARAMETERS)}.")
+        grid[name] = [SWEEP_PARAMETERS[name](v) for v in values.split(",")]
+    return grid
+
+
+def grid_search(grid: Dict[str, list]) -> List[Dict]:
+    """Todas as combinações da grade."""
+    names = list(grid)
+    return [dict(zip(names, combination)) for combination in itertools.product(*grid.values())]
+
+
+def random_search(grid: Dict[str, list], samples: int, seed: Optional[int] = None) -> List[Dict]:
+    """Amostras uniformes entre o menor e o maior valor de cada parâmetro da grade."""
+    rng = np.random.default_rng(seed)
+    param_sets = []
+    for _ in range(samples):
+        params = {}
+        for name, values in grid.items():
+            low, high = min(values), max(values)
+            if SWEEP_PARAMETERS[name] is int:
+                params[name] = int(rng.integers(low, high + 1))
+            else:
+                params[name] = round(float(rng.uniform(low, high)), 4)
+        param_sets.append(params)
+    return param_sets
+
+
+def run_sweep(data_filepath: str, param_sets: List[Dict], workers: Optional[int] = None, seed: Optional[int] = 0,
+              cache_dir: Optional[str] = None) -> pd.DataFrame:
+    """
+    Distribui os backtests entre processos e retorna a tabela de resultados
+    ordenada por retorno total (desc) e drawdown máximo (menos negativo primeiro).
+    `cache_dir` substitui o diretório padrão do cache colunar (ao lado do CSV).
+    """
+    # Gera o cache colunar antes de iniciar os workers, que apenas o mapeiam
+    load_ohlcv_columns(data_filepath, cache_dir)
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(param_sets) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_filepath, cache_dir)) as executor:
+        results = list(executor.map(evaluate, param_sets, itertools.repeat(seed), chunksize=chunksize))
+
+    table = pd.DataFrame(results)
+    if "total_return_pct" in table:
+        table = table.sort_values(["total_return_pct", "max_drawdown_pct"], ascending=[False, False], na_position="last")
+    return table.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Varre parâmetros da estratégia S.A.K.A. com o backtester vetorizado.")
+    parser.add_argument("data_file", type=str, help="Caminho para o arquivo CSV com os dados históricos.")
+    parser.add_argument(
+        "--grid", action="append", default=[], metavar="NOME=V1,V2",
+        help=f"Valores de um parâmetro (repetível). Parâmetros: {', '.join(SWEEP_PARAMETERS)}."
+    )
+    parser.add_argument("--random", type=int, default=0, metavar="N",
+                        help="Busca aleatória com N amostras dentro dos limites de cada --grid, em vez da grade completa.")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos (padrão: todos os núcleos).")
+    parser.add_argument("--seed", type=int, default=0, help="Semente dos eventos do Orion, igual para todas as execuções.")
+    parser.add_argument("--top", type=int, default=20, help="Quantidade de linhas exibidas no ranking.")
+    parser.add_argument("--output", type=str, default=None, help="Salva a tabela completa em CSV.")
+    args = parser.parse_args()
+
+    grid = parse_grid(args.grid) or {"rsi_oversold": [30.0], "rsi_overbought": [70.0]}
+    param_sets = random_search(grid, args.random, args.seed) if args.random else grid_search(grid)
+
+    print(f"Executando {len(param_sets)} backtests...")
+    start_time = time.perf_counter()
+    table = run_sweep(args.data_file, param_sets, args.workers, args.seed)
+    elapsed = time.perf_counter() - start_time
+    print(f"Concluído em {elapsed:.2f} s ({len(param_sets) / elapsed:.1f} backtests/s).\n")
+
+    print(table.head(args.top).to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"\nTabela completa salva em: {args.output}")
@@ -0,0 +1,82 @@
+import argparse
+import json
+from typing import Dict, Iterable, List
+
+
+def load_spans(paths: Iterable[str]) -> List[dict]:
+    """Lê os spans gravados pelo FileCollector (uma linha JSON por span), ignorando linhas incompletas."""
+    spans = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return spans
+
+
+def group_traces(spans: Iterable[dict]) -> Dict[str, List[dict]]:
+    traces: Dict[str, List[dict]] = {}
+    for span in spans:
+        if span.get("end") is not None:
+            traces.setdefault(span["trace_id"], []).append(span)
+    return traces
+
+
+def trace_duration(spans: List[dict]) -> float:
+    return max(s["end"] for s in spans) - min(s["start"] for s in spans)
+
+
+def slowest_traces(traces: Dict[str, List[dict]], count: int) -> List[List[dict]]:
+    """Os `count` rastreamentos (ciclos) mais lentos, do mais lento para o mais rápido."""
+    return sorted(traces.values(), key=trace_duration, reverse=True)[:count]
+
+
+def _ordered_tree(spans: List[dict]) -> List[tuple]:
+    """Ordena os spans em profundidade (pai antes dos filhos, irmãos por início) com o nível de cada um."""
+    ids = {s["span_id"] for s in spans}
+    children: Dict[str, List[dict]] = {}
+    roots = []
+    for s in spans:
+        if s.get("parent_id") in ids:
+            children.setdefault(s["parent_id"], []).append(s)
+        else:
+            roots.append(s)
+
+    ordered = []
+    def visit(span: dict, depth: int):
+        ordered.append((depth, span))
+        for child in sorted(children.get(span["span_id"], []), key=lambda c: c["start"]):
+            visit(child, depth + 1)
+    for root in sorted(roots, key=lambda r: r["start"]):
+        visit(root, 0)
+    return ordered
+
+
+def render_waterfall(spans: List[dict], width: int = 60) -> str:
+    """Desenha o ciclo como uma cascata: uma linha por span, com a barra posicionada no tempo."""
+    origin = min(s["start"] for s in spans)
+    total = trace_duration(spans) or 1e-9
+    lines = [f"trace {spans[0]['trace_id']}  {total * 1000:.2f} ms"]
+    for depth, s in _ordered_tree(spans):
+        offset = int((s["start"] - origin) / total * width)
+        length = max(1, int((s["end"] - s["start"]) / total * width))
+        bar = " " * offset + "█" * min(length, width - offset)
+        label = f"{'  ' * depth}{s['service']}: {s['name']}"
+        lines.append(f"{label[:44]:<44} {(s['end'] - s['start']) * 1000:9.2f} ms |{bar:<{width}}|")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mostra a cascata de spans dos ciclos de decisão mais lentos.")
+    parser.add_argument("trace_files", nargs="+", help="Arquivos de spans (TRACE_FILE) de um ou mais serviços.")
+    parser.add_argument("--slowest", type=int, default=5, metavar="N", help="Quantidade de ciclos exibidos.")
+    parser.add_argument("--width", type=int, default=60, help="Largura da barra de tempo.")
+    args = parser.parse_args()
+
+    traces = group_traces(load_spans(args.trace_files))
+    print(f"{len(traces)} ciclos encontrados.\n")
+    for spans in slowest_traces(traces, args.slowest):
+        print(render_waterfall(spans, args.width))
+        print()
@@ -7,7 +7,9 @@ class AethertraderAgent(BaseAgent):
             agent_id="aethertrader",
             name="Aethertrader",
             description="Executes trades approved by Kamila.",
-            orchestrator_url=orchestrator_url
+            orchestrator_url=orchestrator_url,
+            role="executor",
+            capabilities=["trade_execution"]
         )
 
     async def handle_message(self, message: Message):
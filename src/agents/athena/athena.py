@@ -7,7 +7,9 @@ class AthenaAgent(BaseAgent):
             agent_id="athena",
             name="Athena",
             description="Analyzes market sentiment from social media and news.",
-            orchestrator_url=orchestrator_url
+            orchestrator_url=orchestrator_url,
+            role="analyst",
+            capabilities=["sentiment"]
         )
 
     async def handle_message(self, message: Message):
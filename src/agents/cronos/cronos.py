@@ -7,7 +7,9 @@ class CronosAgent(BaseAgent):
             agent_id="cronos",
             name="Cronos",
             description="Analyzes temporal cycles to avoid unfavorable trading periods.",
-            orchestrator_url=orchestrator_url
+            orchestrator_url=orchestrator_url,
+            role="analyst",
+            capabilities=["rsi"]
         )
 
     async def handle_message(self, message: Message):
@@ -7,7 +7,9 @@ class GaiaAgent(BaseAgent):
             agent_id="gaia",
             name="Gaia",
             description="Manages portfolio diversification for passive revenue and drawdown reduction.",
-            orchestrator_url=orchestrator_url
+            orchestrator_url=orchestrator_url,
+            role="portfolio",
+            capabilities=["diversification"]
         )
 
     async def handle_message(self, message: Message):
@@ -7,7 +7,9 @@ class HermesAgent(BaseAgent):
             agent_id="hermes",
             name="Hermes",
             description="Optimizes trade execution for speed and precision.",
-            orchestrator_url=orchestrator_url
+            orchestrator_url=orchestrator_url,
+            role="executor",
+            capabilities=["execution_optimization"]
         )
 
     async def handle_message(self, message: Message):
@@ -8,7 +8,9 @@ class KamilaAgent(BaseAgent):
             agent_id="kamila",
             name="Kamila",
             description="The CEO of S.A.K.A. She coordinates all agents and makes final decisions.",
-            orchestrator_url=orchestrator_url
+            orchestrator_url=orchestrator_url,
+            role="ceo",
+            capabilities=["decide"]
         )
 
     def send_daily_report(self):
@@ -7,7 +7,9 @@ class OrionAgent(BaseAgent):
             agent_id="orion",
             name="Orion",
             description="Analyzes macroeconomic trends and financial reports.",
-            orchestrator_url=orchestrator_url
+            orchestrator_url=orchestrator_url,
+            role="analyst",
+            capabilities=["macro"]
         )
 
     async def handle_message(self, message: Message):
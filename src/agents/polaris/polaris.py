@@ -7,7 +7,9 @@ class PolarisAgent(BaseAgent):
             agent_id="polaris",
             name="Polaris",
             description="Reviews critical decisions and provides strategic recommendations.",
-            orchestrator_url=orchestrator_url
+            orchestrator_url=orchestrator_url,
+            role="advisor",
+            capabilities=["strategy_review"]
         )
 
     async def handle_message(self, message: Message):
@@ -7,7 +7,9 @@ class SentinelAgent(BaseAgent):
             agent_id="sentinel",
             name="Sentinel",
             description="Manages risk, including stop-loss and exposure control.",
-            orchestrator_url=orchestrator_url
+            orchestrator_url=orchestrator_url,
+            role="risk",
+            capabilities=["stop_loss", "exposure"]
         )
 
     async def handle_message(self, message: Message):
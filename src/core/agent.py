@@ -1,10 +1,13 @@
-import requests
+import asyncio
 import os
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Set, Tuple
+import httpx
 from fastapi import FastAPI
 import uvicorn
 from pydantic import BaseModel
+from src.core.event_bus import Event, EventBus, EventHandler, InProcessBroker, Subscription, create_event_bus
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -13,51 +16,239 @@ class Message(BaseModel):
     sender_id: str
     content: dict
 
+class MessageBatch(BaseModel):
+    messages: List[Message]
+
+class MessageDeliveryError(Exception):
+    """Raised on a message acknowledgement when the target agent failed to process it."""
+
 class BaseAgent:
-    def __init__(self, agent_id: str, name: str, description: Optional[str] = None, orchestrator_url: str = "http://localhost:8000"):
+    # Topics subscribed to when the agent's server starts, handled by `handle_event`
+    topics: List[str] = []
+
+    def __init__(self, agent_id: str, name: str, description: Optional[str] = None, orchestrator_url: str = "http://localhost:8000",
+                 event_bus: Optional[EventBus] = None, role: Optional[str] = None, capabilities: Optional[List[str]] = None):
         self.agent_id = agent_id
         self.name = name
         self.description = description
         self.orchestrator_url = orchestrator_url
+        self.role = role
+        self.capabilities = list(capabilities or [])
+
+        # Heartbeats keep the agent's lease in the orchestrator's registry alive
+        self.heartbeat_interval = float(os.getenv("AGENT_HEARTBEAT_INTERVAL", "10"))
+        self.registered = False
 
         agent_port = os.getenv("AGENT_PORT", "8000")
         agent_host = os.getenv("AGENT_HOST", self.agent_id)
         self.endpoint = os.getenv("AGENT_ENDPOINT", f"http://{agent_host}:{agent_port}")
 
-        self.app = FastAPI()
+        # Outbound messaging: messages to the same target within the batch window are delivered together
+        self.batch_window = float(os.getenv("MESSAGE_BATCH_WINDOW", "0.005"))
+        self.max_batch_size = int(os.getenv("MESSAGE_BATCH_MAX", "100"))
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self._outbox: Dict[str, List[Tuple[dict, asyncio.Future]]] = {}
+        # Timer that ends each target's open batch window; cancelled when the batch leaves early
+        self._outbox_timers: Dict[str, asyncio.TimerHandle] = {}
+        self._deliveries: Set[asyncio.Task] = set()
+
+        self.event_bus = event_bus or create_event_bus()
+        self._subscriptions: List[Subscription] = []
+        # A broker connection opened here is closed with the agent; a shared bus is not
+        self._owns_event_bus = event_bus is None and not isinstance(self.event_bus, InProcessBroker)
+
+        self.app = FastAPI(lifespan=self._lifespan)
         self.app.add_api_route("/message", self.handle_message, methods=["POST"])
+        self.app.add_api_route("/messages/batch", self.handle_message_batch, methods=["POST"])
         self.logger = logging.getLogger(self.name)
 
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        for topic in self.topics:
+            await self.subscribe(topic)
+        # Started even if the initial registration failed: the loop registers once the orchestrator is up
+        heartbeats = asyncio.ensure_future(self._heartbeat_loop()) if self.heartbeat_interval > 0 else None
+        yield
+        if heartbeats is not None:
+            heartbeats.cancel()
+            try:
+                await heartbeats
+            except asyncio.CancelledError:
+                pass
+        await self.close()
+
     async def handle_message(self, message: Message):
         self.logger.info(f"Received message from {message.sender_id}: {message.content}")
         return {"status": "message received"}
 
-    def register_with_orchestrator(self):
-        agent_data = {
+    async def handle_event(self, event: Event):
+        self.logger.info(f"Received event on {event.topic} from {event.sender_id}: {event.payload}")
+
+    async def handle_message_batch(self, batch: MessageBatch):
+        """Processes a batch of messages in order; a failing message does not fail the others."""
+        results = []
+        for message in batch.messages:
+            try:
+                results.append({"ok": True, "response": await self.handle_message(message)})
+            except Exception as e:
+                self.logger.error(f"Error handling message from {message.sender_id}: {e}")
+                results.append({"ok": False, "error": str(e)})
+        return {"results": results}
+
+    def registration_data(self) -> dict:
+        return {
             "id": self.agent_id,
             "name": self.name,
             "description": self.description,
-            "endpoint": self.endpoint
+            "endpoint": self.endpoint,
+            "role": self.role,
+            "capabilities": self.capabilities
         }
+
+    def register_with_orchestrator(self):
         try:
             self.logger.info(f"Registering with orchestrator at {self.orchestrator_url}...")
-            response = requests.post(f"{self.orchestrator_url}/agents/register", json=agent_data)
+            response = httpx.post(f"{self.orchestrator_url}/agents/register", json=self.registration_data())
             response.raise_for_status()
+            self.registered = True
             self.logger.info("Registered successfully.")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             self.logger.error(f"Error registering: {e}")
 
-    def send_message(self, target_agent_id: str, content: dict):
-        message = {
-            "sender_id": self.agent_id,
-            "content": content
-        }
+    async def send_heartbeat(self):
+        """
+        Renews the registry lease. Registers instead if the agent is not registered yet, or
+        again if the orchestrator no longer knows this agent.
+        """
+        client = self.get_http_client()
+        if self.registered:
+            response = await client.post(f"{self.orchestrator_url}/agents/{self.agent_id}/heartbeat")
+            if response.status_code == 404:
+                self.logger.warning("Lease expired in the orchestrator registry; registering again.")
+                self.registered = False
+        if not self.registered:
+            response = await client.post(f"{self.orchestrator_url}/agents/register", json=self.registration_data())
+        response.raise_for_status()
+        if not self.registered:
+            self.registered = True
+            self.logger.info("Registered successfully.")
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.send_heartbeat()
+            except httpx.TransportError as e:
+                # The orchestrator is unreachable (e.g. still starting): register once it answers
+                self.registered = False
+                self.logger.warning(f"Orchestrator unreachable, not registered yet: {e}")
+            except httpx.HTTPError as e:
+                self.logger.error(f"Error sending heartbeat: {e}")
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        """Persistent, pooled client used for all outbound messages."""
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(timeout=httpx.Timeout(10.0, connect=2.0))
+        return self.http_client
+
+    def send_message(self, target_agent_id: str, content: dict) -> asyncio.Future:
+        """
+        Queues a message without blocking the event loop and returns an awaitable
+        acknowledgement that resolves to the target agent's reply. Messages to the same
+        target sent within `batch_window` seconds are coalesced into one batched delivery.
+        """
+        loop = asyncio.get_running_loop()
+        ack = loop.create_future()
+        # Callers may ignore the acknowledgement; failures are logged on delivery
+        ack.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        pending = self._outbox.setdefault(target_agent_id, [])
+        pending.append((content, ack))
+        if len(pending) >= self.max_batch_size:
+            self._start_delivery(target_agent_id)
+        elif len(pending) == 1:
+            self._outbox_timers[target_agent_id] = loop.call_later(self.batch_window, self._start_delivery, target_agent_id)
+        return ack
+
+    def _start_delivery(self, target_agent_id: str):
+        timer = self._outbox_timers.pop(target_agent_id, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._outbox.pop(target_agent_id, None)
+        if batch:
+            task = asyncio.ensure_future(self._deliver(target_agent_id, batch))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, target_agent_id: str, batch: List[Tuple[dict, asyncio.Future]]):
+        messages = [Message(sender_id=self.agent_id, content=content) for content, _ in batch]
         try:
-            response = requests.post(f"{self.orchestrator_url}/agents/{target_agent_id}/message", json=message.dict())
-            response.raise_for_status()
-            self.logger.info(f"Message sent to {target_agent_id} successfully.")
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Error sending message to {target_agent_id}: {e}")
+            client = self.get_http_client()
+            if len(messages) == 1:
+                response = await client.post(f"{self.orchestrator_url}/agents/{target_agent_id}/message", json=messages[0].dict())
+                response.raise_for_status()
+                results = [{"ok": True, "response": response.json()}]
+            else:
+                response = await client.post(
+                    f"{self.orchestrator_url}/agents/{target_agent_id}/messages/batch",
+                    json=MessageBatch(messages=messages).dict()
+                )
+                response.raise_for_status()
+                results = response.json()["results"]
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            self.logger.error(f"Error sending {len(batch)} message(s) to {target_agent_id}: {e}")
+            for _, ack in batch:
+                if not ack.done():
+                    ack.set_exception(MessageDeliveryError(f"Error sending message to {target_agent_id}: {e}"))
+            return
+
+        self.logger.info(f"{len(batch)} message(s) sent to {target_agent_id} successfully.")
+        for i, (_, ack) in enumerate(batch):
+            if ack.done():
+                continue
+            result = results[i] if i < len(results) else {"ok": False, "error": "Missing result for message in batch reply."}
+            if result.get("ok"):
+                ack.set_result(result.get("response"))
+            else:
+                ack.set_exception(MessageDeliveryError(result.get("error", "Message was not processed.")))
+
+    async def subscribe(self, topic: str, handler: Optional[EventHandler] = None) -> Subscription:
+        """
+        Subscribes to a topic on the event bus (e.g. "prices.BTC/USD", "risk.alerts" or
+        "prices.*"). Events are passed to `handler`, or to `handle_event` if none is given.
+        """
+        subscription = await self.event_bus.subscribe(topic, handler or self.handle_event)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        await self.event_bus.unsubscribe(subscription)
+
+    async def publish(self, topic: str, payload: dict) -> Event:
+        """Publishes an event once; the bus delivers it to every subscribed agent."""
+        return await self.event_bus.publish(topic, payload, sender_id=self.agent_id)
+
+    async def flush(self):
+        """Delivers every queued message now and waits for all deliveries in flight."""
+        for target_agent_id in list(self._outbox):
+            self._start_delivery(target_agent_id)
+        if self._deliveries:
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
+
+    async def close(self):
+        await self.flush()
+        for timer in self._outbox_timers.values():
+            timer.cancel()
+        self._outbox_timers.clear()
+        for subscription in list(self._subscriptions):
+            await self.unsubscribe(subscription)
+        if self._owns_event_bus:
+            await self.event_bus.close()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
 
     def start_server(self, host: str = "0.0.0.0", port: int = 8000):
         self.register_with_orchestrator()
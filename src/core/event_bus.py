@@ -0,0 +1,341 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Union
+from urllib.parse import urlparse
+from pydantic import BaseModel
+
+logger = logging.getLogger("EventBus")
+
+DEFAULT_QUEUE_SIZE = int(os.getenv("EVENT_BUS_QUEUE_SIZE", "1000"))
+# Delay between attempts to reconnect to a remote broker that dropped the connection
+RECONNECT_DELAY = float(os.getenv("EVENT_BUS_RECONNECT_DELAY", "1"))
+
+
+class Event(BaseModel):
+    topic: str
+    sender_id: str
+    payload: dict
+    published_at: float
+
+
+EventHandler = Callable[[Event], Union[Awaitable[None], None]]
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """
+    Topics are dot-separated (e.g. "prices.BTC/USD"). In a pattern, "*" matches exactly
+    one segment and a trailing "#" matches any number of remaining segments.
+    """
+    pattern_parts = pattern.split(".")
+    topic_parts = topic.split(".")
+    for i, part in enumerate(pattern_parts):
+        if part == "#" and i == len(pattern_parts) - 1:
+            return True
+        if i >= len(topic_parts) or (part != "*" and part != topic_parts[i]):
+            return False
+    return len(pattern_parts) == len(topic_parts)
+
+
+class Subscription:
+    """
+    A subscriber's mailbox: events are queued on publish and handled in order by a
+    dedicated task, so a slow subscriber never blocks the publisher or other subscribers.
+    When the mailbox is full the oldest event is dropped.
+    """
+    def __init__(self, pattern: str, handler: EventHandler, maxsize: int = DEFAULT_QUEUE_SIZE):
+        self.pattern = pattern
+        self.handler = handler
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.task = asyncio.ensure_future(self._run())
+
+    def matches(self, topic: str) -> bool:
+        return topic_matches(self.pattern, topic)
+
+    def deliver(self, event: Event):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def _run(self):
+        while True:
+            event = await self.queue.get()
+            try:
+                result = self.handler(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error handling event on {event.topic} for '{self.pattern}': {e}")
+            finally:
+                self.queue.task_done()
+
+    async def drain(self):
+        """Waits until every queued event has been handled."""
+        await self.queue.join()
+
+    async def cancel(self):
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+class EventBus(ABC):
+    """Topic-based publish/subscribe interface shared by the in-process and remote brokers."""
+    @abstractmethod
+    async def publish(self, topic: str, payload: dict, sender_id: str = "anonymous") -> Event:
+        ...
+
+    @abstractmethod
+    async def subscribe(self, pattern: str, handler: EventHandler) -> Subscription:
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, subscription: Subscription):
+        ...
+
+    async def close(self):
+        pass
+
+
+class InProcessBroker(EventBus):
+    """Delivers events to subscribers in the same process. Used in tests and single-process setups."""
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscriptions: List[Subscription] = []
+        self.published = 0
+
+    def dispatch(self, event: Event) -> int:
+        delivered = 0
+        for subscription in self.subscriptions:
+            if subscription.matches(event.topic):
+                subscription.deliver(event)
+                delivered += 1
+        self.published += 1
+        return delivered
+
+    async def publish(self, topic: str, payload: dict, sender_id: str = "anonymous") -> Event:
+        event = Event(topic=topic, sender_id=sender_id, payload=payload, published_at=time.time())
+        self.dispatch(event)
+        return event
+
+    async def subscribe(self, pattern: str, handler: EventHandler) -> Subscription:
+        subscription = Subscription(pattern, handler, self.queue_size)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+        await subscription.cancel()
+
+    async def drain(self):
+        """Waits until every subscriber has handled the events published so far."""
+        await asyncio.gather(*(s.drain() for s in list(self.subscriptions)))
+
+    async def close(self):
+        for subscription in list(self.subscriptions):
+            await self.unsubscribe(subscription)
+
+
+class BrokerServer:
+    """
+    Local broker process speaking newline-delimited JSON over TCP. Clients send
+    {"op": "subscribe"|"unsubscribe", "pattern": ...} and {"op": "publish", "event": {...}};
+    each published event is written once to every connection with a matching pattern.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 7400, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.connections: Dict[asyncio.StreamWriter, Set[str]] = {}
+        self.outboxes: Dict[asyncio.StreamWriter, Subscription] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"Event broker listening on {self.host}:{self.port}")
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for writer in list(self.connections):
+            await self._drop_connection(writer)
+
+    def dispatch(self, event: Event):
+        for writer, patterns in self.connections.items():
+            if any(topic_matches(p, event.topic) for p in patterns):
+                self.outboxes[writer].deliver(event)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def send(event: Event):
+            writer.write(json.dumps({"op": "event", "event": event.dict()}).encode() + b"\n")
+            await writer.drain()
+
+        self.connections[writer] = set()
+        self.outboxes[writer] = Subscription("#", send, self.queue_size)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    frame = json.loads(line)
+                    op = frame["op"]
+                    if op == "subscribe":
+                        self.connections[writer].add(frame["pattern"])
+                    elif op == "unsubscribe":
+                        self.connections[writer].discard(frame["pattern"])
+                    elif op == "publish":
+                        self.dispatch(Event(**frame["event"]))
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.error(f"Invalid frame from event bus client: {e}")
+        except ConnectionError:
+            pass
+        finally:
+            await self._drop_connection(writer)
+
+    async def _drop_connection(self, writer: asyncio.StreamWriter):
+        self.connections.pop(writer, None)
+        outbox = self.outboxes.pop(writer, None)
+        if outbox is not None:
+            await outbox.cancel()
+        writer.close()
+
+
+class RemoteBroker(EventBus):
+    """
+    Client for a BrokerServer. Keeps a single connection, subscribes each pattern on the
+    broker once, and fans received events out to local subscriptions. When the broker
+    drops the connection (e.g. it restarted), the client reconnects and subscribes its
+    patterns again.
+    """
+    def __init__(self, host: str, port: int, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.host = host
+        self.port = port
+        self.local = InProcessBroker(queue_size)
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+    async def _connection(self) -> asyncio.StreamWriter:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.writer is None:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                # The broker only knows the patterns of the current connection: subscribe them all again
+                for pattern in sorted({s.pattern for s in self.local.subscriptions}):
+                    writer.write(json.dumps({"op": "subscribe", "pattern": pattern}).encode() + b"\n")
+                await writer.drain()
+                self.reader, self.writer = reader, writer
+                self.reader_task = asyncio.ensure_future(self._read_events(reader, writer))
+        return self.writer
+
+    async def _send(self, frame: dict):
+        data = json.dumps(frame).encode() + b"\n"
+        writer = await self._connection()
+        try:
+            writer.write(data)
+            await writer.drain()
+        except ConnectionError:
+            # Connection dropped before the reader noticed: retry once on a new one
+            self._disconnected(writer)
+            writer = await self._connection()
+            writer.write(data)
+            await writer.drain()
+
+    def _disconnected(self, writer: asyncio.StreamWriter):
+        if self.writer is writer:
+            self.writer = None
+        writer.close()
+
+    async def _read_events(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while True:
+            try:
+                line = await reader.readline()
+            except ConnectionError:
+                line = b""
+            if not line:
+                logger.error(f"Connection to event broker {self.host}:{self.port} closed.")
+                self._disconnected(writer)
+                break
+            try:
+                self.local.dispatch(Event(**json.loads(line)["event"]))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.error(f"Invalid event from broker: {e}")
+
+        # Without local subscriptions the next publish reconnects on demand
+        while not self._closed and self.writer is None and self.local.subscriptions:
+            await asyncio.sleep(RECONNECT_DELAY)
+            try:
+                await self._connection()
+                logger.info(f"Reconnected to event broker {self.host}:{self.port}.")
+            except OSError as e:
+                logger.error(f"Could not reconnect to event broker {self.host}:{self.port}: {e}")
+
+    async def publish(self, topic: str, payload: dict, sender_id: str = "anonymous") -> Event:
+        event = Event(topic=topic, sender_id=sender_id, payload=payload, published_at=time.time())
+        await self._send({"op": "publish", "event": event.dict()})
+        return event
+
+    async def subscribe(self, pattern: str, handler: EventHandler) -> Subscription:
+        # Connect first: a new connection subscribes the existing patterns, so this one is sent only once
+        await self._connection()
+        first = not any(s.pattern == pattern for s in self.local.subscriptions)
+        subscription = await self.local.subscribe(pattern, handler)
+        if first:
+            await self._send({"op": "subscribe", "pattern": pattern})
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        await self.local.unsubscribe(subscription)
+        if self.writer is not None and not any(s.pattern == subscription.pattern for s in self.local.subscriptions):
+            await self._send({"op": "unsubscribe", "pattern": subscription.pattern})
+
+    async def close(self):
+        self._closed = True
+        await self.local.close()
+        if self.reader_task is not None:
+            self.reader_task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def create_event_bus(url: Optional[str] = None) -> EventBus:
+    """
+    Returns a client for the broker at `url` (or EVENT_BUS_URL), e.g. "tcp://localhost:7400".
+    Without a broker URL, returns the process-wide in-process broker.
+    """
+    url = url or os.getenv("EVENT_BUS_URL")
+    if not url:
+        return in_process_broker
+    parsed = urlparse(url)
+    return RemoteBroker(parsed.hostname or "127.0.0.1", parsed.port or 7400)
+
+
+in_process_broker = InProcessBroker()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    broker = BrokerServer(os.getenv("EVENT_BUS_HOST", "0.0.0.0"), int(os.getenv("EVENT_BUS_PORT", "7400")))
+    asyncio.run(broker.serve_forever())
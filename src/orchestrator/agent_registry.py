@@ -1,26 +1,167 @@
-from typing import Dict
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
 from .models import Agent
 
+DEFAULT_TTL = float(os.getenv("REGISTRY_TTL", "30"))
+
 class AgentRegistry:
-    def __init__(self):
+    """
+    Agents hold a lease that expires `ttl` seconds after their last registration or
+    heartbeat; expired agents are no longer returned and are removed by `evict_expired`.
+    With a `db_path` the registry is persisted to SQLite and reloaded on startup, so
+    agents keep their registration across orchestrator restarts.
+
+    The registry is shared by the threadpool handlers and the eviction sweep on the event
+    loop, so every read and change of its state goes through one lock.
+    """
+    def __init__(self, db_path: Optional[str] = None, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.clock = clock
         self.agents: Dict[str, Agent] = {}
+        self.expires_at: Dict[str, float] = {}
+        # Secondary indexes: role/capability -> agent ids in round-robin order (O(1) add, remove and rotate)
+        self.by_role: Dict[str, "OrderedDict[str, None]"] = {}
+        self.by_capability: Dict[str, "OrderedDict[str, None]"] = {}
+        self._lock = threading.RLock()
+
+        self.db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS agents (id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self.db.commit()
+            self._load()
 
-    def register_agent(self, agent: Agent):
-        if agent.id in self.agents:
-            raise ValueError(f"Agent with id {agent.id} already registered.")
+    def _load(self):
+        for data, expires_at in self.db.execute("SELECT data, expires_at FROM agents"):
+            agent = Agent(**json.loads(data))
+            self._add(agent, expires_at)
+        self.evict_expired()
+
+    def _persist(self, agent: Agent):
+        if self.db is not None:
+            self.db.execute(
+                "INSERT OR REPLACE INTO agents (id, data, expires_at) VALUES (?, ?, ?)",
+                (agent.id, json.dumps(agent.dict()), self.expires_at[agent.id])
+            )
+            self.db.commit()
+
+    def _add(self, agent: Agent, expires_at: float):
         self.agents[agent.id] = agent
+        self.expires_at[agent.id] = expires_at
+        if agent.role:
+            self.by_role.setdefault(agent.role, OrderedDict())[agent.id] = None
+        for capability in agent.capabilities:
+            self.by_capability.setdefault(capability, OrderedDict())[agent.id] = None
+
+    def _remove(self, agent_id: str):
+        agent = self.agents.pop(agent_id, None)
+        self.expires_at.pop(agent_id, None)
+        if agent is not None:
+            if agent.role:
+                self.by_role.get(agent.role, {}).pop(agent_id, None)
+            for capability in agent.capabilities:
+                self.by_capability.get(capability, {}).pop(agent_id, None)
+        if self.db is not None:
+            self.db.execute("DELETE FROM agents WHERE id = ?", (agent_id,))
+            self.db.commit()
+
+    def is_alive(self, agent_id: str) -> bool:
+        with self._lock:
+            return agent_id in self.agents and self.expires_at.get(agent_id, 0.0) > self.clock()
+
+    def register_agent(self, agent: Agent, ttl: Optional[float] = None):
+        """
+        Registers the agent with a fresh lease. Registering again with the same details
+        (e.g. an agent that restarted) just renews the lease, and an id whose lease has
+        expired can be taken over.
+        """
+        with self._lock:
+            if agent.id in self.agents:
+                if self.agents[agent.id] != agent and self.is_alive(agent.id):
+                    raise ValueError(f"Agent with id {agent.id} already registered.")
+                self._remove(agent.id)
+            self._add(agent, self.clock() + (ttl or self.ttl))
+            self._persist(agent)
+
+    def heartbeat(self, agent_id: str, ttl: Optional[float] = None) -> float:
+        """Renews the agent's lease and returns its new expiry time."""
+        with self._lock:
+            if not self.is_alive(agent_id):
+                raise ValueError(f"Agent with id {agent_id} not found.")
+            self.expires_at[agent_id] = self.clock() + (ttl or self.ttl)
+            self._persist(self.agents[agent_id])
+            return self.expires_at[agent_id]
 
     def unregister_agent(self, agent_id: str):
-        if agent_id not in self.agents:
-            raise ValueError(f"Agent with id {agent_id} not found.")
-        del self.agents[agent_id]
+        with self._lock:
+            if agent_id not in self.agents:
+                raise ValueError(f"Agent with id {agent_id} not found.")
+            self._remove(agent_id)
+
+    def evict_expired(self) -> List[str]:
+        """Removes every agent whose lease has expired and returns their ids."""
+        with self._lock:
+            now = self.clock()
+            expired = [agent_id for agent_id, expires_at in self.expires_at.items() if expires_at <= now]
+            for agent_id in expired:
+                self._remove(agent_id)
+            return expired
 
     def get_agent(self, agent_id: str) -> Agent:
-        if agent_id not in self.agents:
-            raise ValueError(f"Agent with id {agent_id} not found.")
-        return self.agents[agent_id]
+        with self._lock:
+            if not self.is_alive(agent_id):
+                raise ValueError(f"Agent with id {agent_id} not found.")
+            return self.agents[agent_id]
+
+    def list_agents(self, role: Optional[str] = None, capability: Optional[str] = None):
+        with self._lock:
+            if role is None and capability is None:
+                ids = list(self.agents)
+            elif role is not None and capability is not None:
+                with_capability = self.by_capability.get(capability, {})
+                ids = [agent_id for agent_id in self.by_role.get(role, {}) if agent_id in with_capability]
+            else:
+                ids = list(self.by_role.get(role, {}) if role is not None else self.by_capability.get(capability, {}))
+            return [self.agents[agent_id] for agent_id in ids if self.is_alive(agent_id)]
+
+    def pick_agent(self, role: Optional[str] = None, capability: Optional[str] = None) -> Agent:
+        """
+        Returns a live agent with the given role and/or capability, rotating between them.
+        The picked id moves to the end of its index and expired ids found on the way are
+        evicted, so a pick by role or by capability is amortized O(1). With both, the
+        smaller index is rotated and each id is checked against the other one.
+        """
+        if role is None and capability is None:
+            raise ValueError("A role or a capability is required to pick an agent.")
+        with self._lock:
+            indexes = []
+            if role is not None:
+                indexes.append(self.by_role.get(role, OrderedDict()))
+            if capability is not None:
+                indexes.append(self.by_capability.get(capability, OrderedDict()))
+            ids, *other = sorted(indexes, key=len)
+            other = other[0] if other else None
+            for _ in range(len(ids)):
+                agent_id = next(iter(ids))
+                if not self.is_alive(agent_id):
+                    self._remove(agent_id)
+                    continue
+                ids.move_to_end(agent_id)
+                if other is None or agent_id in other:
+                    return self.agents[agent_id]
+        raise ValueError(f"No live agent found with role={role} capability={capability}.")
 
-    def list_agents(self):
-        return list(self.agents.values())
+    def close(self):
+        with self._lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
 
-agent_registry = AgentRegistry()
+agent_registry = AgentRegistry(os.getenv("REGISTRY_DB"))
@@ -1,12 +1,136 @@
-from fastapi import FastAPI, HTTPException
-from typing import List
-import requests
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+import httpx
+from fastapi import FastAPI, HTTPException, Response
 
 from src.orchestrator.agent_registry import agent_registry
 from src.orchestrator.models import Agent
-from src.core.agent import Message # Importing from core
+from src.core.agent import Message, MessageBatch # Importing from core
 
-app = FastAPI()
+logger = logging.getLogger("orchestrator")
+
+# Message forwarding settings
+ROUTER_HTTP2 = os.getenv("ROUTER_HTTP2", "false").lower() in ("1", "true", "yes")
+ROUTER_CONNECT_TIMEOUT = float(os.getenv("ROUTER_CONNECT_TIMEOUT", "2.0"))
+ROUTER_READ_TIMEOUT = float(os.getenv("ROUTER_READ_TIMEOUT", "10.0"))
+ROUTER_MAX_CONNECTIONS = int(os.getenv("ROUTER_MAX_CONNECTIONS", "200"))
+ROUTER_MAX_CONCURRENCY_PER_AGENT = int(os.getenv("ROUTER_MAX_CONCURRENCY_PER_AGENT", "32"))
+ROUTER_QUEUE_SIZE = int(os.getenv("ROUTER_QUEUE_SIZE", "10000"))
+ROUTER_QUEUE_WORKERS = int(os.getenv("ROUTER_QUEUE_WORKERS", "8"))
+# How often agents with an expired lease are removed from the registry
+REGISTRY_SWEEP_INTERVAL = float(os.getenv("REGISTRY_SWEEP_INTERVAL", "5"))
+
+# Shared HTTP client, fire-and-forget queue and its workers
+http_client: Optional[httpx.AsyncClient] = None
+message_queue: Optional[asyncio.Queue] = None
+queue_workers: List[asyncio.Task] = []
+target_limits: Dict[str, asyncio.Semaphore] = {}
+router_stats = {"forwarded": 0, "failed": 0, "queued": 0, "rejected": 0}
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Builds the pooled client used to forward messages. HTTP/2 is used when
+    ROUTER_HTTP2 is enabled and the optional `h2` package is installed.
+    """
+    http2 = ROUTER_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("ROUTER_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1.")
+            http2 = False
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(ROUTER_READ_TIMEOUT, connect=ROUTER_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=ROUTER_MAX_CONNECTIONS, max_keepalive_connections=ROUTER_MAX_CONNECTIONS),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global http_client
+    if http_client is None:
+        http_client = create_http_client()
+    return http_client
+
+
+def target_limit(agent_id: str) -> asyncio.Semaphore:
+    """Bounds the number of in-flight messages to a single target agent."""
+    if agent_id not in target_limits:
+        target_limits[agent_id] = asyncio.Semaphore(ROUTER_MAX_CONCURRENCY_PER_AGENT)
+    return target_limits[agent_id]
+
+
+async def post_to_agent(agent: Agent, path: str, payload: dict) -> dict:
+    async with target_limit(agent.id):
+        response = await get_http_client().post(f"{agent.endpoint}{path}", json=payload)
+    response.raise_for_status()
+    return response.json()
+
+
+async def forward_message(agent: Agent, message: Message) -> dict:
+    """Forwards a message to the agent's /message endpoint and returns its JSON reply."""
+    reply = await post_to_agent(agent, "/message", message.dict())
+    router_stats["forwarded"] += 1
+    return reply
+
+
+async def queue_worker():
+    while True:
+        agent, message = await message_queue.get()
+        try:
+            await forward_message(agent, message)
+        except Exception as e:
+            router_stats["failed"] += 1
+            logger.error(f"Error delivering queued message to agent {agent.id}: {e}")
+        finally:
+            message_queue.task_done()
+
+
+async def evict_expired_agents():
+    while True:
+        await asyncio.sleep(REGISTRY_SWEEP_INTERVAL)
+        try:
+            for agent_id in agent_registry.evict_expired():
+                logger.info(f"Agent {agent_id} missed its heartbeats and was removed from the registry.")
+        except Exception as e:
+            # A failed sweep must not stop eviction for the rest of the process
+            logger.error(f"Error evicting expired agents: {e}")
+
+
+def ensure_queue_workers():
+    """Starts the fire-and-forget queue and its workers on first use."""
+    global message_queue
+    if message_queue is None:
+        message_queue = asyncio.Queue(maxsize=ROUTER_QUEUE_SIZE)
+    if not queue_workers:
+        queue_workers.extend(asyncio.create_task(queue_worker()) for _ in range(ROUTER_QUEUE_WORKERS))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client, message_queue
+    http_client = create_http_client()
+    ensure_queue_workers()
+    sweeper = asyncio.create_task(evict_expired_agents())
+    yield
+    sweeper.cancel()
+    # Give queued messages a chance to be delivered before shutting down
+    try:
+        await asyncio.wait_for(message_queue.join(), timeout=ROUTER_READ_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"Shutting down with {message_queue.qsize()} undelivered queued messages.")
+    for worker in queue_workers:
+        worker.cancel()
+    queue_workers.clear()
+    message_queue = None
+    await http_client.aclose()
+    http_client = None
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/")
 def read_root():
@@ -17,7 +141,7 @@ def read_root():
 def register_agent(agent: Agent):
     try:
         agent_registry.register_agent(agent)
-        return {"message": f"Agent {agent.name} registered successfully."}
+        return {"message": f"Agent {agent.name} registered successfully.", "ttl": agent_registry.ttl}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -29,6 +153,22 @@ def unregister_agent(agent_id: str):
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@app.post("/agents/{agent_id}/heartbeat")
+def agent_heartbeat(agent_id: str):
+    """Renews the agent's lease. A 404 tells the agent it was evicted and must register again."""
+    try:
+        expires_at = agent_registry.heartbeat(agent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"agent_id": agent_id, "expires_at": expires_at, "ttl": agent_registry.ttl}
+
+@app.get("/agents/pick", response_model=Agent)
+def pick_agent(role: Optional[str] = None, capability: Optional[str] = None):
+    try:
+        return agent_registry.pick_agent(role=role, capability=capability)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @app.get("/agents/{agent_id}", response_model=Agent)
 def get_agent(agent_id: str):
     try:
@@ -37,22 +177,53 @@ def get_agent(agent_id: str):
         raise HTTPException(status_code=404, detail=str(e))
 
 @app.get("/agents", response_model=List[Agent])
-def list_agents():
-    return agent_registry.list_agents()
+def list_agents(role: Optional[str] = None, capability: Optional[str] = None):
+    return agent_registry.list_agents(role=role, capability=capability)
 
 # Inter-agent communication endpoint
 @app.post("/agents/{target_agent_id}/message")
-def send_agent_message(target_agent_id: str, message: Message):
+async def send_agent_message(target_agent_id: str, message: Message, response: Response, fire_and_forget: bool = False):
     try:
         target_agent = agent_registry.get_agent(target_agent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-        # Forward the message to the target agent
+    if fire_and_forget:
+        # Enqueue and return immediately; delivery happens in the background workers
+        ensure_queue_workers()
         try:
-            response = requests.post(f"{target_agent.endpoint}/message", json=message.dict())
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise HTTPException(status_code=503, detail=f"Error forwarding message to agent {target_agent_id}: {e}")
+            message_queue.put_nowait((target_agent, message))
+        except asyncio.QueueFull:
+            router_stats["rejected"] += 1
+            raise HTTPException(status_code=503, detail="Message queue is full, try again later.")
+        router_stats["queued"] += 1
+        response.status_code = 202
+        return {"status": "queued", "target_agent_id": target_agent_id}
+
+    # Forward the message to the target agent
+    # ValueError: the agent replied with something other than JSON
+    try:
+        return await forward_message(target_agent, message)
+    except (httpx.HTTPError, ValueError) as e:
+        router_stats["failed"] += 1
+        raise HTTPException(status_code=503, detail=f"Error forwarding message to agent {target_agent_id}: {e}")
 
+@app.post("/agents/{target_agent_id}/messages/batch")
+async def send_agent_message_batch(target_agent_id: str, batch: MessageBatch):
+    """Forwards a batch of messages to the target agent in a single request."""
+    try:
+        target_agent = agent_registry.get_agent(target_agent_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        reply = await post_to_agent(target_agent, "/messages/batch", batch.dict())
+    except (httpx.HTTPError, ValueError) as e:
+        router_stats["failed"] += len(batch.messages)
+        raise HTTPException(status_code=503, detail=f"Error forwarding message batch to agent {target_agent_id}: {e}")
+    router_stats["forwarded"] += len(batch.messages)
+    return reply
+
+@app.get("/router/stats")
+def get_router_stats():
+    return {**router_stats, "queue_size": message_queue.qsize() if message_queue else 0}
@@ -1,11 +1,13 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Tuple
 
 class Agent(BaseModel):
     id: str
     name: str
     description: Optional[str] = None
     endpoint: str
+    role: Optional[str] = None
+    capabilities: Tuple[str, ...] = ()
 
     class Config:
         frozen = True
@@ -0,0 +1,59 @@
+import httpx
+import pytest
+import pytest_asyncio
+
+import saka.shared.security as security
+import saka.orchestrator.main as orchestrator
+from saka.orchestrator.cache import AnalysisCache
+from saka.orchestrator.resilience import ResilientAgent
+from saka.orchestrator.replicas import ReplicaPool
+from saka.shared.tracing import inject_trace_headers
+from saka.agents.sentinel_risk.main import app as sentinel_app
+from saka.agents.cronos_cycles.main import app as cronos_app
+import saka.agents.orion_cfo.main as orion
+from saka.agents.orion_cfo.main import app as orion_app
+from saka.agents.kamila_ceo.main import app as kamila_app
+
+TEST_API_KEY = "test-internal-key"
+
+
+class FakeClock:
+    """Relógio controlado pelo teste: `now` só muda quando o teste o altera."""
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest_asyncio.fixture
+async def agent_mesh(monkeypatch):
+    """
+    Conecta o cliente HTTP do Orquestrador aos apps dos agentes em processo (via ASGI),
+    sem contêineres nem portas de rede.
+    """
+    monkeypatch.setattr(security, "INTERNAL_API_KEY", TEST_API_KEY)
+    monkeypatch.setattr(orchestrator, "INTERNAL_API_HEADERS", {"X-Internal-API-Key": TEST_API_KEY})
+    monkeypatch.setattr(orchestrator, "analysis_cache", AnalysisCache())
+    monkeypatch.setattr(orchestrator, "resilient_agents", {
+        name: ResilientAgent(name, policy) for name, policy in orchestrator.AGENT_POLICIES.items()
+    })
+    monkeypatch.setattr(orchestrator, "last_known_results", AnalysisCache(ttl_seconds=86400))
+    # Sem eventos macro aleatórios: testes que precisam do veto do Orion ajustam a probabilidade
+    monkeypatch.setattr(orion, "HIGH_IMPACT_PROBABILITY", 0.0)
+    mounts = {}
+    for name, app in [("sentinel", sentinel_app), ("cronos", cronos_app), ("orion", orion_app), ("kamila", kamila_app)]:
+        mounts[f"http://{name}"] = httpx.ASGITransport(app=app)
+    monkeypatch.setattr(orchestrator, "agent_pools", {
+        name: ReplicaPool(name, [f"http://{name.lower()}"]) for name in ("Sentinel", "Cronos", "Orion", "Kamila")
+    })
+
+    client = httpx.AsyncClient(mounts=mounts, event_hooks={"request": [inject_trace_headers]})
+    monkeypatch.setattr(orchestrator, "http_client", client)
+    yield client
+    await client.aclose()
@@ -0,0 +1,200 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Ensure we can import from saka
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from saka.agents.cronos_cycles.main import (
+    calculate_manual_rsi, calculate_rsi_batch, calculate_indicators, IncrementalRSI, INDICATORS, MACD_SLOW
+)
+
+PERIOD = 14
+WINDOWS = [15, 100, 1_000, 10_000, 100_000, 1_000_000]
+BATCH_WIDTHS = [1, 16, 256, 4096]
+# Largest batch (windows x prices) measured, to keep memory bounded on the biggest windows
+MAX_BATCH_ELEMENTS = 20_000_000
+TOLERANCE = 1e-9
+
+
+def reference_rsi(prices, period: int = PERIOD) -> float:
+    """
+    RSI by definition, used as ground truth: the adjusted EMA (alpha = 1/period) of gains and
+    losses written out as an explicit weighted mean over the whole window, summed with
+    `math.fsum` and without truncation. The first price contributes a zero gain/loss, as the
+    NaN delta does in pandas.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) < period + 1:
+        raise ValueError("Dados insuficientes para calcular o RSI para o período especificado.")
+    delta = np.concatenate([[0.0], np.diff(prices)])
+    weights = (1.0 - 1.0 / period) ** np.arange(len(prices) - 1, -1, -1)
+    total = math.fsum(weights)
+    avg_gain = math.fsum(weights * np.where(delta > 0, delta, 0.0)) / total
+    avg_loss = math.fsum(weights * np.where(delta < 0, -delta, 0.0)) / total
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else float("nan")
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def _incremental(prices, period: int = PERIOD) -> float:
+    return IncrementalRSI(period).seed(prices)
+
+
+def _numpy(prices, period: int = PERIOD) -> float:
+    return float(calculate_rsi_batch(np.asarray(prices, dtype=np.float64)[None, :], period)[0])
+
+
+def _fused(prices, period: int = PERIOD) -> float:
+    return calculate_indicators(prices, indicators=("rsi",), rsi_period=period)["rsi"]
+
+
+# Single-window engines: prices -> RSI of the last point. New engines are added here and
+# are then covered by tests/test_indicator_equivalence.py and by this benchmark.
+ENGINES: Dict[str, Callable] = {
+    "pandas_ewm": calculate_manual_rsi,
+    "numpy": _numpy,
+    "incremental": _incremental,
+    "fused": _fused,
+}
+# Budget for the full indicator set, relative to the pandas RSI-only call
+FULL_SET_BUDGET = 2.0
+
+
+def batched_2d(windows: np.ndarray, period: int = PERIOD) -> np.ndarray:
+    return calculate_rsi_batch(windows, period)
+
+
+def random_walk(length: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.cumprod(1 + rng.normal(0, 0.01, length))
+
+
+def sliding_windows(series: np.ndarray, window: int, width: int) -> np.ndarray:
+    """`width` overlapping windows of `window` prices (each shifted by one), as a read-only view."""
+    return np.lib.stride_tricks.sliding_window_view(series[:window + width - 1], window)
+
+
+def time_call(func: Callable, repeat: int) -> float:
+    """Best of `repeat` runs, in seconds."""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def repeats_for(window: int) -> int:
+    return 20 if window <= 10_000 else 3
+
+
+def bench_single(windows: List[int], engines: Dict[str, Callable]) -> List[dict]:
+    results = []
+    for window in windows:
+        prices = random_walk(window, seed=window)
+        expected = reference_rsi(prices)
+        for name, engine in engines.items():
+            price_list = prices.tolist() if name == "pandas_ewm" else prices
+            seconds = time_call(lambda: engine(price_list), repeats_for(window))
+            results.append({
+                "engine": name, "window": window, "ms": seconds * 1000,
+                "abs_error": abs(engine(price_list) - expected),
+            })
+    return results
+
+
+def bench_batches(windows: List[int], widths: List[int], engines: Dict[str, Callable]) -> List[dict]:
+    """Per-window cost of computing `width` windows: a loop over the single-window engines vs. one 2-D call."""
+    results = []
+    for window in windows:
+        for width in widths:
+            if window * width > MAX_BATCH_ELEMENTS:
+                continue
+            batch = sliding_windows(random_walk(window + width, seed=window), window, width)
+            candidates = {f"{name} (loop)": (lambda e=engine: [e(row) for row in batch]) for name, engine in engines.items()
+                          if name != "pandas_ewm" or width <= 256}
+            candidates["batched_2d"] = lambda: batched_2d(batch)
+            # Accuracy of the 2-D engine on the first windows of the batch
+            checked = batch[:64]
+            max_error = float(np.max(np.abs(batched_2d(checked) - [reference_rsi(row) for row in checked])))
+            for name, run in candidates.items():
+                seconds = time_call(run, 3 if window * width <= 1_000_000 else 1)
+                result = {"engine": name, "window": window, "width": width, "ms_per_window": seconds * 1000 / width}
+                if name == "batched_2d":
+                    result["max_abs_error"] = max_error
+                results.append(result)
+    return results
+
+
+def bench_indicator_sets(windows: List[int]) -> List[dict]:
+    """
+    Cost of the full fused indicator set (with high/low) against today's RSI-only call.
+    Windows too short for MACD, the longest indicator requirement, are skipped.
+    """
+    results = []
+    for window in windows:
+        if window < MACD_SLOW:
+            continue
+        prices = random_walk(window, seed=window)
+        high, low = prices * 1.01, prices * 0.99
+        repeat = repeats_for(window)
+        rsi_only = time_call(lambda: calculate_manual_rsi(prices), repeat)
+        full_set = time_call(lambda: calculate_indicators(prices, high, low, INDICATORS), repeat)
+        results.append({"window": window, "rsi_only_ms": rsi_only * 1000, "full_set_ms": full_set * 1000,
+                        "ratio": full_set / rsi_only})
+    return results
+
+
+def print_results(single: List[dict], batches: List[dict], sets: List[dict]):
+    print(f"RSI (period {PERIOD}) single window — best time and error against the reference")
+    print(f"{'Engine':<14} | {'Window':>9} | {'Time (ms)':>11} | {'Abs error':>10}")
+    for r in single:
+        print(f"{r['engine']:<14} | {r['window']:>9} | {r['ms']:>11.4f} | {r['abs_error']:>10.2e}")
+    print()
+    print("RSI batches — time per window")
+    print(f"{'Engine':<20} | {'Window':>9} | {'Width':>6} | {'ms/window':>11} | {'Abs error':>10}")
+    for r in batches:
+        error = f"{r['max_abs_error']:.2e}" if "max_abs_error" in r else ""
+        print(f"{r['engine']:<20} | {r['window']:>9} | {r['width']:>6} | {r['ms_per_window']:>11.5f} | {error:>10}")
+    print()
+    print(f"Full indicator set ({', '.join(INDICATORS)}) vs. pandas RSI-only call (budget {FULL_SET_BUDGET:g}x)")
+    print(f"{'Window':>9} | {'RSI only (ms)':>13} | {'Full set (ms)':>13} | {'Ratio':>6}")
+    for r in sets:
+        print(f"{r['window']:>9} | {r['rsi_only_ms']:>13.4f} | {r['full_set_ms']:>13.4f} | {r['ratio']:>6.2f}")
+
+
+def int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark and accuracy check of the RSI engines and the fused indicator set.")
+    parser.add_argument("--windows", type=int_list, default=WINDOWS, help="Comma-separated window sizes.")
+    parser.add_argument("--widths", type=int_list, default=BATCH_WIDTHS, help="Comma-separated batch widths.")
+    parser.add_argument("--engines", help="Comma-separated subset of engines (default: all).")
+    parser.add_argument("--save", metavar="PATH", help="Save the results as JSON.")
+    args = parser.parse_args()
+
+    engines = {name: ENGINES[name] for name in args.engines.split(",")} if args.engines else ENGINES
+    single = bench_single(args.windows, engines)
+    batches = bench_batches(args.windows, args.widths, engines)
+    sets = bench_indicator_sets(args.windows)
+    print_results(single, batches, sets)
+
+    worst: Optional[dict] = max(single, key=lambda r: r["abs_error"], default=None)
+    if worst is not None and worst["abs_error"] > TOLERANCE:
+        print(f"\nWARNING: {worst['engine']} deviates {worst['abs_error']:.2e} from the reference at window {worst['window']}.")
+    for r in sets:
+        if r["ratio"] > FULL_SET_BUDGET:
+            print(f"WARNING: the full indicator set costs {r['ratio']:.2f}x the RSI-only call at window {r['window']}.")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"period": PERIOD, "single": single, "batches": batches, "indicator_sets": sets}, f, indent=2)
+        print(f"Results saved to {args.save}")
@@ -0,0 +1,262 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+# Ensure we can import from saka
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import saka.shared.security as security
+import saka.shared.tracing as tracing
+import saka.orchestrator.main as orchestrator
+import saka.agents.orion_cfo.main as orion
+from saka.orchestrator.cache import AnalysisCache
+from saka.orchestrator.replicas import ReplicaPool
+from saka.orchestrator.resilience import ResilientAgent
+from saka.shared.market_data import load_ohlcv
+from saka.agents.sentinel_risk.main import app as sentinel_app
+from saka.agents.cronos_cycles.main import app as cronos_app
+from saka.agents.kamila_ceo.main import app as kamila_app
+
+API_KEY = "load-test-key"
+AGENT_APPS = {"Sentinel": sentinel_app, "Cronos": cronos_app, "Orion": orion.app, "Kamila": kamila_app}
+DEFAULT_DATA = os.path.join("data", "Gemini_BTCUSD_d.csv")
+PERCENTILES = (50, 95, 99)
+
+
+def summarize(samples: List[float]) -> dict:
+    """Count, mean and p50/p95/p99 of a list of durations, in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1000
+    summary = {"count": len(samples), "mean_ms": float(ms.mean())}
+    for p, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+        summary[f"p{p}_ms"] = float(value)
+    return summary
+
+
+def stage_durations(spans: List[dict]) -> Dict[str, List[float]]:
+    """Groups finished span durations by "<service>:<span name>" (e.g. "orchestrator:fan_out")."""
+    stages: Dict[str, List[float]] = {}
+    for s in spans:
+        if s.get("end") is not None:
+            stages.setdefault(f"{s['service']}:{s['name']}", []).append(s["end"] - s["start"])
+    return stages
+
+
+def load_closes(path: str, length: int) -> np.ndarray:
+    """Bundled BTC closes, extended with a seeded random walk if the scenario needs more points."""
+    closes = load_ohlcv(path)["close"].to_numpy(dtype=np.float64) if os.path.exists(path) else np.array([100.0])
+    if len(closes) < length:
+        steps = np.random.default_rng(0).normal(0, 0.02, length - len(closes))
+        closes = np.concatenate([closes, closes[-1] * np.cumprod(1 + steps)])
+    return closes
+
+
+def reset_pipeline(veto_probability: Optional[float], cache: bool):
+    """Fresh cache, breakers and latency windows for each scenario, so scenarios don't influence each other."""
+    security.INTERNAL_API_KEY = API_KEY
+    orchestrator.INTERNAL_API_HEADERS = {"X-Internal-API-Key": API_KEY}
+    orchestrator.analysis_cache = AnalysisCache(ttl_seconds=60.0 if cache else 0.0)
+    orchestrator.resilient_agents = {
+        name: ResilientAgent(name, policy) for name, policy in orchestrator.AGENT_POLICIES.items()
+    }
+    orchestrator.last_known_results = AnalysisCache(ttl_seconds=86400)
+    if veto_probability is not None:
+        orion.HIGH_IMPACT_PROBABILITY = veto_probability
+
+
+class InProcessPipeline:
+    """Orchestrator and agents as ASGI apps in this process; no sockets involved."""
+    async def __aenter__(self) -> httpx.AsyncClient:
+        mounts = {f"http://{name.lower()}": httpx.ASGITransport(app=app) for name, app in AGENT_APPS.items()}
+        orchestrator.agent_pools = {name: ReplicaPool(name, [f"http://{name.lower()}"]) for name in AGENT_APPS}
+        orchestrator.http_client = httpx.AsyncClient(mounts=mounts, event_hooks={"request": [tracing.inject_trace_headers]})
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=orchestrator.app), base_url="http://orchestrator", timeout=60.0)
+        return self.client
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        await orchestrator.http_client.aclose()
+        orchestrator.http_client = None
+
+
+class LocalPortsPipeline:
+    """Orchestrator and agents served by uvicorn on 127.0.0.1 ephemeral ports, talking over real HTTP."""
+    async def _serve(self, app) -> str:
+        import uvicorn
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="on"))
+        task = asyncio.create_task(server.serve())
+        while not server.started:
+            if task.done():
+                task.result()
+            await asyncio.sleep(0.01)
+        self.servers.append((server, task))
+        port = server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def __aenter__(self) -> httpx.AsyncClient:
+        self.servers = []
+        urls = {name: await self._serve(app) for name, app in AGENT_APPS.items()}
+        orchestrator.agent_pools = {name: ReplicaPool(name, [url]) for name, url in urls.items()}
+        self.client = httpx.AsyncClient(base_url=await self._serve(orchestrator.app), timeout=60.0)
+        return self.client
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        for server, task in reversed(self.servers):
+            server.should_exit = True
+            await task
+
+
+async def run_scenario(client: httpx.AsyncClient, closes: np.ndarray, concurrency: int, window: int, assets: int,
+                       requests: int, warmup: int = 5) -> dict:
+    """
+    Sends `requests` decision cycles through /trigger_decision_cycle_sync with `concurrency`
+    workers. Each request uses a different window of `window` closes and one of `assets` assets.
+    """
+    offsets = itertools.count()
+
+    def next_payload() -> dict:
+        i = next(offsets)
+        start = (i * 7) % max(1, len(closes) - window)
+        return {"asset": f"ASSET{i % assets}/USD", "historical_prices": closes[start:start + window].tolist()}
+
+    headers = {"X-Internal-API-Key": API_KEY}
+    for _ in range(warmup):
+        await client.post("/trigger_decision_cycle_sync", json=next_payload(), headers=headers)
+
+    collector = tracing.InMemoryCollector(max_spans=max(10000, requests * 64))
+    previous_collector, tracing.collector = tracing.collector, collector
+    latencies: List[float] = []
+    status_codes: Dict[str, int] = {}
+    remaining = itertools.count()
+
+    async def worker():
+        while next(remaining) < requests:
+            payload = next_payload()
+            start = time.perf_counter()
+            try:
+                response = await client.post("/trigger_decision_cycle_sync", json=payload, headers=headers)
+                code = str(response.status_code)
+            except httpx.HTTPError as e:
+                code = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            status_codes[code] = status_codes.get(code, 0) + 1
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        tracing.collector = previous_collector
+    elapsed = time.perf_counter() - started
+
+    return {
+        "config": {"concurrency": concurrency, "window": window, "assets": assets, "requests": requests},
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "status_codes": status_codes,
+        "latency": summarize(latencies),
+        "stages": {name: summarize(samples) for name, samples in sorted(stage_durations(list(collector.spans)).items())},
+    }
+
+
+async def run_suite(mode: str, concurrency: List[int], windows: List[int], assets: List[int], requests: int,
+                    data_path: str = DEFAULT_DATA, veto_probability: Optional[float] = 0.0, cache: bool = False) -> dict:
+    closes = load_closes(data_path, max(windows) + requests * 7)
+    pipeline = LocalPortsPipeline() if mode == "ports" else InProcessPipeline()
+    results = []
+    async with pipeline as client:
+        for c, w, a in itertools.product(concurrency, windows, assets):
+            reset_pipeline(veto_probability, cache)
+            result = await run_scenario(client, closes, c, w, a, requests)
+            print_scenario(result)
+            results.append(result)
+    return {"meta": run_metadata(mode, cache, veto_probability), "scenarios": results}
+
+
+def run_metadata(mode: str, cache: bool, veto_probability: Optional[float]) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit or None, "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(), "machine": platform.machine(),
+        "mode": mode, "cache": cache, "orion_veto_probability": veto_probability,
+    }
+
+
+def scenario_key(result: dict) -> tuple:
+    config = result["config"]
+    return config["concurrency"], config["window"], config["assets"]
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> List[str]:
+    """Regressions of more than `tolerance` (fraction) in p95 latency or throughput for matching scenarios."""
+    previous = {scenario_key(r): r for r in baseline["scenarios"]}
+    regressions = []
+    for result in current["scenarios"]:
+        old = previous.get(scenario_key(result))
+        if old is None:
+            continue
+        label = "c={} window={} assets={}".format(*scenario_key(result))
+        if result["latency"]["p95_ms"] > old["latency"]["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {old['latency']['p95_ms']:.2f} ms -> {result['latency']['p95_ms']:.2f} ms")
+        if result["throughput_rps"] < old["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {old['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} req/s")
+    return regressions
+
+
+def print_scenario(result: dict):
+    config, latency = result["config"], result["latency"]
+    print(f"concurrency={config['concurrency']:<4} window={config['window']:<7} assets={config['assets']:<4} "
+          f"{result['throughput_rps']:8.1f} req/s  p50={latency['p50_ms']:.2f} ms  p95={latency['p95_ms']:.2f} ms  "
+          f"p99={latency['p99_ms']:.2f} ms  status={result['status_codes']}")
+    for name, stage in result["stages"].items():
+        print(f"    {name:<44} n={stage['count']:<6} p50={stage['p50_ms']:8.3f}  p95={stage['p95_ms']:8.3f}  p99={stage['p99_ms']:8.3f} ms")
+
+
+def int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test of the full decision pipeline (orchestrator + agents).")
+    parser.add_argument("--mode", choices=["inprocess", "ports"], default="inprocess",
+                        help="inprocess: ASGI apps in this process; ports: uvicorn servers on local ports.")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 8, 32], help="Comma-separated concurrency levels.")
+    parser.add_argument("--windows", type=int_list, default=[100, 1000], help="Comma-separated price window sizes.")
+    parser.add_argument("--assets", type=int_list, default=[1, 10], help="Comma-separated numbers of distinct assets.")
+    parser.add_argument("--requests", type=int, default=200, help="Decision cycles per scenario.")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="CSV with historical prices.")
+    parser.add_argument("--orion-veto-probability", type=float, default=0.0,
+                        help="Probability of a random Orion veto (the agent's default is 0.1).")
+    parser.add_argument("--cache", action="store_true", help="Keep the orchestrator's analysis cache enabled.")
+    parser.add_argument("--save", metavar="PATH", help="Save the results as a JSON baseline.")
+    parser.add_argument("--compare", metavar="PATH", help="Baseline to compare against; exits 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression before failing (fraction).")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_suite(args.mode, args.concurrency, args.windows, args.assets, args.requests,
+                                   args.data, args.orion_veto_probability, args.cache))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,118 @@
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+import src.orchestrator.main as router
+from src.core.agent import BaseAgent, Message, MessageDeliveryError
+from src.orchestrator.agent_registry import agent_registry
+from src.orchestrator.models import Agent
+
+
+class EchoAgent(BaseAgent):
+    """Target agent that echoes every message and fails on demand."""
+    def __init__(self, agent_id: str):
+        super().__init__(agent_id, agent_id)
+        self.received = []
+        self.batches = 0
+        self.singles = 0
+
+    async def handle_message(self, message: Message):
+        if message.content.get("fail"):
+            raise ValueError("cannot handle this message")
+        self.received.append(message.content)
+        return {"echo": message.content["n"]}
+
+
+@pytest_asyncio.fixture
+async def mesh(monkeypatch):
+    """A sender BaseAgent talking through the in-process router to an EchoAgent at http://echo."""
+    monkeypatch.setattr(agent_registry, "agents", {})
+    monkeypatch.setattr(router, "target_limits", {})
+    monkeypatch.setattr(router, "router_stats", dict.fromkeys(router.router_stats, 0))
+
+    target = EchoAgent("echo")
+    agent_registry.register_agent(Agent(id="echo", name="echo", endpoint="http://echo"))
+
+    async def count_requests(request: httpx.Request):
+        if request.url.path == "/messages/batch":
+            target.batches += 1
+        else:
+            target.singles += 1
+
+    monkeypatch.setattr(router, "http_client", httpx.AsyncClient(
+        mounts={"http://echo": httpx.ASGITransport(app=target.app)},
+        event_hooks={"request": [count_requests]},
+    ))
+
+    sender = BaseAgent("kamila", "Kamila", orchestrator_url="http://router")
+    sender.http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=router.app))
+    yield sender, target
+    await sender.close()
+    await router.http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_burst_is_delivered_as_one_batch(mesh):
+    sender, target = mesh
+    acks = [sender.send_message("echo", {"n": i}) for i in range(10)]
+    replies = await asyncio.gather(*acks)
+
+    assert replies == [{"echo": i} for i in range(10)]
+    assert target.received == [{"n": i} for i in range(10)]
+    assert target.batches == 1 and target.singles == 0
+    assert router.router_stats["forwarded"] == 10
+
+
+@pytest.mark.asyncio
+async def test_single_message_uses_message_endpoint(mesh):
+    sender, target = mesh
+    assert await sender.send_message("echo", {"n": 7}) == {"echo": 7}
+    assert target.singles == 1 and target.batches == 0
+
+
+@pytest.mark.asyncio
+async def test_send_message_does_not_block_and_max_batch_size_flushes(mesh):
+    sender, target = mesh
+    sender.batch_window = 60.0
+    sender.max_batch_size = 3
+
+    acks = [sender.send_message("echo", {"n": i}) for i in range(4)]
+    assert not any(ack.done() for ack in acks)
+
+    assert await asyncio.gather(*acks[:3]) == [{"echo": 0}, {"echo": 1}, {"echo": 2}]
+    assert not acks[3].done()
+    await sender.flush()
+    assert acks[3].result() == {"echo": 3}
+    assert target.batches == 1 and target.singles == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_flushed_early_does_not_cut_short_the_next_window(mesh):
+    sender, target = mesh
+    sender.batch_window = 0.2
+    sender.max_batch_size = 2
+    first = [sender.send_message("echo", {"n": i}) for i in range(2)]
+    await asyncio.gather(*first)
+    await asyncio.sleep(0.15)
+
+    # The first batch's timer would have fired at 0.2 s; the new batch window ends at about 0.35 s
+    late = sender.send_message("echo", {"n": 2})
+    await asyncio.sleep(0.1)
+    assert not late.done()
+    assert await late == {"echo": 2}
+    assert not sender._outbox_timers
+
+
+@pytest.mark.asyncio
+async def test_failures_reject_only_the_affected_acks(mesh):
+    sender, target = mesh
+    ok, failed = sender.send_message("echo", {"n": 1}), sender.send_message("echo", {"n": 2, "fail": True})
+    assert await ok == {"echo": 1}
+    with pytest.raises(MessageDeliveryError, match="cannot handle"):
+        await failed
+
+    unknown = sender.send_message("nobody", {"n": 3})
+    with pytest.raises(MessageDeliveryError):
+        await unknown
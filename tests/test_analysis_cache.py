@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import saka.orchestrator.main as orchestrator
+from saka.orchestrator.cache import AnalysisCache, price_window_key
+from saka.shared.models import AnalysisRequest, PriceSeriesRef
+from saka.shared.price_codec import encode_prices
+
+
+def test_ttl_expiration_and_lru_eviction(clock):
+    cache = AnalysisCache(max_entries=2, ttl_seconds=10, clock=clock)
+
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+
+    # "b" é o menos usado recentemente e sai primeiro
+    cache.set("c", {"v": 3})
+    assert cache.get("b") is None
+
+    clock.now = 11
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]) == (1, 2, 1, 1)
+
+
+def test_window_key_depends_only_on_prices():
+    prices = [1.0, 2.0, 3.0]
+    assert price_window_key(AnalysisRequest(asset="X", historical_prices=prices)) == \
+        price_window_key(AnalysisRequest(asset="Y", historical_prices=prices))
+    json_key = price_window_key(AnalysisRequest(asset="X", historical_prices=prices))
+    assert price_window_key(AnalysisRequest(asset="X", encoded_prices=encode_prices(prices))) == json_key
+    assert price_window_key(AnalysisRequest(asset="X", encoded_prices=encode_prices(prices, "float32"))) != json_key
+    # Referência sem timestamp final aponta sempre para as barras mais recentes: não é cacheável
+    assert price_window_key(AnalysisRequest(asset="X", price_ref=PriceSeriesRef(limit=30))) is None
+
+
+@pytest.mark.asyncio
+async def test_repeated_cycle_skips_agent_fan_out(agent_mesh):
+    calls = []
+
+    async def record(request):
+        calls.append(request.url.host)
+
+    agent_mesh.event_hooks = {"request": [record], "response": []}
+    prices = (100 * np.cumprod(1 + np.random.default_rng(2).normal(0, 0.01, 60))).tolist()
+    request = AnalysisRequest(asset="BTC/USD", historical_prices=prices)
+
+    first = await orchestrator.get_kamila_decision(request)
+    assert sorted(calls) == ["cronos", "kamila", "orion", "sentinel"]
+
+    calls.clear()
+    second = await orchestrator.get_kamila_decision(request)
+    assert calls == ["kamila"]
+    assert second == first
+    assert orchestrator.analysis_cache.stats()["hits"] == 3
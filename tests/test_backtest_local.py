@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from saka.agents.sentinel_risk.main import analyze_risk, calculate_volatility_batch
+from saka.agents.cronos_cycles.main import calculate_manual_rsi, calculate_rsi_batch
+from saka.agents.kamila_ceo.main import make_decision, decide_signals
+from saka.shared.models import (
+    AnalysisRequest, ConsolidatedDataInput, SentinelRiskOutput, CronosTechnicalOutput,
+    OrionMacroOutput, MacroImpact
+)
+from scripts.backtest import compute_signals, simulate_portfolio, WARMUP_PERIOD
+
+
+def random_walk(size: int, seed: int = 42) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.cumprod(1 + rng.normal(0, 0.03, size))
+
+
+@pytest.mark.asyncio
+async def test_batch_volatility_matches_sentinel_endpoint():
+    windows = sliding_window_view(random_walk(80), WARMUP_PERIOD)
+    volatility = calculate_volatility_batch(windows)
+
+    for window, expected in zip(windows, volatility):
+        output = await analyze_risk(AnalysisRequest(asset="BTC/USD", historical_prices=window.tolist()))
+        assert output.volatility == pytest.approx(expected, rel=1e-12)
+
+
+def test_batch_rsi_matches_manual_rsi():
+    for size in (WARMUP_PERIOD, 600):
+        windows = sliding_window_view(random_walk(size + 20), size)
+        rsi = calculate_rsi_batch(windows)
+        expected = [calculate_manual_rsi(window.tolist()) for window in windows]
+        np.testing.assert_allclose(rsi, expected, rtol=1e-10)
+
+
+@pytest.mark.asyncio
+async def test_decide_signals_matches_make_decision():
+    cases = [(True, False, 25.0), (True, False, 75.0), (True, False, 50.0),
+             (False, False, 25.0), (True, True, 75.0), (True, False, np.nan)]
+    can_trade, macro_high, rsi = (np.array(column) for column in zip(*cases))
+    signals = decide_signals(can_trade, macro_high, rsi)
+
+    for (ok, high, value), side in zip(cases[:-1], signals[:-1]):
+        decision = await make_decision(ConsolidatedDataInput(
+            asset="BTC/USD",
+            sentinel_analysis=SentinelRiskOutput(asset="BTC/USD", risk_level=0.2, volatility=0.03, can_trade=ok, reason=""),
+            cronos_analysis=CronosTechnicalOutput(asset="BTC/USD", rsi=value),
+            orion_analysis=OrionMacroOutput(asset="BTC/USD", impact=MacroImpact.HIGH if high else MacroImpact.LOW,
+                                            event_name="", summary="")
+        ))
+        expected = decision.side.value if decision.action == "execute_trade" else "hold"
+        assert side == expected
+
+    # RSI indefinido nunca gera sinal
+    assert signals[-1] == "hold"
+
+
+def test_local_backtest_is_deterministic_with_seed():
+    closes = random_walk(500)
+    signals = compute_signals(closes, seed=7)
+    assert len(signals) == len(closes) - WARMUP_PERIOD
+    np.testing.assert_array_equal(signals, compute_signals(closes, seed=7))
+
+    portfolio = simulate_portfolio(closes, signals)
+    assert len(portfolio.total_value_history) == len(signals)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from saka.orchestrator.main import get_kamila_batch_decisions
+from saka.agents.sentinel_risk.main import analyze_risk_batch, analyze_risk
+from saka.agents.cronos_cycles.main import analyze_rsi_batch, calculate_manual_rsi
+from saka.shared.models import AnalysisRequest, BatchAnalysisRequest, AgentName
+
+
+def make_batch() -> BatchAnalysisRequest:
+    rng = np.random.default_rng(11)
+    requests = [
+        AnalysisRequest(asset=f"ASSET{i}/USD", historical_prices=(100 * np.cumprod(1 + rng.normal(0, 0.01, size))).tolist())
+        for i, size in enumerate([30, 30, 45, 600])
+    ]
+    requests.append(AnalysisRequest(asset="SHORT/USD", historical_prices=[1.0, 2.0, 3.0]))
+    return BatchAnalysisRequest(requests=requests)
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoints_match_single_asset_results():
+    batch = make_batch()
+
+    sentinel = await analyze_risk_batch(batch)
+    cronos = await analyze_rsi_batch(batch)
+
+    for result, request in zip(sentinel.results, batch.requests):
+        assert result.volatility == pytest.approx((await analyze_risk(request)).volatility, rel=1e-12)
+    for result, request in zip(cronos.results, batch.requests):
+        assert result.rsi == pytest.approx(calculate_manual_rsi(request.historical_prices), rel=1e-10)
+
+    # O ativo com poucos preços falha sozinho, sem derrubar o lote
+    assert [(e.index, e.source_agent) for e in sentinel.errors] == [(4, AgentName.SENTINEL)]
+    assert [(e.index, e.source_agent) for e in cronos.errors] == [(4, AgentName.CRONOS)]
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_batch_cycle_reports_errors_per_asset(agent_mesh):
+    output = await get_kamila_batch_decisions(make_batch())
+
+    assert sorted(d.asset for d in output.decisions) == [f"ASSET{i}/USD" for i in range(4)]
+    assert [e.asset for e in output.errors] == ["SHORT/USD"]
+
+
+def test_batch_period_is_validated(monkeypatch):
+    from fastapi.testclient import TestClient
+    import saka.shared.security as security
+    from saka.agents.cronos_cycles.main import app
+
+    monkeypatch.setattr(security, "INTERNAL_API_KEY", "batch-test-key")
+    client = TestClient(app)
+    headers = {"X-Internal-API-Key": "batch-test-key"}
+    assert client.post("/analyze_batch?period=0", json={"requests": []}, headers=headers).status_code == 422
+    assert client.post("/analyze_batch?period=2", json={"requests": []}, headers=headers).status_code == 200
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from saka.agents.cronos_cycles.main import (
+    INDICATORS, analyze_rsi, calculate_indicators, calculate_manual_rsi, ema_series, parse_indicators
+)
+from saka.shared.market_data import load_ohlcv_columns
+from saka.shared.models import OHLCAnalysisRequest
+from tests.performance.bench_indicators import random_walk
+
+DATA_FILE = "data/Gemini_BTCUSD_d.csv"
+
+
+def ohlc(length: int, seed: int = 0):
+    closes = random_walk(length, seed=seed)
+    spread = np.random.default_rng(seed + 1).uniform(0.001, 0.02, (2, length))
+    return closes, closes * (1 + spread[0]), closes * (1 - spread[1])
+
+
+def test_ema_series_matches_pandas_over_many_blocks():
+    values = random_walk(5_000, seed=2) * 1_000
+    for span in (3, 9, 26):
+        expected = pd.Series(values).ewm(span=span).mean().to_numpy()
+        np.testing.assert_allclose(ema_series(values, 2 / (span + 1)), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("length", [40, 300, 2_000])
+def test_fused_indicators_match_pandas_references(length):
+    closes, high, low = ohlc(length, seed=length)
+    results = calculate_indicators(closes, high, low)
+    # Para janelas longas as EMAs do engine partem da janela truncada, como o RSI
+    series = pd.Series(closes[-500:])
+
+    assert results["rsi"] == pytest.approx(calculate_manual_rsi(closes.tolist()), abs=1e-9)
+
+    macd = series.ewm(span=12).mean() - series.ewm(span=26).mean()
+    signal = macd.ewm(span=9).mean()
+    assert results["macd"]["macd"] == pytest.approx(macd.iloc[-1], rel=1e-9)
+    assert results["macd"]["signal"] == pytest.approx(signal.iloc[-1], rel=1e-9)
+    assert results["macd"]["histogram"] == pytest.approx(macd.iloc[-1] - signal.iloc[-1], rel=1e-6, abs=1e-9)
+
+    middle, std = series.rolling(20).mean().iloc[-1], series.rolling(20).std(ddof=0).iloc[-1]
+    assert results["bollinger"]["middle"] == pytest.approx(middle, rel=1e-12)
+    assert results["bollinger"]["upper"] == pytest.approx(middle + 2 * std, rel=1e-12)
+
+    h, l, c = pd.Series(high[-500:]), pd.Series(low[-500:]), series
+    true_range = pd.concat([h - l, (h - c.shift()).abs(), (l - c.shift()).abs()], axis=1).max(axis=1).iloc[1:]
+    assert results["atr"] == pytest.approx(true_range.ewm(alpha=1 / 14).mean().iloc[-1], rel=1e-9)
+
+    k = 100 * (c - l.rolling(14).min()) / (h.rolling(14).max() - l.rolling(14).min())
+    assert results["stochastic"]["k"] == pytest.approx(k.iloc[-1], rel=1e-12)
+    assert results["stochastic"]["d"] == pytest.approx(k.rolling(3).mean().iloc[-1], rel=1e-12)
+
+
+def test_selection_and_validation():
+    assert parse_indicators("macd") == ("rsi", "macd")
+    assert parse_indicators("all") == INDICATORS
+    with pytest.raises(ValueError, match="desconhecidos"):
+        parse_indicators("rsi,vwap")
+
+    closes, high, low = ohlc(20)
+    assert set(calculate_indicators(closes, indicators=("rsi", "bollinger"))) == {"rsi", "bollinger"}
+    with pytest.raises(ValueError, match="macd"):
+        calculate_indicators(closes, indicators=("rsi", "macd"))
+    with pytest.raises(ValueError, match="high e low"):
+        calculate_indicators(closes, high=high, indicators=("atr",))
+
+    flat = calculate_indicators(np.full(30, 100.0), indicators=("stochastic",))
+    assert flat["stochastic"] == {"k": 50.0, "d": 50.0}
+
+
+@pytest.mark.asyncio
+async def test_analyze_returns_the_requested_indicators():
+    columns = load_ohlcv_columns(DATA_FILE)
+    closes, high, low = (np.asarray(columns[k])[-60:].tolist() for k in ("close", "high", "low"))
+
+    rsi_only = await analyze_rsi(OHLCAnalysisRequest(asset="BTC/USD", historical_prices=closes))
+    assert rsi_only.macd is None and rsi_only.atr is None
+    assert rsi_only.rsi == pytest.approx(calculate_manual_rsi(closes), abs=1e-9)
+
+    full = await analyze_rsi(OHLCAnalysisRequest(asset="BTC/USD", historical_prices=closes, high=high, low=low), indicators="all")
+    assert full.rsi == rsi_only.rsi
+    assert full.bollinger.lower < full.bollinger.middle < full.bollinger.upper
+    assert full.atr > 0 and 0 <= full.stochastic.k <= 100
+
+    with pytest.raises(HTTPException) as exc_info:
+        await analyze_rsi(OHLCAnalysisRequest(asset="BTC/USD", historical_prices=closes[:20]), indicators="macd")
+    assert exc_info.value.status_code == 400
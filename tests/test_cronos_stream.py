@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from saka.agents.cronos_cycles.main import IncrementalRSI, seed_rsi, analyze_tick, rsi_states
+from saka.shared.models import AnalysisRequest, PriceTick
+
+
+def reference_rsi(prices, period: int = 14) -> float:
+    """RSI com EMA ajustada do pandas sobre todo o histórico, sem truncamento."""
+    delta = pd.Series(prices).diff()
+    avg_gain = delta.where(delta > 0, 0).ewm(com=period - 1, min_periods=period).mean()
+    avg_loss = (-delta.where(delta < 0, 0)).ewm(com=period - 1, min_periods=period).mean()
+    rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    return rsi[rsi.last_valid_index()]
+
+
+def test_incremental_rsi_matches_untruncated_reference():
+    prices = 100.0 * np.cumprod(1 + np.random.default_rng(3).normal(0, 0.02, 2000))
+    state = IncrementalRSI(period=14)
+    for price in prices:
+        value = state.update(price)
+    assert value == pytest.approx(reference_rsi(prices), rel=1e-9)
+
+
+def test_incremental_rsi_warmup_and_flat_prices():
+    state = IncrementalRSI(period=14)
+    assert state.seed([100.0] * 15) is None
+    assert state.update(101.0) == 100.0
+
+
+@pytest.mark.asyncio
+async def test_seed_then_tick_endpoints():
+    prices = [
+        44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08,
+        45.89, 46.03, 45.61, 46.28, 46.28, 46.00, 46.03, 46.41, 46.22, 45.64
+    ]
+    rsi_states.clear()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await analyze_tick(PriceTick(asset="BTC/USD", price=46.21))
+    assert exc_info.value.status_code == 409
+
+    await seed_rsi(AnalysisRequest(asset="BTC/USD", historical_prices=prices))
+    output = await analyze_tick(PriceTick(asset="BTC/USD", price=46.21))
+    assert output.rsi == pytest.approx(reference_rsi(prices + [46.21]), rel=1e-9)
@@ -0,0 +1,172 @@
+import asyncio
+import json
+
+import pytest
+
+from src.core.agent import BaseAgent
+import src.core.event_bus as event_bus
+from src.core.event_bus import BrokerServer, InProcessBroker, RemoteBroker, topic_matches
+
+
+def test_topic_patterns():
+    assert topic_matches("prices.BTC/USD", "prices.BTC/USD")
+    assert not topic_matches("prices.BTC/USD", "prices.ETH/USD")
+    assert topic_matches("prices.*", "prices.ETH/USD")
+    assert not topic_matches("prices.*", "prices.ETH/USD.1m")
+    assert topic_matches("prices.#", "prices.ETH/USD.1m")
+    assert topic_matches("#", "risk.alerts")
+    assert not topic_matches("risk.alerts", "risk")
+
+
+class RecordingAgent(BaseAgent):
+    def __init__(self, agent_id: str, bus, topics=()):
+        super().__init__(agent_id, agent_id, event_bus=bus)
+        self.topics = list(topics)
+        self.events = []
+
+    async def handle_event(self, event):
+        self.events.append((event.topic, event.payload))
+
+
+@pytest.mark.asyncio
+async def test_one_publish_reaches_every_subscribed_agent():
+    bus = InProcessBroker()
+    sentinel = RecordingAgent("sentinel", bus)
+    cronos = RecordingAgent("cronos", bus)
+    kamila = RecordingAgent("kamila", bus)
+    await sentinel.subscribe("prices.BTC/USD")
+    await cronos.subscribe("prices.*")
+    await kamila.subscribe("risk.alerts")
+
+    await sentinel.publish("prices.BTC/USD", {"close": 50000.0})
+    await sentinel.publish("risk.alerts", {"level": "high"})
+    await bus.drain()
+
+    assert sentinel.events == [("prices.BTC/USD", {"close": 50000.0})]
+    assert cronos.events == [("prices.BTC/USD", {"close": 50000.0})]
+    assert kamila.events == [("risk.alerts", {"level": "high"})]
+
+    for agent in (sentinel, cronos, kamila):
+        await agent.close()
+    assert bus.subscriptions == []
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_does_not_block_publisher_and_drops_oldest():
+    bus = InProcessBroker(queue_size=2)
+    release = asyncio.Event()
+    seen = []
+
+    async def slow(event):
+        await release.wait()
+        seen.append(event.payload["n"])
+
+    subscription = await bus.subscribe("prices.#", slow)
+    for n in range(5):
+        await asyncio.wait_for(bus.publish("prices.BTC/USD", {"n": n}), timeout=1)
+    await asyncio.sleep(0)
+    release.set()
+    await bus.drain()
+
+    # The first event was already being handled; of the rest only the two newest were kept
+    assert seen == [0, 3, 4]
+    assert subscription.dropped == 2
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_are_isolated():
+    bus = InProcessBroker()
+    received = []
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    await bus.subscribe("risk.alerts", broken)
+    await bus.subscribe("risk.alerts", lambda event: received.append(event.sender_id))
+    await bus.publish("risk.alerts", {}, sender_id="sentinel")
+    await bus.publish("risk.alerts", {}, sender_id="orion")
+    await bus.drain()
+    assert received == ["sentinel", "orion"]
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_agent_subscribes_to_its_topics_on_startup():
+    bus = InProcessBroker()
+    agent = RecordingAgent("kamila", bus, topics=["risk.alerts"])
+    async with agent.app.router.lifespan_context(agent.app):
+        await bus.publish("risk.alerts", {"level": "high"}, sender_id="sentinel")
+        await bus.drain()
+        assert agent.events == [("risk.alerts", {"level": "high"})]
+    assert bus.subscriptions == []
+
+
+@pytest.mark.asyncio
+async def test_remote_broker_fans_out_between_clients():
+    server = BrokerServer(port=0)
+    await server.start()
+    publisher = RemoteBroker("127.0.0.1", server.port)
+    subscriber = RemoteBroker("127.0.0.1", server.port)
+    received = asyncio.Queue()
+    try:
+        await subscriber.subscribe("prices.*", lambda event: received.put_nowait(("all", event.payload)))
+        await subscriber.subscribe("prices.BTC/USD", lambda event: received.put_nowait(("btc", event.payload)))
+        await publisher.publish("risk.alerts", {"ignored": True})
+        await publisher.publish("prices.BTC/USD", {"close": 1.0})
+
+        got = [await asyncio.wait_for(received.get(), timeout=2) for _ in range(2)]
+        assert sorted(got, key=lambda item: item[0]) == [("all", {"close": 1.0}), ("btc", {"close": 1.0})]
+        assert received.empty()
+    finally:
+        await publisher.close()
+        await subscriber.close()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_remote_broker_sends_each_subscription_once():
+    frames = []
+
+    async def record(reader, writer):
+        while line := await reader.readline():
+            frames.append(json.loads(line))
+
+    server = await asyncio.start_server(record, "127.0.0.1", 0)
+    client = RemoteBroker("127.0.0.1", server.sockets[0].getsockname()[1])
+    try:
+        await client.subscribe("risk.*", lambda event: None)
+        await client.subscribe("risk.*", lambda event: None)
+        await client.subscribe("prices.*", lambda event: None)
+        await asyncio.sleep(0.05)
+        assert frames == [{"op": "subscribe", "pattern": "risk.*"}, {"op": "subscribe", "pattern": "prices.*"}]
+    finally:
+        await client.close()
+        server.close()
+
+@pytest.mark.asyncio
+async def test_remote_broker_subscribes_again_after_broker_restart(monkeypatch):
+    monkeypatch.setattr(event_bus, "RECONNECT_DELAY", 0.05)
+    server = BrokerServer(port=0)
+    await server.start()
+    port = server.port
+    publisher = RemoteBroker("127.0.0.1", port)
+    subscriber = RemoteBroker("127.0.0.1", port)
+    received = asyncio.Queue()
+    try:
+        await subscriber.subscribe("risk.*", lambda event: received.put_nowait(event.payload))
+        await server.close()
+
+        server = BrokerServer(port=port)
+        await server.start()
+        # The subscriber reconnects on its own and registers its pattern on the new broker
+        for _ in range(100):
+            if any("risk.*" in patterns for patterns in server.connections.values()):
+                break
+            await asyncio.sleep(0.02)
+        await publisher.publish("risk.alerts", {"level": "high"})
+        assert await asyncio.wait_for(received.get(), timeout=2) == {"level": "high"}
+    finally:
+        await publisher.close()
+        await subscriber.close()
+        await server.close()
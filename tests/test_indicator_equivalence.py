@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from saka.agents.cronos_cycles.main import MACD_SLOW
+from tests.performance.bench_indicators import (
+    ENGINES, TOLERANCE, WINDOWS, batched_2d, bench_indicator_sets, random_walk, reference_rsi, sliding_windows
+)
+
+
+def test_reference_matches_pandas_ewm_without_truncation():
+    prices = pd.Series(random_walk(300, seed=1))
+    delta = prices.diff()
+    gains = delta.where(delta > 0, 0).ewm(com=13, min_periods=14).mean()
+    losses = (-delta.where(delta < 0, 0)).ewm(com=13, min_periods=14).mean()
+    expected = 100 - 100 / (1 + gains.iloc[-1] / losses.iloc[-1])
+    assert reference_rsi(prices.to_numpy()) == pytest.approx(expected, abs=TOLERANCE)
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("window", [15, 16, 100, 1_000, 10_000, 100_000])
+def test_engines_agree_with_reference(engine, window):
+    prices = random_walk(window, seed=window)
+    arg = prices.tolist() if engine == "pandas_ewm" else prices
+    assert ENGINES[engine](arg) == pytest.approx(reference_rsi(prices), abs=TOLERANCE)
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("period", [2, 5, 50])
+def test_engines_agree_for_other_periods(engine, period):
+    prices = random_walk(3 * period + 40, seed=period)
+    arg = prices.tolist() if engine == "pandas_ewm" else prices
+    assert ENGINES[engine](arg, period) == pytest.approx(reference_rsi(prices, period), abs=TOLERANCE)
+
+
+@pytest.mark.parametrize("window,width", [(15, 1), (15, 512), (600, 33), (5_000, 8)])
+def test_batched_engine_agrees_row_by_row(window, width):
+    batch = sliding_windows(random_walk(window + width, seed=width), window, width)
+    expected = np.array([reference_rsi(row) for row in batch])
+    np.testing.assert_allclose(batched_2d(batch), expected, rtol=0, atol=TOLERANCE)
+
+
+def test_edge_cases_agree():
+    rising = np.linspace(100, 120, 40)
+    assert reference_rsi(rising) == 100.0
+    for name, engine in ENGINES.items():
+        assert engine(rising.tolist() if name == "pandas_ewm" else rising) == 100.0
+
+    # Too few prices: the batch engines raise, the incremental one is still warming up
+    with pytest.raises(ValueError):
+        ENGINES["pandas_ewm"](list(range(10)))
+    with pytest.raises(ValueError):
+        ENGINES["numpy"](np.arange(10.0))
+    assert ENGINES["incremental"](np.arange(10.0)) is None
+
+
+def test_indicator_set_bench_skips_windows_too_short_for_macd():
+    results = bench_indicator_sets(WINDOWS[:2])
+    assert [r["window"] for r in results] == [w for w in WINDOWS[:2] if w >= MACD_SLOW]
+    assert all(r["full_set_ms"] > 0 for r in results)
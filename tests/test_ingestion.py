@@ -0,0 +1,106 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import saka.orchestrator.main as orchestrator
+from saka.ingestion.feeds import Bar, BarAggregator, Tick, replay_bars, simulate_ticks, ticks_to_bars
+from saka.ingestion.pipeline import IngestionPipeline
+from saka.ingestion.windows import RollingWindow
+from saka.shared.price_store import PriceStore
+
+DATA_FILE = "data/Gemini_BTCUSD_d.csv"
+
+
+def test_rolling_window_keeps_latest_values_in_order():
+    window = RollingWindow(4)
+    for value in range(1, 4):
+        window.append(value)
+    np.testing.assert_array_equal(window.values(), [1, 2, 3])
+    for value in range(4, 8):
+        window.append(value)
+    np.testing.assert_array_equal(window.values(), [4, 5, 6, 7])
+    assert len(window) == 4 and window.last == 7
+
+
+def test_ticks_are_aggregated_into_bars():
+    aggregator = BarAggregator(60)
+    assert aggregator.add(Tick("BTC/USD", 0, 10.0, 1.0)) is None
+    assert aggregator.add(Tick("BTC/USD", 30, 12.0, 2.0)) is None
+    assert aggregator.add(Tick("BTC/USD", 59, 9.0, 1.0)) is None
+    closed = aggregator.add(Tick("BTC/USD", 61, 11.0, 1.0))
+    assert closed == Bar("BTC/USD", 0, 10.0, 12.0, 9.0, 9.0, 4.0)
+    assert aggregator.flush() == [Bar("BTC/USD", 60, 11.0, 11.0, 11.0, 11.0, 1.0)]
+
+
+@pytest.mark.asyncio
+async def test_simulated_feed_produces_bars_per_asset():
+    ticks = simulate_ticks(["BTC/USD", "ETH/USD"], ticks_per_second=2, seed=1, start_time=0, limit=2 * 2 * 60 * 3)
+    bars = [bar async for bar in ticks_to_bars(ticks, 60)]
+    assert sorted((b.asset, b.timestamp) for b in bars) == [(a, t) for a in ("BTC/USD", "ETH/USD") for t in (0, 60, 120)]
+    assert all(b.low <= min(b.open, b.close) and b.high >= max(b.open, b.close) for b in bars)
+
+
+@pytest.mark.asyncio
+async def test_replay_drives_a_cycle_per_closed_bar(agent_mesh):
+    decided = []
+    pipeline = IngestionPipeline(orchestrator.get_kamila_decision, window=50, min_points=20, wait_for_cycles=True,
+                                 on_decision=lambda asset, ts, decision: decided.append((ts, decision["action"])))
+    await pipeline.run(replay_bars(DATA_FILE, limit=40))
+
+    assert pipeline.stats == {"bars": 40, "cycles": 21, "skipped": 0, "errors": 0}
+    assert [ts for ts, _ in decided] == sorted(ts for ts, _ in decided)
+    assert {action for _, action in decided} <= {"execute_trade", "hold"}
+
+
+@pytest.mark.asyncio
+async def test_cycles_reference_the_shared_store_instead_of_resending_prices(agent_mesh, tmp_path, monkeypatch):
+    monkeypatch.setenv("PRICE_STORE_DIR", str(tmp_path))
+    requests = []
+
+    async def decide(request):
+        requests.append(request)
+        return await orchestrator.get_kamila_decision(request)
+
+    pipeline = IngestionPipeline(decide, window=30, min_points=30, store=PriceStore(str(tmp_path)), wait_for_cycles=True)
+    await pipeline.run(replay_bars(DATA_FILE, limit=35))
+
+    assert pipeline.stats["cycles"] == 6 and pipeline.stats["errors"] == 0
+    assert all(r.historical_prices is None and r.price_ref.limit == 30 for r in requests)
+    last_bar = [bar async for bar in replay_bars(DATA_FILE, limit=35)][-1]
+    assert requests[-1].price_ref.end == last_bar.timestamp + 1
+
+
+@pytest.mark.asyncio
+async def test_busy_asset_skips_cycles_and_schedule_trigger():
+    release = asyncio.Event()
+    calls = []
+
+    async def slow_decide(request):
+        calls.append(len(request.historical_prices))
+        await release.wait()
+        return {"action": "hold"}
+
+    pipeline = IngestionPipeline(slow_decide, window=10, min_points=3)
+    bars = [Bar("BTC/USD", t, 1.0, 1.0, 1.0, 1.0 + t, 1.0) for t in range(6)]
+    for bar in bars:
+        await pipeline.ingest(bar)
+    await asyncio.sleep(0)
+    release.set()
+    await pipeline.run(async_iter([]))
+    assert calls == [3] and pipeline.stats["skipped"] == 3 and pipeline.stats["cycles"] == 1
+
+    scheduled = IngestionPipeline(slow_decide, window=10, min_points=3, trigger="schedule", interval=0.01)
+
+    async def slow_feed():
+        for bar in bars:
+            yield bar
+            await asyncio.sleep(0.02)
+
+    await scheduled.run(slow_feed())
+    assert scheduled.stats["cycles"] >= 2 and scheduled.stats["bars"] == 6
+
+
+async def async_iter(items):
+    for item in items:
+        yield item
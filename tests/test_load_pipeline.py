@@ -0,0 +1,37 @@
+import httpx
+import numpy as np
+import pytest
+
+import saka.shared.security as security
+import saka.orchestrator.main as orchestrator
+from tests.performance.load_pipeline import API_KEY, compare, run_scenario, summarize
+
+
+@pytest.mark.asyncio
+async def test_scenario_reports_throughput_and_stage_percentiles(agent_mesh, monkeypatch):
+    monkeypatch.setattr(security, "INTERNAL_API_KEY", API_KEY)
+    monkeypatch.setattr(orchestrator, "INTERNAL_API_HEADERS", {"X-Internal-API-Key": API_KEY})
+    closes = 100 * np.cumprod(1 + np.random.default_rng(3).normal(0, 0.01, 400))
+
+    transport = httpx.ASGITransport(app=orchestrator.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://orchestrator") as client:
+        result = await run_scenario(client, closes, concurrency=4, window=60, assets=3, requests=12, warmup=1)
+
+    assert result["status_codes"] == {"200": 12}
+    assert result["throughput_rps"] > 0
+    assert result["latency"]["count"] == 12
+    assert result["latency"]["p50_ms"] <= result["latency"]["p95_ms"] <= result["latency"]["p99_ms"]
+    for stage in ("orchestrator:decision_cycle", "orchestrator:fan_out", "orchestrator:call sentinel",
+                  "cronos_cycles:computation", "kamila_ceo:computation"):
+        assert result["stages"][stage]["count"] >= 12
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    def report(p95, rps):
+        return {"scenarios": [{"config": {"concurrency": 8, "window": 100, "assets": 1},
+                               "latency": {"p95_ms": p95}, "throughput_rps": rps}]}
+
+    assert compare(report(10.0, 100.0), report(11.0, 95.0), tolerance=0.2) == []
+    regressions = compare(report(10.0, 100.0), report(13.0, 70.0), tolerance=0.2)
+    assert len(regressions) == 2 and "p95" in regressions[0] and "throughput" in regressions[1]
+    assert summarize([]) == {"count": 0}
@@ -0,0 +1,47 @@
+import os
+import shutil
+import numpy as np
+import pytest
+
+from saka.shared.market_data import load_ohlcv, load_ohlcv_columns, parse_ohlcv_csv, default_cache_dir
+
+DATASETS = [
+    ("data/btc_usd_daily.csv", "saka"),
+    ("data/Gemini_BTCUSD_d.csv", "cryptodatadownload"),
+    ("btcusd_d.csv", "date_ohlc"),
+]
+
+
+@pytest.mark.parametrize("filepath,schema", DATASETS)
+def test_bundled_datasets_are_normalized(filepath, schema):
+    detected, columns = parse_ohlcv_csv(filepath)
+    assert detected == schema
+    assert np.all(np.diff(columns["timestamp"]) > 0)
+    # Todos os timestamps normalizados para segundos (entre 2010 e 2030)
+    assert columns["timestamp"].min() > 1.2e9 and columns["timestamp"].max() < 1.9e9
+
+    df = load_ohlcv(filepath, use_cache=False)
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df.index.name == "timestamp"
+
+
+def test_cache_is_reused_and_invalidated(tmp_path):
+    csv_path = tmp_path / "prices.csv"
+    shutil.copy("data/btc_usd_daily.csv", csv_path)
+    cache_dir = default_cache_dir(str(csv_path))
+
+    first = load_ohlcv_columns(str(csv_path))
+    assert isinstance(first["close"], np.memmap)
+    built_at = os.path.getmtime(os.path.join(cache_dir, "close.npy"))
+
+    # Apenas o mtime mudou: o hash confirma o conteúdo e o cache é mantido
+    os.utime(csv_path, ns=(1, 1))
+    load_ohlcv_columns(str(csv_path))
+    assert os.path.getmtime(os.path.join(cache_dir, "close.npy")) == built_at
+
+    # Conteúdo alterado: o cache é reconstruído
+    with open(csv_path, "a") as f:
+        f.write("\n2023-02-01T00:00:00Z,1,2,0.5,1.5,10\n")
+    refreshed = load_ohlcv_columns(str(csv_path))
+    assert len(refreshed["close"]) == len(first["close"]) + 1
+    assert refreshed["close"][-1] == 1.5
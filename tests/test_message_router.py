@@ -0,0 +1,113 @@
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+import src.orchestrator.main as router
+from src.orchestrator.agent_registry import agent_registry
+from src.orchestrator.models import Agent
+
+
+class FakeAgent:
+    """Agent endpoint that records messages and the peak number of concurrent deliveries."""
+    def __init__(self, delay: float = 0.0, status_code: int = 200):
+        self.received = []
+        self.in_flight = 0
+        self.peak = 0
+        self.app = FastAPI()
+
+        @self.app.post("/message")
+        async def message(request: Request):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(delay)
+            self.in_flight -= 1
+            self.received.append(await request.json())
+            if status_code != 200:
+                raise HTTPException(status_code=status_code)
+            return {"status": "message received"}
+
+
+@pytest_asyncio.fixture
+async def router_client(monkeypatch):
+    """Router app in-process, forwarding to fake agents mounted at http://<agent_id>."""
+    monkeypatch.setattr(agent_registry, "agents", {})
+    monkeypatch.setattr(router, "message_queue", None)
+    monkeypatch.setattr(router, "queue_workers", [])
+    monkeypatch.setattr(router, "target_limits", {})
+    monkeypatch.setattr(router, "router_stats", dict.fromkeys(router.router_stats, 0))
+    mounts = {}
+
+    def add_agent(agent_id: str, fake: FakeAgent):
+        agent_registry.register_agent(Agent(id=agent_id, name=agent_id, endpoint=f"http://{agent_id}"))
+        mounts[f"http://{agent_id}"] = httpx.ASGITransport(app=fake.app)
+        monkeypatch.setattr(router, "http_client", httpx.AsyncClient(mounts=mounts))
+
+    transport = httpx.ASGITransport(app=router.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://router") as client:
+        client.add_agent = add_agent
+        yield client
+    for worker in router.queue_workers:
+        worker.cancel()
+    if router.http_client is not None:
+        await router.http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_message_is_forwarded_and_unknown_agent_is_404(router_client):
+    agent = FakeAgent()
+    router_client.add_agent("athena", agent)
+
+    response = await router_client.post("/agents/athena/message", json={"sender_id": "kamila", "content": {"x": 1}})
+    assert response.status_code == 200
+    assert response.json() == {"status": "message received"}
+    assert agent.received == [{"sender_id": "kamila", "content": {"x": 1}}]
+
+    response = await router_client.post("/agents/nobody/message", json={"sender_id": "kamila", "content": {}})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_agent_errors_are_reported_as_503(router_client):
+    router_client.add_agent("broken", FakeAgent(status_code=500))
+    response = await router_client.post("/agents/broken/message", json={"sender_id": "kamila", "content": {}})
+    assert response.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_non_json_replies_are_reported_as_503(router_client):
+    agent = FakeAgent()
+    agent.app = FastAPI()
+    for path in ("/message", "/messages/batch"):
+        agent.app.add_api_route(path, lambda: PlainTextResponse("ok"), methods=["POST"])
+    router_client.add_agent("plain", agent)
+
+    response = await router_client.post("/agents/plain/message", json={"sender_id": "kamila", "content": {}})
+    assert response.status_code == 503
+    message = {"sender_id": "kamila", "content": {}}
+    response = await router_client.post("/agents/plain/messages/batch", json={"messages": [message, message]})
+    assert response.status_code == 503
+    assert router.router_stats["failed"] == 3
+
+@pytest.mark.asyncio
+async def test_fire_and_forget_returns_before_delivery(router_client, monkeypatch):
+    monkeypatch.setattr(router, "ROUTER_MAX_CONCURRENCY_PER_AGENT", 2)
+    agent = FakeAgent(delay=0.05)
+    router_client.add_agent("hermes", agent)
+
+    responses = await asyncio.gather(*(
+        router_client.post("/agents/hermes/message", params={"fire_and_forget": "true"}, json={"sender_id": "s", "content": {"i": i}})
+        for i in range(6)
+    ))
+    assert [r.status_code for r in responses] == [202] * 6
+    assert agent.received == []
+
+    await asyncio.wait_for(router.message_queue.join(), timeout=5)
+    assert sorted(m["content"]["i"] for m in agent.received) == list(range(6))
+    # Never more than the per-target limit in flight, even with more queue workers
+    assert agent.peak <= 2
+    stats = (await router_client.get("/router/stats")).json()
+    assert (stats["queued"], stats["forwarded"], stats["queue_size"]) == (6, 6, 0)
@@ -0,0 +1,60 @@
+import httpx
+import numpy as np
+import pytest
+
+import saka.orchestrator.main as orchestrator
+from saka.shared.metrics import MetricsRegistry
+from saka.shared.models import AnalysisRequest
+from saka.agents.sentinel_risk.main import app as sentinel_app
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_latency_seconds", "Latência.", ("stage",), buckets=(0.1, 1.0))
+    requests = registry.counter("test_requests_total", "Requisições.", ("code",))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, stage="fan_out")
+    requests.inc(code="200")
+
+    text = registry.render()
+    assert '# TYPE test_latency_seconds histogram' in text
+    assert 'test_latency_seconds_bucket{stage="fan_out",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="fan_out",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{stage="fan_out",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{stage="fan_out"} 3' in text
+    assert 'test_requests_total{code="200"} 1' in text
+
+    with pytest.raises(ValueError):
+        requests.inc(agent="x")
+
+
+@pytest.mark.asyncio
+async def test_agent_metrics_endpoint_is_public_and_uses_route_templates():
+    transport = httpx.ASGITransport(app=sentinel_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://sentinel") as client:
+        await client.get("/health")
+        await client.get("/nao-existe")
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'saka_http_requests_total{service="sentinel_risk",path="/health",method="GET",status="200"}' in response.text
+    assert 'path="/nao-existe"' not in response.text
+    assert 'saka_http_requests_in_flight{service="sentinel_risk"} 0' in response.text
+
+
+@pytest.mark.asyncio
+async def test_decision_cycle_records_stage_latencies(agent_mesh):
+    before = {stage: orchestrator.STAGE_LATENCY.count(stage=stage)
+              for stage in ("sentinel", "cronos", "orion", "fan_out", "consolidation", "kamila", "end_to_end")}
+    prices = (100 * np.cumprod(1 + np.random.default_rng(5).normal(0, 0.01, 60))).tolist()
+
+    await orchestrator.get_kamila_decision(AnalysisRequest(asset="ETH/USD", historical_prices=prices))
+
+    for stage, count in before.items():
+        assert orchestrator.STAGE_LATENCY.count(stage=stage) == count + 1, stage
+    assert orchestrator.AGENT_CALLS.value(agent="kamila", code="200") >= 1
+
+    text = orchestrator.REGISTRY.render()
+    assert 'saka_orchestrator_agent_payload_bytes_count{agent="sentinel",direction="request"}' in text
+    misses = orchestrator.analysis_cache.stats()["misses"]
+    assert f'saka_orchestrator_analysis_cache{{stat="misses"}} {misses}' in text
@@ -1,4 +1,11 @@
+import asyncio
+
+import httpx
 import pytest
+import src.orchestrator.main as router
+from src.agents.cronos.cronos import CronosAgent
+from src.agents.sentinel.sentinel import SentinelAgent
+from src.core.agent import BaseAgent
 from src.orchestrator.agent_registry import AgentRegistry
 from src.orchestrator.models import Agent
 
@@ -55,3 +62,168 @@ def test_list_agents(registry: AgentRegistry):
     registry.register_agent(agent2)
     # The order is not guaranteed, so we compare sets
     assert set(registry.list_agents()) == {agent1, agent2}
+
+def test_expired_agents_are_hidden_and_evicted(clock):
+    registry = AgentRegistry(ttl=10, clock=clock)
+    registry.register_agent(Agent(id="a", name="A", endpoint="http://a"))
+    registry.register_agent(Agent(id="b", name="B", endpoint="http://b"))
+
+    clock.now += 8
+    registry.heartbeat("a")
+    clock.now += 5
+    assert [agent.id for agent in registry.list_agents()] == ["a"]
+    with pytest.raises(ValueError, match="not found"):
+        registry.get_agent("b")
+    with pytest.raises(ValueError, match="not found"):
+        registry.heartbeat("b")
+
+    assert registry.evict_expired() == ["b"]
+    assert list(registry.agents) == ["a"]
+
+def test_reregistration_renews_and_expired_ids_can_be_taken_over(clock):
+    registry = AgentRegistry(ttl=10, clock=clock)
+    registry.register_agent(Agent(id="a", name="A", endpoint="http://a"))
+    clock.now += 5
+    registry.register_agent(Agent(id="a", name="A", endpoint="http://a"))
+    assert registry.expires_at["a"] == clock.now + 10
+
+    clock.now += 11
+    replacement = Agent(id="a", name="A", endpoint="http://a2")
+    registry.register_agent(replacement)
+    assert registry.get_agent("a") == replacement
+
+def test_role_and_capability_indexes(clock):
+    registry = AgentRegistry(ttl=10, clock=clock)
+    registry.register_agent(Agent(id="c1", name="Cronos", endpoint="http://c1", role="analyst", capabilities=("rsi", "macd")))
+    registry.register_agent(Agent(id="c2", name="Cronos", endpoint="http://c2", role="analyst", capabilities=("rsi",)))
+    registry.register_agent(Agent(id="s1", name="Sentinel", endpoint="http://s1", role="risk"))
+
+    assert {a.id for a in registry.list_agents(role="analyst")} == {"c1", "c2"}
+    assert [a.id for a in registry.list_agents(capability="macd")] == ["c1"]
+    assert [a.id for a in registry.list_agents(role="analyst", capability="macd")] == ["c1"]
+    assert [registry.pick_agent(capability="rsi").id for _ in range(4)] == ["c1", "c2", "c1", "c2"]
+
+    clock.now += 8
+    registry.heartbeat("c2")
+    clock.now += 5
+    assert registry.pick_agent(role="analyst").id == "c2"
+    registry.unregister_agent("c2")
+    with pytest.raises(ValueError, match="No live agent"):
+        registry.pick_agent(role="analyst")
+
+def test_registry_changes_from_threads_during_sweeps(clock):
+    import threading
+    registry = AgentRegistry(ttl=10, clock=clock)
+    errors = []
+
+    def churn(worker: int):
+        try:
+            for i in range(300):
+                agent_id = f"w{worker}-{i % 20}"
+                registry.register_agent(Agent(id=agent_id, name="W", endpoint=f"http://{agent_id}", role="worker"))
+                try:
+                    if i % 3 == 0:
+                        registry.unregister_agent(agent_id)
+                    registry.pick_agent(role="worker")
+                except ValueError:
+                    # Already evicted by another thread's sweep, or no live worker left
+                    pass
+                clock.now += 0.5
+                registry.evict_expired()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=churn, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert set(registry.by_role["worker"]) == set(registry.agents)
+
+def test_registry_survives_restart(tmp_path, clock):
+    db_path = str(tmp_path / "registry.db")
+    registry = AgentRegistry(db_path, ttl=10, clock=clock)
+    agent = Agent(id="k", name="Kamila", endpoint="http://k", role="ceo", capabilities=("decide",))
+    registry.register_agent(agent)
+    registry.register_agent(Agent(id="old", name="Old", endpoint="http://old"))
+    clock.now += 8
+    registry.heartbeat("k")
+    registry.close()
+
+    clock.now += 5
+    restarted = AgentRegistry(db_path, ttl=10, clock=clock)
+    assert restarted.get_agent("k") == agent
+    assert restarted.pick_agent(role="ceo") == agent
+    assert "old" not in restarted.agents
+    restarted.close()
+
+@pytest.mark.asyncio
+async def test_agent_heartbeats_and_registers_again_after_eviction(monkeypatch, clock):
+    registry = AgentRegistry(ttl=10, clock=clock)
+    monkeypatch.setattr(router, "agent_registry", registry)
+    agent = BaseAgent("cronos", "Cronos", orchestrator_url="http://router", role="analyst", capabilities=["rsi"])
+    agent.http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=router.app))
+
+    response = await agent.http_client.post("http://router/agents/register", json=agent.registration_data())
+    assert response.status_code == 201
+    clock.now += 8
+    await agent.send_heartbeat()
+    assert registry.expires_at["cronos"] == clock.now + 10
+
+    clock.now += 11
+    registry.evict_expired()
+    await agent.send_heartbeat()
+    assert registry.get_agent("cronos").capabilities == ("rsi",)
+
+    response = await agent.http_client.get("http://router/agents/pick", params={"role": "analyst"})
+    assert response.json()["id"] == "cronos"
+    response = await agent.http_client.get("http://router/agents", params={"capability": "macd"})
+    assert response.json() == []
+    await agent.close()
+
+
+class OrchestratorStartingLater(httpx.AsyncBaseTransport):
+    """Refuses the first `down_for` connections, then routes to the orchestrator app."""
+    def __init__(self, down_for: int):
+        self.down_for = down_for
+        self.app_transport = httpx.ASGITransport(app=router.app)
+
+    async def handle_async_request(self, request):
+        if self.down_for > 0:
+            self.down_for -= 1
+            raise httpx.ConnectError("Connection refused", request=request)
+        return await self.app_transport.handle_async_request(request)
+
+@pytest.mark.asyncio
+async def test_agent_started_before_the_orchestrator_registers_from_the_heartbeat_loop(monkeypatch):
+    registry = AgentRegistry(ttl=10)
+    monkeypatch.setattr(router, "agent_registry", registry)
+    agent = BaseAgent("cronos", "Cronos", orchestrator_url="http://router", role="analyst", capabilities=["rsi"])
+    agent.heartbeat_interval = 0.01
+    agent.http_client = httpx.AsyncClient(transport=OrchestratorStartingLater(down_for=2))
+
+    async with agent.app.router.lifespan_context(agent.app):
+        for _ in range(100):
+            if agent.registered:
+                break
+            await asyncio.sleep(0.01)
+        assert agent.registered
+        assert registry.get_agent("cronos").role == "analyst"
+        await asyncio.sleep(0.03)
+        assert registry.is_alive("cronos")
+
+
+@pytest.mark.asyncio
+async def test_agents_register_their_role_and_capabilities(monkeypatch):
+    monkeypatch.setattr(router, "agent_registry", AgentRegistry(ttl=10))
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=router.app))
+    for agent in (CronosAgent(orchestrator_url="http://router"), SentinelAgent(orchestrator_url="http://router")):
+        response = await client.post("http://router/agents/register", json=agent.registration_data())
+        assert response.status_code == 201
+
+    response = await client.get("http://router/agents/pick", params={"role": "analyst"})
+    assert response.json()["id"] == "cronos"
+    response = await client.get("http://router/agents/pick", params={"capability": "exposure"})
+    assert response.json()["id"] == "sentinel"
+    await client.aclose()
@@ -0,0 +1,55 @@
+import json
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+import saka.orchestrator.main as orchestrator
+from saka.agents.sentinel_risk.main import analyze_risk
+from saka.agents.cronos_cycles.main import analyze_rsi
+from saka.shared.models import AnalysisRequest, EncodedPrices
+from saka.shared.price_codec import encode_prices, decode_prices, to_wire_payload
+
+
+def test_encode_decode_roundtrip_without_copy():
+    prices = 100.0 * np.cumprod(1 + np.random.default_rng(5).normal(0, 0.01, 10_000))
+
+    decoded = decode_prices(encode_prices(prices))
+    np.testing.assert_array_equal(decoded, prices)
+    # O array aponta diretamente para o buffer decodificado
+    assert isinstance(decoded.base, bytes)
+
+    decoded32 = decode_prices(encode_prices(prices, "float32"))
+    np.testing.assert_allclose(decoded32, prices, rtol=1e-6)
+
+
+def test_binary_payload_is_much_smaller_than_json():
+    request = AnalysisRequest(asset="BTC/USD", historical_prices=(100.0 * np.cumprod(1 + np.random.default_rng(5).normal(0, 0.01, 10_000))).tolist())
+
+    json_size = len(json.dumps(to_wire_payload(request, "json")))
+    assert len(json.dumps(to_wire_payload(request, "float64"))) < json_size / 1.5
+    assert len(json.dumps(to_wire_payload(request, "float32"))) < json_size / 3
+
+
+@pytest.mark.asyncio
+async def test_agents_accept_encoded_prices():
+    prices = [44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08,
+              45.89, 46.03, 45.61, 46.28, 46.28, 46.00, 46.03, 46.41, 46.22, 45.64]
+    plain = AnalysisRequest(asset="BTC/USD", historical_prices=prices)
+    binary = AnalysisRequest(asset="BTC/USD", encoded_prices=encode_prices(prices))
+
+    assert (await analyze_risk(binary)).volatility == (await analyze_risk(plain)).volatility
+    assert (await analyze_rsi(binary)).rsi == (await analyze_rsi(plain)).rsi
+
+    corrupted = AnalysisRequest(asset="BTC/USD", encoded_prices=EncodedPrices(data="AAAA"))
+    with pytest.raises(HTTPException) as exc_info:
+        await analyze_risk(corrupted)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_sends_binary_prices(agent_mesh, monkeypatch):
+    monkeypatch.setattr(orchestrator, "PRICE_WIRE_FORMAT", "float64")
+    prices = (100.0 * np.cumprod(1 + np.random.default_rng(8).normal(0, 0.01, 200))).tolist()
+
+    decision = await orchestrator.get_kamila_decision(AnalysisRequest(asset="BTC/USD", historical_prices=prices))
+    assert decision["action"] in ("execute_trade", "hold")
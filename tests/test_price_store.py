@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from saka.agents.sentinel_risk.main import analyze_risk
+from saka.shared.models import AnalysisRequest, PriceSeriesRef
+from saka.shared.price_store import PriceStore
+
+
+def make_bars(start: int, size: int, seed: int = 0) -> dict:
+    close = 100.0 * np.cumprod(1 + np.random.default_rng(seed).normal(0, 0.01, size))
+    return {
+        "timestamp": np.arange(start, start + size) * 86400,
+        "open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": np.ones(size)
+    }
+
+
+def test_append_and_read_zero_copy_views(tmp_path):
+    store = PriceStore(str(tmp_path))
+    first, second = make_bars(0, 50), make_bars(50, 30, seed=1)
+
+    assert store.append("BTC/USD", **first) == 50
+    assert store.append("BTC/USD", **second) == 80
+
+    window = store.read("BTC/USD", start=10 * 86400, end=60 * 86400, columns=("close", "timestamp"))
+    np.testing.assert_array_equal(window["close"], np.concatenate([first["close"][10:], second["close"][:10]]))
+    assert isinstance(window["close"].base, np.memmap)
+
+    latest = store.read("BTC/USD", limit=5)["close"]
+    np.testing.assert_array_equal(latest, second["close"][-5:])
+
+
+def test_store_is_append_only(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.append("BTC/USD", **make_bars(0, 10))
+
+    with pytest.raises(ValueError, match="append-only"):
+        store.append("BTC/USD", **make_bars(5, 10))
+    with pytest.raises(ValueError, match="inválido"):
+        store.read("../etc")
+
+
+def test_similar_asset_names_use_separate_directories(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.append("BTC/USD", **make_bars(0, 10))
+    store.append("BTC_USD", **make_bars(0, 5, seed=1))
+    assert store.length("BTC/USD") == 10 and store.length("BTC_USD") == 5
+    assert store.assets() == ["BTC/USD", "BTC_USD"]
+
+
+@pytest.mark.asyncio
+async def test_agent_reads_window_from_store_reference(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRICE_STORE_DIR", str(tmp_path))
+    bars = make_bars(0, 100)
+    PriceStore(str(tmp_path)).append("BTC/USD", **bars)
+
+    by_ref = AnalysisRequest(asset="BTC/USD", price_ref=PriceSeriesRef(limit=30))
+    by_value = AnalysisRequest(asset="BTC/USD", historical_prices=bars["close"][-30:].tolist())
+
+    assert (await analyze_risk(by_ref)).volatility == pytest.approx((await analyze_risk(by_value)).volatility, rel=1e-12)
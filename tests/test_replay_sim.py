@@ -0,0 +1,87 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import saka.orchestrator.main as orchestrator
+from saka.shared.market_data import load_ohlcv_columns
+from scripts.replay_sim import LatencyAwareReplay, PricePath
+
+DATA_FILE = "data/Gemini_BTCUSD_d.csv"
+DAY = 86400
+
+
+def fake_timer(latency: float):
+    """Relógio que avança `latency` segundos a cada ciclo (uma leitura no início e outra no fim)."""
+    ticks = itertools.count()
+    return lambda: next(ticks) * latency
+
+
+def always(decision: dict):
+    async def decide(request):
+        return decision
+    return decide
+
+
+def test_price_path_interpolates_between_bar_closes():
+    path = PricePath([0, DAY, 2 * DAY], [100.0, 200.0, 300.0])
+    assert path.bar_seconds == DAY
+    assert path.price_at(DAY) == 100.0
+    assert path.price_at(1.5 * DAY) == 150.0
+    assert path.price_at(10 * DAY) == 300.0
+
+
+@pytest.mark.asyncio
+async def test_latency_delays_the_fill_to_the_interpolated_price():
+    timestamps = np.arange(5) * DAY
+    closes = [100.0, 100.0, 110.0, 120.0, 130.0]
+    buy = {"action": "execute_trade", "side": "buy", "amount_usd": 100.0}
+    # 0,5 s de latência a 86400x = meia barra de atraso
+    replay = LatencyAwareReplay(always(buy), timestamps, closes, speed=DAY, window=3, timer=fake_timer(0.5))
+    report = await replay.run()
+
+    assert report["cycles"] == 3 and report["skipped_bars"] == 0
+    # O ciclo da última barra terminaria depois do fim dos dados
+    assert [f["filled_at"] for f in replay.fills] == [115.0, 125.0]
+    assert report["mean_delay_bars"] == pytest.approx(0.5)
+    assert report["latency_p50_ms"] == pytest.approx(500.0)
+    assert report["mean_execution_cost_bps"] > 0
+    assert report["latency_erosion_pct"] > 0
+
+
+@pytest.mark.asyncio
+async def test_bars_closing_during_a_cycle_are_coalesced():
+    timestamps = np.arange(10) * DAY
+    closes = np.linspace(100.0, 109.0, 10)
+    hold = {"action": "hold"}
+    # 2,5 barras de latência: só a barra mais recente de cada intervalo é analisada
+    replay = LatencyAwareReplay(always(hold), timestamps, closes, speed=DAY, window=1, timer=fake_timer(2.5))
+    report = await replay.run()
+    assert report["cycles"] == 5
+    assert report["skipped_bars"] == 5
+    assert report["fills"] == 0
+
+
+@pytest.mark.asyncio
+async def test_zero_speed_soak_matches_the_zero_latency_backtest(agent_mesh):
+    columns = load_ohlcv_columns(DATA_FILE)
+    timestamps, closes = np.asarray(columns["timestamp"])[-400:], np.asarray(columns["close"])[-400:]
+
+    report = await LatencyAwareReplay(orchestrator.get_kamila_decision, timestamps, closes, speed=0.0,
+                                      slippage_bps=5.0).run()
+    assert report["cycles"] == report["bars"] and report["skipped_bars"] == 0
+    assert report["fills"] > 0 and report["return_pct"] != 0.0
+    assert report["return_pct"] == pytest.approx(report["zero_latency_return_pct"])
+    assert report["mean_execution_cost_bps"] == pytest.approx(5.0)
+
+
+@pytest.mark.asyncio
+async def test_orders_ignored_by_the_portfolio_are_not_counted_as_fills():
+    timestamps = np.arange(5) * DAY
+    sell = {"action": "execute_trade", "side": "sell", "amount_usd": 100.0}
+    replay = LatencyAwareReplay(always(sell), timestamps, [100.0, 90.0, 80.0, 70.0, 60.0], speed=DAY, window=3,
+                                timer=fake_timer(0.5))
+    report = await replay.run()
+    assert replay.portfolio.history == []
+    assert report["fills"] == 0 and report["rejected_orders"] == 2
+    assert report["mean_execution_cost_bps"] == 0.0 and report["mean_delay_bars"] == 0.0
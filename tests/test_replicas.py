@@ -0,0 +1,93 @@
+import random
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI, Response
+
+import saka.orchestrator.main as orchestrator
+from saka.agents.sentinel_risk.main import app as sentinel_app
+from saka.agents.cronos_cycles.main import app as cronos_app
+from saka.agents.orion_cfo.main import app as orion_app
+from saka.agents.kamila_ceo.main import app as kamila_app
+from saka.orchestrator.replicas import ReplicaPool, fetch_registry_urls
+from saka.shared.models import AnalysisRequest
+from src.orchestrator.main import app as registry_app
+from src.orchestrator.agent_registry import agent_registry
+
+
+def unhealthy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    def health():
+        return Response(status_code=503)
+
+    return app
+
+
+def test_power_of_two_choices_prefers_idle_healthy_replicas():
+    pool = ReplicaPool("Cronos", ["http://a", "http://b", "http://c"], rng=random.Random(0))
+    busy = pool.replicas["http://a"]
+    busy.outstanding = 5
+    pool.mark(pool.replicas["http://c"], False)
+
+    # Com "c" ejetada, o sorteio é sempre entre "a" e "b", e "b" está livre
+    assert {pool.choose().url for _ in range(20)} == {"http://b"}
+
+    for replica in pool.replicas.values():
+        pool.mark(replica, False)
+    # Sem nenhuma réplica saudável, o pool ainda tenta todas
+    assert pool.choose().url in pool.replicas
+
+
+@pytest.mark.asyncio
+async def test_health_checks_eject_and_readmit_replicas():
+    pool = ReplicaPool("Cronos", ["http://ok", "http://down"])
+    mounts = {"http://ok": httpx.ASGITransport(app=cronos_app), "http://down": httpx.ASGITransport(app=unhealthy_app())}
+    async with httpx.AsyncClient(mounts=mounts) as client:
+        await pool.check_health(client)
+    assert [r.url for r in pool.healthy_replicas()] == ["http://ok"]
+
+    mounts["http://down"] = httpx.ASGITransport(app=cronos_app)
+    async with httpx.AsyncClient(mounts=mounts) as client:
+        await pool.check_health(client)
+    assert len(pool.healthy_replicas()) == 2
+
+
+@pytest.mark.asyncio
+async def test_registry_endpoints_become_pool_members(monkeypatch):
+    monkeypatch.setattr(agent_registry, "agents", {})
+    transport = httpx.ASGITransport(app=registry_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://registry") as client:
+        for i in range(2):
+            await client.post("/agents/register", json={"id": f"cronos-{i}", "name": "Cronos", "endpoint": f"http://cronos-{i}:8000"})
+        urls = await fetch_registry_urls(client, "http://registry")
+
+    assert urls == {"cronos": ["http://cronos-0:8000", "http://cronos-1:8000"]}
+
+
+@pytest.mark.asyncio
+async def test_cycles_are_spread_across_cronos_replicas(agent_mesh, monkeypatch):
+    hosts = []
+
+    async def record(request):
+        hosts.append(request.url.host)
+
+    apps = {"sentinel": sentinel_app, "cronos-a": cronos_app, "cronos-b": cronos_app, "orion": orion_app, "kamila": kamila_app}
+    mounts = {f"http://{name}": httpx.ASGITransport(app=app) for name, app in apps.items()}
+    pools = dict(orchestrator.agent_pools)
+    pools["Cronos"] = ReplicaPool("Cronos", ["http://cronos-a", "http://cronos-b"], rng=random.Random(1))
+    monkeypatch.setattr(orchestrator, "agent_pools", pools)
+
+    rng = np.random.default_rng(3)
+    async with httpx.AsyncClient(mounts=mounts, event_hooks={"request": [record]}) as client:
+        monkeypatch.setattr(orchestrator, "http_client", client)
+        for i in range(10):
+            prices = (100 * np.cumprod(1 + rng.normal(0, 0.005, 40))).tolist()
+            await orchestrator.get_kamila_decision(AnalysisRequest(asset=f"A{i}/USD", historical_prices=prices))
+
+    assert {"cronos-a", "cronos-b"} <= set(hosts)
+    assert all(r.outstanding == 0 for r in pools["Cronos"].replicas.values())
+    text = orchestrator.REGISTRY.render()
+    assert 'saka_orchestrator_replica_healthy{agent="cronos",replica="http://cronos-b"} 1' in text
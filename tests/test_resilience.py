@@ -0,0 +1,116 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI, HTTPException
+
+import saka.orchestrator.main as orchestrator
+from saka.agents.sentinel_risk.main import app as sentinel_app
+from saka.agents.cronos_cycles.main import app as cronos_app
+from saka.agents.orion_cfo.main import app as orion_app
+from saka.agents.kamila_ceo.main import app as kamila_app
+from saka.orchestrator.resilience import AgentPolicy, CircuitBreaker, ResilientAgent
+from saka.shared.models import AnalysisRequest
+
+PRICES = (100 * np.cumprod(1 + np.random.default_rng(8).normal(0, 0.005, 60))).tolist()
+
+
+def failing_agent(path: str, calls: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.post(path)
+    async def fail():
+        calls.append(path)
+        raise HTTPException(status_code=500, detail="falha simulada")
+
+    return app
+
+
+def mesh_client(**overrides) -> httpx.AsyncClient:
+    apps = {"sentinel": sentinel_app, "cronos": cronos_app, "orion": orion_app, "kamila": kamila_app, **overrides}
+    return httpx.AsyncClient(mounts={f"http://{name}": httpx.ASGITransport(app=app) for name, app in apps.items()})
+
+
+def test_circuit_breaker_opens_and_probes_after_recovery(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()          # chamada de teste
+    assert not breaker.allow()      # só uma por vez
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_after_p95():
+    agent = ResilientAgent("Cronos", AgentPolicy(hedge=True))
+    for _ in range(20):
+        agent.latencies.observe(0.01)
+    attempts = []
+    cancelled = []
+
+    async def send():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        return httpx.Response(200, json={"attempt": len(attempts)})
+
+    response = await agent.call(send)
+    assert response.json() == {"attempt": 2}
+    assert agent.hedges == 1
+    # A tentativa perdedora já terminou quando a chamada retorna
+    assert cancelled == [True]
+
+
+@pytest.mark.asyncio
+async def test_optional_orion_degrades_to_last_known_then_neutral(agent_mesh, monkeypatch):
+    calls = []
+    neutral_before = orchestrator.AGENT_FALLBACKS.value(agent="orion", source="neutral")
+    async with mesh_client(orion=failing_agent("/analyze_events", calls)) as client:
+        monkeypatch.setattr(orchestrator, "http_client", client)
+        decision = await orchestrator.get_kamila_decision(AnalysisRequest(asset="BTC/USD", historical_prices=PRICES))
+    # O ciclo segue até a Kamila com o impacto neutro em vez de falhar
+    assert calls == ["/analyze_events"]
+    assert decision["reason"].startswith("HOLD") and "MEDIUM" in decision["reason"]
+    assert orchestrator.AGENT_FALLBACKS.value(agent="orion", source="neutral") == neutral_before + 1
+
+    orchestrator.last_known_results.set(("Orion", "ETH/USD"), {
+        "asset": "ETH/USD", "impact": "high", "event_name": "FOMC", "summary": "Evento conhecido."
+    })
+    async with mesh_client(orion=failing_agent("/analyze_events", calls)) as client:
+        monkeypatch.setattr(orchestrator, "http_client", client)
+        decision = await orchestrator.get_kamila_decision(AnalysisRequest(asset="ETH/USD", historical_prices=PRICES))
+    assert decision["reason"] == "VETO (Orion): Evento conhecido."
+
+
+@pytest.mark.asyncio
+async def test_required_agent_circuit_opens_after_repeated_failures(agent_mesh, monkeypatch):
+    calls = []
+    threshold = orchestrator.AGENT_POLICIES["Cronos"].failure_threshold
+    async with mesh_client(cronos=failing_agent("/analyze", calls)) as client:
+        monkeypatch.setattr(orchestrator, "http_client", client)
+        for i in range(threshold):
+            with pytest.raises(HTTPException) as error:
+                await orchestrator.get_kamila_decision(AnalysisRequest(asset="BTC/USD", historical_prices=PRICES[i:]))
+            assert error.value.status_code == 502
+
+        with pytest.raises(HTTPException) as error:
+            await orchestrator.get_kamila_decision(AnalysisRequest(asset="BTC/USD", historical_prices=PRICES[threshold:]))
+
+    assert error.value.status_code == 503
+    assert "Circuito aberto" in str(error.value.detail)
+    assert len(calls) == threshold
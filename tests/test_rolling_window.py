@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from saka.shared.rolling_window import RollingWindow, RollingWindows
+
+
+def test_values_are_a_contiguous_read_only_view_in_order():
+    window = RollingWindow(4)
+    for value in range(1, 8):
+        window.append(value)
+    values = window.values()
+    np.testing.assert_array_equal(values, [4, 5, 6, 7])
+    assert values.flags.c_contiguous and not values.flags.owndata
+    assert np.shares_memory(values, window._buffer)
+    with pytest.raises(ValueError):
+        values[0] = 0.0
+    np.testing.assert_array_equal(window.tail(2), [6, 7])
+    assert window.last == 7 and window.full
+
+
+def test_running_statistics_match_numpy_over_a_long_stream():
+    rng = np.random.default_rng(0)
+    stream = 50_000 + np.cumsum(rng.normal(0, 100, 5_000))
+    window = RollingWindow(30)
+    for i, value in enumerate(stream, start=1):
+        window.append(value)
+        if i % 97 == 0 or i < 35:
+            expected = stream[max(0, i - 30):i]
+            assert window.sum == pytest.approx(expected.sum(), rel=1e-12)
+            assert window.sum_of_squares == pytest.approx(expected @ expected, rel=1e-12)
+            assert window.mean() == pytest.approx(expected.mean(), rel=1e-12)
+            assert window.std() == pytest.approx(np.std(expected), rel=1e-7)
+            if i > 1:
+                assert window.var(ddof=1) == pytest.approx(np.var(expected, ddof=1), rel=1e-7)
+
+
+@pytest.mark.parametrize("chunks", [[3, 2], [5, 5, 1], [12], [1, 9, 4, 3]])
+def test_extend_is_equivalent_to_appending_each_value(chunks):
+    values = np.arange(sum(chunks), dtype=float) ** 1.5
+    appended, extended = RollingWindow(5), RollingWindow(5)
+    for value in values:
+        appended.append(value)
+    start = 0
+    for size in chunks:
+        extended.extend(values[start:start + size])
+        start += size
+    np.testing.assert_array_equal(extended.values(), appended.values())
+    assert extended.sum == pytest.approx(appended.sum)
+    assert extended.var() == pytest.approx(appended.var())
+
+
+def test_empty_and_short_windows():
+    window = RollingWindow(3)
+    assert len(window) == 0 and window.last is None and window.mean() is None
+    window.append(2.0)
+    assert window.var() == 0.0 and window.var(ddof=1) is None
+    with pytest.raises(ValueError):
+        RollingWindow(0)
+
+
+def test_windows_are_kept_per_asset():
+    windows = RollingWindows(2)
+    for value in (1.0, 2.0, 3.0):
+        windows.append("BTC/USD", value)
+    windows.append("ETH/USD", 10.0)
+    assert windows.assets() == ["BTC/USD", "ETH/USD"]
+    np.testing.assert_array_equal(windows["BTC/USD"].values(), [2.0, 3.0])
+    assert "SOL/USD" not in windows
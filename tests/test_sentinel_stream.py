@@ -0,0 +1,74 @@
+import math
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from saka.agents.sentinel_risk.main import (
+    SlidingWelford, VolatilityState, calculate_volatility_batch, seed_volatility, analyze_bar, volatility_states
+)
+from saka.shared.market_data import load_ohlcv_columns
+from saka.shared.models import OHLCAnalysisRequest, PriceBar
+
+DATA_FILE = "data/Gemini_BTCUSD_d.csv"
+
+
+def test_sliding_welford_matches_numpy_on_every_window():
+    values = np.random.default_rng(1).normal(0.001, 0.03, 3000)
+    state = SlidingWelford(29)
+    for i, value in enumerate(values, start=1):
+        state.update(value)
+        assert state.std() == pytest.approx(np.std(values[max(0, i - 29):i]), rel=1e-9, abs=1e-15)
+
+
+def test_incremental_volatility_matches_the_stateless_calculation():
+    closes = np.asarray(load_ohlcv_columns(DATA_FILE)["close"])[:500]
+    state = VolatilityState(window=30)
+    for i, close in enumerate(closes, start=1):
+        state.update(close)
+        if i >= 30:
+            assert state.volatility == pytest.approx(calculate_volatility_batch(closes[None, i - 30:i])[0], rel=1e-9)
+
+
+def test_range_estimators_and_zero_first_bar():
+    columns = load_ohlcv_columns(DATA_FILE)
+    o, h, l, c = (np.asarray(columns[k])[:60] for k in ("open", "high", "low", "close"))
+    state = VolatilityState(window=30, ewma_lambda=0.94)
+    state.seed(c, o, h, l)
+    # A primeira barra da Gemini tem abertura e mínima nulas
+    assert state.skipped_range_bars == 1
+
+    returns = np.diff(c) / c[:-1]
+    variance = returns[0] ** 2
+    for r in returns[1:]:
+        variance = 0.94 * variance + 0.06 * r ** 2
+    assert state.ewma_volatility == pytest.approx(math.sqrt(variance), rel=1e-9)
+
+    o, h, l, c = o[-30:], h[-30:], l[-30:], c[-30:]
+    log_hl, log_co = np.log(h / l), np.log(c / o)
+    assert state.parkinson_volatility == pytest.approx(math.sqrt(np.mean(log_hl ** 2) / (4 * math.log(2))), rel=1e-9)
+    assert state.garman_klass_volatility == pytest.approx(
+        math.sqrt(np.mean(0.5 * log_hl ** 2 - (2 * math.log(2) - 1) * log_co ** 2)), rel=1e-9)
+
+
+@pytest.mark.asyncio
+async def test_seed_then_bar_endpoints():
+    columns = load_ohlcv_columns(DATA_FILE)
+    o, h, l, c = (np.asarray(columns[k])[:41].tolist() for k in ("open", "high", "low", "close"))
+    volatility_states.clear()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await analyze_bar(PriceBar(asset="BTC/USD", close=c[-1]))
+    assert exc_info.value.status_code == 409
+
+    with pytest.raises(HTTPException) as exc_info:
+        await seed_volatility(OHLCAnalysisRequest(asset="BTC/USD", historical_prices=c[:40], open=o[:40], high=h[:39]))
+    assert exc_info.value.status_code == 400
+
+    seeded = await seed_volatility(OHLCAnalysisRequest(asset="BTC/USD", historical_prices=c[:40], open=o[:40],
+                                                       high=h[:40], low=l[:40]), window=30)
+    assert seeded.parkinson_volatility is not None and seeded.ewma_volatility is None
+    output = await analyze_bar(PriceBar(asset="BTC/USD", open=o[40], high=h[40], low=l[40], close=c[40]))
+    expected = calculate_volatility_batch(np.asarray(c[11:41])[None, :])[0]
+    assert output.volatility == pytest.approx(expected, rel=1e-9)
+    assert output.can_trade == (expected <= 0.05)
@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+
+import saka.agents.orion_cfo.main as orion
+import saka.orchestrator.main as orchestrator
+from saka.agents.sentinel_risk.main import app as sentinel_app
+from saka.agents.kamila_ceo.main import app as kamila_app
+from saka.shared.models import AnalysisRequest
+
+# Oscila 10% por barra: volatilidade muito acima do limite do Sentinel
+VOLATILE_PRICES = [100.0 if i % 2 == 0 else 110.0 for i in range(30)]
+CALM_PRICES = (100 * np.cumprod(1 + np.random.default_rng(4).normal(0, 0.005, 60))).tolist()
+
+
+def hanging_agent(path: str, cancelled: asyncio.Event) -> FastAPI:
+    """Agente que nunca responde; sinaliza quando a requisição é cancelada."""
+    app = FastAPI()
+
+    @app.post(path)
+    async def analyze():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_sentinel_veto_cancels_slow_agents(agent_mesh, monkeypatch):
+    cancelled = asyncio.Event()
+    mounts = {
+        "http://sentinel": httpx.ASGITransport(app=sentinel_app),
+        "http://cronos": httpx.ASGITransport(app=hanging_agent("/analyze", cancelled)),
+        "http://orion": httpx.ASGITransport(app=hanging_agent("/analyze_events", cancelled)),
+        "http://kamila": httpx.ASGITransport(app=kamila_app),
+    }
+    async with httpx.AsyncClient(mounts=mounts) as client:
+        monkeypatch.setattr(orchestrator, "http_client", client)
+        decision = await asyncio.wait_for(
+            orchestrator.get_kamila_decision(AnalysisRequest(asset="BTC/USD", historical_prices=VOLATILE_PRICES)), timeout=5
+        )
+
+    assert decision["action"] == "hold"
+    assert decision["reason"].startswith("VETO (Sentinel)")
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_cached_orion_veto_skips_every_call(agent_mesh, monkeypatch):
+    monkeypatch.setattr(orion, "HIGH_IMPACT_PROBABILITY", 1.0)
+    calls = []
+
+    async def record(request):
+        calls.append(request.url.host)
+
+    agent_mesh.event_hooks = {"request": [record], "response": []}
+    first = await orchestrator.get_kamila_decision(AnalysisRequest(asset="BTC/USD", historical_prices=CALM_PRICES))
+    assert first["reason"].startswith("VETO (Orion)")
+    assert "kamila" not in calls
+
+    # Outra janela de preços, mas o Orion em cache já veta o ciclo
+    calls.clear()
+    second = await orchestrator.get_kamila_decision(AnalysisRequest(asset="BTC/USD", historical_prices=CALM_PRICES[1:]))
+    assert second == first
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_disabled_short_circuit_waits_for_kamila(agent_mesh, monkeypatch):
+    monkeypatch.setattr(orchestrator, "DECISION_SHORT_CIRCUIT", False)
+    monkeypatch.setattr(orion, "HIGH_IMPACT_PROBABILITY", 1.0)
+    calls = []
+
+    async def record(request):
+        calls.append(request.url.host)
+
+    agent_mesh.event_hooks = {"request": [record], "response": []}
+    decision = await orchestrator.get_kamila_decision(AnalysisRequest(asset="BTC/USD", historical_prices=CALM_PRICES))
+    assert decision["reason"].startswith("VETO (Orion)")
+    assert sorted(calls) == ["cronos", "kamila", "orion", "sentinel"]
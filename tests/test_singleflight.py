@@ -0,0 +1,69 @@
+import asyncio
+import numpy as np
+import pytest
+
+import saka.orchestrator.main as orchestrator
+from saka.orchestrator.cache import AnalysisCache
+from saka.orchestrator.singleflight import SingleFlight
+from saka.shared.models import AnalysisRequest
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": len(runs)}
+
+    results = await asyncio.gather(*(flights.do("BTC/USD", work) for _ in range(10)))
+    assert runs == [1]
+    assert all(r == {"value": 1} for r in results)
+    assert (flights.executions, flights.coalesced, len(flights)) == (1, 9, 0)
+
+    # Após a conclusão, uma nova chamada executa novamente
+    await flights.do("BTC/USD", work)
+    assert len(runs) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_caller_cancellation_is_isolated():
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("agente indisponível")
+
+    results = await asyncio.gather(*(flights.do("k", failing) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    impatient = asyncio.ensure_future(flights.do("k", slow))
+    patient = asyncio.ensure_future(flights.do("k", slow))
+    await asyncio.sleep(0)
+    impatient.cancel()
+    assert await patient == "ok"
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_coalesces_identical_cycles(agent_mesh, monkeypatch):
+    # Sem cache, para que apenas o single-flight evite chamadas repetidas
+    monkeypatch.setattr(orchestrator, "analysis_cache", AnalysisCache(ttl_seconds=0))
+    monkeypatch.setattr(orchestrator, "decision_flights", SingleFlight())
+    calls = []
+
+    async def record(request):
+        calls.append(request.url.host)
+
+    agent_mesh.event_hooks = {"request": [record], "response": []}
+    prices = (100 * np.cumprod(1 + np.random.default_rng(4).normal(0, 0.01, 60))).tolist()
+    request = AnalysisRequest(asset="BTC/USD", historical_prices=prices)
+
+    decisions = await asyncio.gather(*(orchestrator.get_kamila_decision(request) for _ in range(20)))
+    assert len(calls) == 4
+    assert all(d == decisions[0] for d in decisions)
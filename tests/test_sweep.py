@@ -0,0 +1,30 @@
+import pytest
+
+from scripts.sweep import parse_grid, grid_search, random_search, run_sweep
+
+DATA_FILE = "data/Gemini_BTCUSD_d.csv"
+
+
+def test_grid_and_random_search_spaces():
+    grid = parse_grid(["rsi_oversold=20,30", "rsi_overbought=70,80", "rsi_period=7,21"])
+    assert len(grid_search(grid)) == 8
+
+    samples = random_search(grid, 50, seed=1)
+    assert len(samples) == 50
+    assert all(20 <= s["rsi_oversold"] <= 30 and 7 <= s["rsi_period"] <= 21 for s in samples)
+    assert all(isinstance(s["rsi_period"], int) for s in samples)
+
+    with pytest.raises(ValueError):
+        parse_grid(["unknown=1"])
+
+
+def test_run_sweep_ranks_results_across_workers(tmp_path):
+    param_sets = grid_search(parse_grid(["rsi_oversold=25,35", "rsi_period=14,40"]))
+    table = run_sweep(DATA_FILE, param_sets, workers=2, cache_dir=str(tmp_path / "cache"))
+
+    assert len(table) == 4
+    valid = table.dropna(subset=["total_return_pct"])
+    assert list(valid["total_return_pct"]) == sorted(valid["total_return_pct"], reverse=True)
+    # Período maior que o aquecimento: erro por execução, sem interromper a varredura
+    assert table["error"].notna().sum() == 2
+    assert (tmp_path / "cache" / "close.npy").exists()
@@ -0,0 +1,66 @@
+import httpx
+import numpy as np
+import pytest
+
+import saka.shared.tracing as tracing
+import saka.orchestrator.main as orchestrator
+from saka.shared.models import AnalysisRequest
+from scripts.trace_waterfall import group_traces, slowest_traces, render_waterfall
+
+
+def test_parse_traceparent():
+    trace_id, span_id = "ab" * 16, "cd" * 8
+    assert tracing.parse_traceparent(f"00-{trace_id}-{span_id}-01") == (trace_id, span_id)
+    assert tracing.parse_traceparent("00-" + "0" * 32 + f"-{span_id}-01") is None
+    assert tracing.parse_traceparent("lixo") is None
+    assert tracing.parse_traceparent(None) is None
+
+
+@pytest.mark.asyncio
+async def test_decision_cycle_is_a_single_trace_across_agents(agent_mesh, monkeypatch):
+    collector = tracing.InMemoryCollector()
+    monkeypatch.setattr(tracing, "collector", collector)
+    prices = (100 * np.cumprod(1 + np.random.default_rng(9).normal(0, 0.01, 60))).tolist()
+
+    await orchestrator.get_kamila_decision(AnalysisRequest(asset="SOL/USD", historical_prices=prices))
+
+    traces = collector.traces()
+    assert len(traces) == 1
+    spans = next(iter(traces.values()))
+    by_id = {s["span_id"]: s for s in spans}
+    services = {s["service"] for s in spans}
+    assert {"orchestrator", "sentinel_risk", "cronos_cycles", "orion_cfo", "kamila_ceo"} <= services
+
+    # O span de requisição de cada agente é filho da chamada correspondente do Orquestrador
+    sentinel_request = next(s for s in spans if s["name"] == "POST /analyze" and s["service"] == "sentinel_risk")
+    assert by_id[sentinel_request["parent_id"]]["name"] == "call sentinel"
+    sentinel_phases = {s["name"] for s in spans if s["parent_id"] == sentinel_request["span_id"]}
+    assert sentinel_phases == {"validation", "computation", "serialization"}
+
+    waterfall = render_waterfall(spans)
+    assert "decision_cycle" in waterfall and "kamila_ceo: POST /decide" in waterfall
+
+
+@pytest.mark.asyncio
+async def test_incoming_trace_context_is_continued(monkeypatch):
+    collector = tracing.InMemoryCollector()
+    monkeypatch.setattr(tracing, "collector", collector)
+    trace_id, parent_id = "12" * 16, "34" * 8
+
+    transport = httpx.ASGITransport(app=orchestrator.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://orchestrator") as client:
+        await client.get("/cache/stats", headers={tracing.TRACE_HEADER: f"00-{trace_id}-{parent_id}-01"})
+
+    (span,) = collector.spans
+    assert (span["trace_id"], span["parent_id"], span["name"]) == (trace_id, parent_id, "GET /cache/stats")
+
+
+def test_slowest_traces_are_ranked_by_duration():
+    spans = [
+        {"trace_id": "a", "span_id": "1", "parent_id": None, "name": "x", "service": "s", "start": 0.0, "end": 1.0},
+        {"trace_id": "b", "span_id": "2", "parent_id": None, "name": "y", "service": "s", "start": 0.0, "end": 3.0},
+        {"trace_id": "b", "span_id": "3", "parent_id": "2", "name": "z", "service": "s", "start": 1.0, "end": 2.0},
+        {"trace_id": "c", "span_id": "4", "parent_id": None, "name": "w", "service": "s", "start": 0.0, "end": None},
+    ]
+    slowest = slowest_traces(group_traces(spans), 1)
+    assert [s["span_id"] for s in slowest[0]] == ["2", "3"]